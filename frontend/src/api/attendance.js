@@ -11,17 +11,18 @@ export const captureAndSend = async (
   if (!image || !selectedSubject) return;
 
   try {
-    const payload = {
-      image,
-      subject_id: selectedSubject,
-    };
+    // Send the frame as raw JPEG bytes (multipart) instead of a base64 data URL
+    const blob = await (await fetch(image)).blob();
+    const formData = new FormData();
+    formData.append("image", blob, "capture.jpg");
+    formData.append("subject_id", selectedSubject);
 
     if (currentCoords) {
-      payload.latitude = currentCoords.latitude;
-      payload.longitude = currentCoords.longitude;
+      formData.append("latitude", currentCoords.latitude);
+      formData.append("longitude", currentCoords.longitude);
     }
 
-    const res = await api.post("/api/attendance/mark", payload);
+    const res = await api.post("/api/attendance/mark", formData);
 
     console.log("Attendance response:", res.data);
     setDetections(res.data.faces);
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.security import get_current_user
 from app.db.mongo import db
+from app.services.attendance_events import WITHOUT_HISTORY
 from app.schemas.analytics import SubjectStatsResponse, StudentStat
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
@@ -52,6 +53,13 @@ async def _verify_teacher_class_access(
         )
 
 
+def _daily_match(subject_ids) -> dict:
+    """attendance_daily filter for per-day summaries of ``subject_ids``."""
+    # 'date' skips map-schema documents not yet split into daily ones
+    # (scripts/migrate_attendance_daily.py)
+    return {"subjectId": {"$in": subject_ids}, "date": {"$exists": True}}
+
+
 # -------------------------------------------------------------------------
 # ENDPOINTS
 # -------------------------------------------------------------------------
@@ -78,7 +86,7 @@ async def get_subject_analytics(
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
     # Fetch Subject
-    subject = await db.subjects.find_one({"_id": subject_oid})
+    subject = await db.subjects.find_one({"_id": subject_oid}, WITHOUT_HISTORY)
     if not subject:
         raise HTTPException(status_code=404, detail="Subject not found")
 
@@ -198,32 +206,28 @@ async def get_attendance_trend(
     # 2. Ownership Check (from 304)
     await _verify_teacher_class_access(teacher_oid, class_oid)
 
-    # 3. Data Retrieval (from main - assumes single doc with 'daily' map schema)
-    doc = await db.attendance_daily.find_one({"subjectId": class_oid})
-
-    trend_data = []
-
-    if doc and "daily" in doc:
-        daily_map = doc["daily"]
-        for date_str, summary in daily_map.items():
-            try:
-                record_date = datetime.fromisoformat(date_str)
-                if start_date <= record_date <= end_date:
-                    trend_data.append(
-                        {
-                            "date": date_str,
-                            "present": summary.get("present", 0),
-                            "absent": summary.get("absent", 0),
-                            "late": summary.get("late", 0),
-                            "total": summary.get("total", 0),
-                            "percentage": summary.get("percentage", 0.0),
-                        }
-                    )
-            except ValueError:
-                continue
-
-    # Sort by date
-    trend_data.sort(key=lambda x: x["date"])
+    # 3. Data Retrieval: one summary document per day, (subjectId, date) index
+    cursor = db.attendance_daily.find(
+        {
+            "subjectId": class_oid,
+            "date": {
+                "$gte": start_date.date().isoformat(),
+                "$lte": end_date.date().isoformat(),
+            },
+        }
+    ).sort("date", 1)
+
+    trend_data = [
+        {
+            "date": doc["date"],
+            "present": doc.get("present", 0),
+            "absent": doc.get("absent", 0),
+            "late": doc.get("late", 0),
+            "total": doc.get("total", 0),
+            "percentage": doc.get("percentage", 0.0),
+        }
+        async for doc in cursor
+    ]
 
     return {
         "classId": classId,
@@ -254,7 +258,7 @@ async def get_monthly_summary(
 
     # Build match filter
     # Use 'subjectId' for DB match (from main schema), but check auth using 304 logic
-    match_filter = {"subjectId": {"$in": subject_ids}}
+    match_filter = _daily_match(subject_ids)
 
     if classId:
         try:
@@ -266,36 +270,19 @@ async def get_monthly_summary(
         await _verify_teacher_class_access(teacher_oid, class_oid)
         match_filter["subjectId"] = class_oid
 
-    # 2. Aggregate Pipeline (from main - handles 'daily' map unwinding)
+    # 2. Aggregate Pipeline (one summary document per subject per day)
     pipeline = [
         {"$match": match_filter},
-        # Ensure only documents with 'daily' field are processed
-        {"$match": {"daily": {"$exists": True}}},
-        # Convert daily map to array of k,v
-        {
-            "$project": {
-                "classId": "$subjectId",
-                "dailyArray": {"$objectToArray": "$daily"},
-            }
-        },
-        {"$unwind": "$dailyArray"},
-        {
-            "$addFields": {
-                "date": "$dailyArray.k",
-                "summary": "$dailyArray.v",
-                "yearMonth": {"$substr": ["$dailyArray.k", 0, 7]},  # Extract YYYY-MM
-            }
-        },
         {
             "$group": {
                 "_id": {
-                    "classId": "$classId",
-                    "yearMonth": "$yearMonth",
+                    "classId": "$subjectId",
+                    "yearMonth": {"$substr": ["$date", 0, 7]},  # Extract YYYY-MM
                 },
-                "totalPresent": {"$sum": "$summary.present"},
-                "totalAbsent": {"$sum": "$summary.absent"},
-                "totalLate": {"$sum": "$summary.late"},
-                "totalStudents": {"$sum": "$summary.total"},
+                "totalPresent": {"$sum": "$present"},
+                "totalAbsent": {"$sum": "$absent"},
+                "totalLate": {"$sum": "$late"},
+                "totalStudents": {"$sum": "$total"},
                 "daysRecorded": {"$sum": 1},
             }
         },
@@ -365,31 +352,17 @@ async def get_class_risk(
     if not subject_ids:
         return {"data": []}
 
-    # 2. Pipeline (from main - 'subjectId' match + 'daily' map unwinding)
+    # 2. Pipeline (one summary document per subject per day)
     pipeline = [
-        {"$match": {"subjectId": {"$in": subject_ids}}},
-        # Convert daily map to array
-        {
-            "$project": {
-                "classId": "$subjectId",
-                "dailyArray": {"$objectToArray": "$daily"},
-            }
-        },
-        {"$unwind": "$dailyArray"},
-        {
-            "$addFields": {
-                "recordDate": "$dailyArray.k",
-                "summary": "$dailyArray.v",
-            }
-        },
+        {"$match": _daily_match(subject_ids)},
         {
             "$group": {
-                "_id": "$classId",
-                "totalPresent": {"$sum": "$summary.present"},
-                "totalAbsent": {"$sum": "$summary.absent"},
-                "totalLate": {"$sum": "$summary.late"},
-                "totalStudents": {"$sum": "$summary.total"},
-                "lastRecorded": {"$max": "$recordDate"},
+                "_id": "$subjectId",
+                "totalPresent": {"$sum": "$present"},
+                "totalAbsent": {"$sum": "$absent"},
+                "totalLate": {"$sum": "$late"},
+                "totalStudents": {"$sum": "$total"},
+                "lastRecorded": {"$max": "$date"},
             }
         },
         {
@@ -477,27 +450,14 @@ async def get_global_stats(
 
     # Aggregate attendance data for all teacher's subjects
     pipeline = [
-        {"$match": {"subjectId": {"$in": subject_ids}}},
-        # Convert daily map to array
-        {
-            "$project": {
-                "classId": "$subjectId",
-                "dailyArray": {"$objectToArray": "$daily"},
-            }
-        },
-        {"$unwind": "$dailyArray"},
-        {
-            "$addFields": {
-                "summary": "$dailyArray.v",
-            }
-        },
+        {"$match": _daily_match(subject_ids)},
         {
             "$group": {
-                "_id": "$classId",
-                "totalPresent": {"$sum": "$summary.present"},
-                "totalAbsent": {"$sum": "$summary.absent"},
-                "totalLate": {"$sum": "$summary.late"},
-                "totalStudents": {"$sum": "$summary.total"},
+                "_id": "$subjectId",
+                "totalPresent": {"$sum": "$present"},
+                "totalAbsent": {"$sum": "$absent"},
+                "totalLate": {"$sum": "$late"},
+                "totalStudents": {"$sum": "$total"},
             }
         },
         {
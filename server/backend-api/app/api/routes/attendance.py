@@ -1,18 +1,38 @@
 import base64
+import json
 import logging
+import time
 from datetime import date
 from typing import Dict
 
 from bson import ObjectId
 from bson import errors as bson_errors
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    WebSocket,
+    WebSocketDisconnect,
+)
 
 from geopy.distance import geodesic
-from app.core.config import ML_CONFIDENT_THRESHOLD, ML_UNCERTAIN_THRESHOLD
-from app.db.mongo import db
+from app.core.config import (
+    MARK_STREAM_MAX_FRAMES,
+    ML_CONFIDENT_THRESHOLD,
+    ML_UNCERTAIN_THRESHOLD,
+)
+from app.db.mongo import db, transaction
+from app.services.attendance_capture import (
+    MARK_DETECT_OPTIONS,
+    CaptureSession,
+    match_status,
+)
 from app.services.attendance_daily import save_daily_summary
+from app.services.attendance_events import record_event
+from app.services.face_gallery import CANDIDATE_PROJECTION, batch_match_subject
 from app.services.ml_client import ml_client
 from app.utils.geo import calculate_distance
+from app.utils.pipeline import StagePipeline
 from app.schemas.attendance import QRAttendanceRequest
 from app.core.security import get_current_user
 from app.utils.jwt_token import decode_jwt
@@ -172,24 +192,14 @@ async def mark_attendance_qr(
             status_code=409, detail="Attendance already marked for today"
         )
 
-    # Update the student's attendance in the subject document
-    # 1. Push attendance record to the attendance array
-    # 2. Increment present counter
-    # 3. Update lastMarkedAt
-    # Note: attendanceRecords array will grow over time. For production use,
-    # consider archiving old records or using a separate collection for
-    # historical data to avoid hitting MongoDB's 16MB document size limit.
-    attendance_record = {
-        "date": today,
-        "status": "Present",
-        "timestamp": datetime.now(UTC).isoformat(),
-        "method": "qr",
-    }
-
+    # Update the student's rolling counters in the subject document
+    # 1. Increment present counter
+    # 2. Update lastMarkedAt
+    # The mark itself goes to the attendance_events time-series collection,
+    # so the subject document does not grow with the semester.
     result = await db.subjects.update_one(
         {"_id": subject_oid, "students.student_id": student_oid},
         {
-            "$push": {"students.$.attendanceRecords": attendance_record},
             "$inc": {
                 "students.$.attendance.present": 1,
                 "students.$.attendance.total": 1,
@@ -204,6 +214,15 @@ async def mark_attendance_qr(
             detail="Student not enrolled in this subject or already marked",
         )
 
+    # 3. Record the mark in the student's attendance history
+    await record_event(
+        subject_id=subject_oid,
+        student_id=student_oid,
+        record_date=today,
+        status="Present",
+        method="qr",
+    )
+
     # 4. Save audit record including is_proxy_suspected
     # Use a dedicated attendance_logs collection to store audit events,
     # avoiding unbounded growth and schema changes on the nested students
@@ -232,40 +251,75 @@ async def mark_attendance_qr(
     }
 
 
-@router.post("/mark")
-async def mark_attendance(request: Request, payload: Dict):
+async def _read_mark_payload(request: Request) -> tuple[dict, bytes | None]:
     """
-    Mark attendance by detecting faces in classroom image
+    Read the /mark body as (fields, image bytes).
 
-    payload:
-    {
-      "image": "data:image/jpeg;base64,...",
-      "subject_id": "..."
-    }
+    multipart/form-data carries the image as raw bytes in an ``image`` file
+    part; JSON carries it as a base64 (data URL) string that is decoded once
+    here so only raw bytes travel on to the ML service.
+    """
+    content_type = request.headers.get("content-type", "")
 
-    headers:
-    {
-      "X-Device-ID": "unique-device-uuid"
-    }
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("image")
+        image_bytes = await upload.read() if hasattr(upload, "read") else None
+        fields = {k: v for k, v in form.items() if k != "image"}
+        return fields, image_bytes or None
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+    image_b64 = payload.get("image")
+    if not image_b64:
+        return payload, None
+
+    # Strip base64 header
+    if "," in image_b64:
+        _, image_b64 = image_b64.split(",", 1)
+
+    try:
+        return payload, base64.b64decode(image_b64)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid base64 image")
+
+
+async def _authorize_mark(token: str | None, device_id: str | None) -> None:
     """
-    # Extract device ID from header
-    device_id = request.headers.get("X-Device-ID")
+    Authenticate a /mark caller and enforce device binding.
+
+    Students are bound to the first device they mark attendance from;
+    teachers and admins are exempt.
+
+    Raises:
+        HTTPException: If the device ID or token is missing or invalid, or a
+            student uses an unverified device
+    """
+    user_id, user_role = _decode_mark_token(token, device_id)
+    await _check_mark_device(user_id, user_role, device_id)
+
+
+def _decode_mark_token(token: str | None, device_id: str | None) -> tuple:
+    """(user_id, role) of a /mark caller; the local half of _authorize_mark."""
     if not device_id:
         raise HTTPException(status_code=400, detail="X-Device-ID header is required")
-
-    # Extract user from Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
+    if not token:
         raise HTTPException(status_code=401, detail="Authorization required")
 
     try:
-        token = auth_header.split(" ")[1]
         decoded = decode_jwt(token)
-        user_id = decoded.get("user_id")
-        user_role = decoded.get("role")
+        return decoded.get("user_id"), decoded.get("role")
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+
+async def _check_mark_device(user_id, user_role, device_id: str) -> None:
+    """Device binding check of _authorize_mark (needs a users round trip)."""
     # Check device binding - ONLY for students
     # Teachers and admins are exempt from device binding
     if user_role == "student":
@@ -314,16 +368,19 @@ async def mark_attendance(request: Request, payload: Dict):
             user_role,
         )
 
-    image_b64 = payload.get("image")
-    subject_id = payload.get("subject_id")
 
-    if not image_b64 or not subject_id:
-        raise HTTPException(status_code=400, detail="image and subject_id required")
+async def _load_mark_subject(subject_id: str, payload: dict) -> dict:
+    """
+    Load the subject being marked and check the caller is inside its geofence.
 
+    payload carries the optional latitude/longitude of the caller.
+    """
     # Load subject
     try:
+        # Only the roster fields; students[] also holds attendance history
         subject = await db.subjects.find_one(
-            {"_id": ObjectId(subject_id)}, {"students": 1, "location": 1}
+            {"_id": ObjectId(subject_id)},
+            {"students.student_id": 1, "students.verified": 1, "location": 1},
         )
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid subject ID format")
@@ -366,23 +423,30 @@ async def mark_attendance(request: Request, payload: Dict):
         except (ValueError, TypeError):
             raise HTTPException(status_code=400, detail="Invalid coordinates format")
 
+    return subject
+
+
+async def _load_candidates(subject: dict) -> list[dict]:
+    """Verified students of the subject that have enrolled a face."""
     student_user_ids = [
         s["student_id"] for s in subject.get("students", []) if s.get("verified", False)
     ]
+    students_cursor = db.students.find(
+        {
+            "userId": {"$in": student_user_ids},
+            "verified": True,
+            "face_embeddings": {"$exists": True, "$ne": []},
+        },
+        CANDIDATE_PROJECTION,
+    )
+    return await students_cursor.to_list(length=500)
 
-    # Strip base64 header
-    if "," in image_b64:
-        _, image_b64 = image_b64.split(",", 1)
-
-    try:
-        _ = base64.b64decode(image_b64)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid base64 image")
 
-    # Call ML service to detect faces
+async def _detect_mark_faces(image_bytes: bytes) -> list[dict]:
+    """Faces (with embeddings) the ML service detects in the /mark photo."""
     try:
-        ml_response = await ml_client.detect_faces(
-            image_base64=image_b64, min_face_area_ratio=0.04, num_jitters=3, model="hog"
+        ml_response = await ml_client.detect_faces_bytes(
+            image_bytes=image_bytes, **MARK_DETECT_OPTIONS
         )
 
         if not ml_response.get("success"):
@@ -391,42 +455,23 @@ async def mark_attendance(request: Request, payload: Dict):
                 detail=f"ML service error: {ml_response.get('error', 'Unknown error')}",
             )
 
-        detected_faces = ml_response.get("faces", [])
+        return ml_response.get("faces", [])
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to detect faces: {str(e)}")
 
-    if not detected_faces:
-        return {"faces": [], "count": 0}
-
-    # Load students of this subject with embeddings
-    students_cursor = db.students.find(
-        {
-            "userId": {"$in": student_user_ids},
-            "verified": True,
-            "face_embeddings": {"$exists": True, "$ne": []},
-        }
-    )
-
-    students = await students_cursor.to_list(length=500)
-
-    # Prepare candidate embeddings for batch matching
-    candidate_embeddings = []
-    for student in students:
-        candidate_embeddings.append(
-            {
-                "student_id": str(student["userId"]),
-                "embeddings": student["face_embeddings"],
-            }
-        )
 
-    # Call ML service to match faces
+async def _match_mark_faces(
+    subject: dict, students: list[dict], detected_faces: list[dict]
+) -> list[dict]:
+    """ML batch-match of detected faces against the subject's gallery."""
     try:
-        match_response = await ml_client.batch_match(
+        match_response = await batch_match_subject(
+            subject_id=str(subject["_id"]),
+            students=students,
             detected_faces=[
                 {"embedding": face["embedding"]} for face in detected_faces
             ],
-            candidate_embeddings=candidate_embeddings,
             confident_threshold=ML_CONFIDENT_THRESHOLD,
             uncertain_threshold=ML_UNCERTAIN_THRESHOLD,
         )
@@ -439,50 +484,45 @@ async def mark_attendance(request: Request, payload: Dict):
                 ),  # noqa: E501
             )
 
-        matches = match_response.get("matches", [])
+        return match_response.get("matches", [])
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to match faces: {str(e)}")
 
-    # Build results
-    results = []
-    logger.info("Faces detected: %d", len(detected_faces))
-
-    for i, (face, match) in enumerate(zip(detected_faces, matches)):
-        student_id = match.get("student_id")
-        distance = match.get("distance")
-        status = match.get("status")  # "present" or "unknown"
 
-        # Find student details
-        best_match = None
-        if student_id:
-            best_match = next(
-                (s for s in students if str(s["userId"]) == student_id), None
-            )
-
-        # Determine status based on config thresholds
-        if distance < ML_CONFIDENT_THRESHOLD:
-            status = "present"
-        elif distance < ML_UNCERTAIN_THRESHOLD:
-            status = "uncertain"
-        else:
-            status = "unknown"
-            best_match = None
+async def _mark_results(
+    detected_faces: list[dict], matches: list[dict], students: list[dict]
+) -> list[dict]:
+    """
+    Per-face /mark results with the matched student's name and roll.
 
+    Students are indexed by id once and every matched roll comes from a
+    single ``$in`` query on users, so the cost in Mongo round trips does
+    not grow with the number of faces.
+    """
+    by_id = {str(s["userId"]): s for s in students}
+    matched = []
+    for match in matches:
+        student = by_id.get(match.get("student_id") or "")
+        distance = match.get("distance")
+        status = match_status(distance, ML_CONFIDENT_THRESHOLD, ML_UNCERTAIN_THRESHOLD)
+        if status == "unknown":
+            student = None
         logger.debug(
             "Match: %s distance=%.4f",
-            best_match["name"] if best_match else "NONE",
+            student["name"] if student else "NONE",
             distance,
         )
+        matched.append((status, distance, student))
 
-        # Get user details
-        user = None
-        if best_match:
-            user = await db.users.find_one(
-                {"_id": best_match["userId"]}, {"name": 1, "roll": 1}
-            )
+    user_ids = list({s["userId"] for _, _, s in matched if s})
+    rolls = {}
+    if user_ids:
+        cursor = db.users.find({"_id": {"$in": user_ids}}, {"roll": 1})
+        rolls = {user["_id"]: user.get("roll") async for user in cursor}
 
-        # Build result
+    results = []
+    for face, (status, distance, student) in zip(detected_faces, matched):
         location = face.get("location", {})
         results.append(
             {
@@ -493,21 +533,268 @@ async def mark_attendance(request: Request, payload: Dict):
                     "left": location.get("left"),
                 },
                 "status": status,
-                "distance": None if not best_match else round(distance, 4),
+                "distance": None if not student else round(distance, 4),
                 "confidence": None
-                if not best_match
+                if not student
                 else round(max(0.0, 1.0 - distance), 3),
                 "student": None
-                if not best_match
+                if not student
                 else {
-                    "id": str(best_match["userId"]),
-                    "roll": user.get("roll") if user else None,
-                    "name": best_match["name"],
+                    "id": str(student["userId"]),
+                    "roll": rolls.get(student["userId"]),
+                    "name": student["name"],
                 },
             }
         )
+    return results
+
+
+@router.post("/mark")
+async def mark_attendance(request: Request):
+    """
+    Mark attendance by detecting faces in classroom image
+
+    payload (multipart/form-data, preferred):
+      image=<jpeg/png file>, subject_id=..., latitude=..., longitude=...
+
+    payload (JSON):
+    {
+      "image": "data:image/jpeg;base64,...",
+      "subject_id": "..."
+    }
+
+    headers:
+    {
+      "X-Device-ID": "unique-device-uuid"
+    }
+
+    response:
+    {
+      "faces": [...], "count": n,
+      "metadata": {"timings_ms": {"device_check": ..., "subject": ...,
+                   "detect": ..., "candidates": ..., "match": ...,
+                   "results": ..., "total": ...}}
+    }
+    """
+    auth_header = request.headers.get("Authorization") or ""
+    token = auth_header.split(" ", 1)[1] if auth_header.startswith("Bearer ") else None
+    device_id = request.headers.get("X-Device-ID")
+    user_id, user_role = _decode_mark_token(token, device_id)
+
+    # Authorization comes before anything about the request body; the
+    # geofence check then gates the ML call, so a rejected request never
+    # uploads the photo. The candidate load overlaps detection, the slow stage
+    start = time.perf_counter()
+    async with StagePipeline() as stages:
+        await stages.run(
+            "device_check", _check_mark_device(user_id, user_role, device_id)
+        )
+
+        payload, image_bytes = await _read_mark_payload(request)
+        subject_id = payload.get("subject_id")
+        if not image_bytes or not subject_id:
+            raise HTTPException(status_code=400, detail="image and subject_id required")
+
+        subject = await stages.run("subject", _load_mark_subject(subject_id, payload))
 
-    return {"faces": results, "count": len(results)}
+        detection = stages.start("detect", _detect_mark_faces(image_bytes))
+        # Load students of this subject (embeddings stay in the ML gallery)
+        candidates = stages.start("candidates", _load_candidates(subject))
+
+        detected_faces = await stages.result(detection)
+        logger.info("Faces detected: %d", len(detected_faces))
+
+        # No faces: leaving the pipeline cancels the candidate load
+        results = []
+        if detected_faces:
+            students = await stages.result(candidates)
+            matches = await stages.run(
+                "match", _match_mark_faces(subject, students, detected_faces)
+            )
+            results = await stages.run(
+                "results", _mark_results(detected_faces, matches, students)
+            )
+
+    stages.timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+    return {
+        "faces": results,
+        "count": len(results),
+        "metadata": {"timings_ms": stages.timings},
+    }
+
+
+def _is_end_message(text: str | None) -> bool:
+    if not text:
+        return False
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return False
+    return isinstance(message, dict) and message.get("type") == "end"
+
+
+@router.websocket("/mark/stream")
+async def mark_attendance_stream(websocket: WebSocket):
+    """
+    Stream a burst of classroom frames and get results as they are matched.
+
+    1. Client sends a JSON start message:
+       {"token": "<jwt>", "device_id": "...", "subject_id": "...",
+        "latitude": ..., "longitude": ...}
+       and receives {"type": "ready", "candidates": n, "max_frames": n}.
+    2. Each binary message is one JPEG/PNG frame. The reply is
+       {"type": "frame", "frame": i, "faces": [...], "updated": [...]}
+       with the frame's faces (as in /mark) and the students whose best
+       match improved, or {"type": "frame", "frame": i, "error": "..."}.
+    3. {"type": "end"} (or reaching max_frames) returns the fused result
+       {"type": "result", "frames": n, "faces": [...], "count": n,
+        "unknown": n} with each student's best match, then closes.
+
+    Start-up failures reply {"type": "error", "status": ..., "detail": ...}
+    with the status /mark would have returned, and close the socket.
+    """
+    await websocket.accept()
+    try:
+        start = await websocket.receive_json()
+        if not isinstance(start, dict):
+            raise HTTPException(status_code=400, detail="Invalid start message")
+        await _authorize_mark(start.get("token"), start.get("device_id"))
+        if not start.get("subject_id"):
+            raise HTTPException(status_code=400, detail="subject_id required")
+        subject = await _load_mark_subject(start["subject_id"], start)
+        students = await _load_candidates(subject)
+    except WebSocketDisconnect:
+        return
+    except (HTTPException, ValueError) as e:
+        status = e.status_code if isinstance(e, HTTPException) else 400
+        detail = e.detail if isinstance(e, HTTPException) else "Invalid JSON"
+        await websocket.send_json({"type": "error", "status": status, "detail": detail})
+        await websocket.close(code=1008)
+        return
+
+    session = CaptureSession(
+        subject_id=str(subject["_id"]),
+        students=students,
+        confident_threshold=ML_CONFIDENT_THRESHOLD,
+        uncertain_threshold=ML_UNCERTAIN_THRESHOLD,
+    )
+    await websocket.send_json(
+        {
+            "type": "ready",
+            "candidates": len(students),
+            "max_frames": MARK_STREAM_MAX_FRAMES,
+        }
+    )
+
+    try:
+        while session.frames < MARK_STREAM_MAX_FRAMES:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes"):
+                try:
+                    update = await session.add_frame(message["bytes"])
+                except Exception as e:
+                    logger.warning("Capture frame failed: %s", e)
+                    update = {
+                        "type": "frame",
+                        "frame": session.frames - 1,
+                        "error": str(e),
+                    }
+                await websocket.send_json(update)
+            elif _is_end_message(message.get("text")):
+                break
+
+        result = session.result()
+        logger.info(
+            "Capture session for subject %s: %d frames, %d students",
+            session.subject_id,
+            result["frames"],
+            result["count"],
+        )
+        await websocket.send_json(result)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info("Capture session for subject %s disconnected", session.subject_id)
+    finally:
+        await session.close()
+
+
+def _confirm_update(
+    present_oids: list[ObjectId], absent_oids: list[ObjectId], today: str
+) -> list[dict]:
+    """
+    Update pipeline confirming a whole class in one write.
+
+    Listed students not yet marked today get total and present/absent
+    incremented and lastMarkedAt set to today; every listed student's
+    percentage is then recomputed server-side from the resulting counters.
+    """
+    marking = {"$ne": ["$$s.attendance.lastMarkedAt", today]}
+    is_present = {"$in": ["$$s.student_id", present_oids]}
+
+    def counter(field: str, increment: dict) -> dict:
+        return {
+            "$add": [
+                {"$ifNull": [f"$$s.attendance.{field}", 0]},
+                {"$cond": [increment, 1, 0]},
+            ]
+        }
+
+    counters = {
+        "total": counter("total", marking),
+        "present": counter("present", {"$and": [marking, is_present]}),
+        "absent": counter("absent", {"$and": [marking, {"$not": [is_present]}]}),
+    }
+    percentage = {
+        "$cond": [
+            {"$gt": ["$$c.total", 0]},
+            {
+                "$round": [
+                    {"$multiply": [{"$divide": ["$$c.present", "$$c.total"]}, 100]},
+                    2,
+                ]
+            },
+            0,
+        ]
+    }
+    attendance = {
+        "$let": {
+            "vars": {"c": counters},
+            "in": {
+                "$mergeObjects": [
+                    {"$ifNull": ["$$s.attendance", {}]},
+                    "$$c",
+                    {
+                        "lastMarkedAt": {
+                            "$cond": [marking, today, "$$s.attendance.lastMarkedAt"]
+                        },
+                        "percentage": percentage,
+                    },
+                ]
+            },
+        }
+    }
+    listed = {"$in": ["$$s.student_id", present_oids + absent_oids]}
+    return [
+        {
+            "$set": {
+                "students": {
+                    "$map": {
+                        "input": "$students",
+                        "as": "s",
+                        "in": {
+                            "$cond": [
+                                listed,
+                                {"$mergeObjects": ["$$s", {"attendance": attendance}]},
+                                "$$s",
+                            ]
+                        },
+                    }
+                }
+            }
+        }
+    ]
 
 
 @router.post("/confirm")
@@ -546,86 +833,33 @@ async def confirm_attendance(payload: Dict):
         raise HTTPException(status_code=404, detail="Subject not found")
 
     today = date.today().isoformat()
-
-    # Mark PRESENT students - increment total AND present
-    if present_oids:
-        await db.subjects.update_one(
-            {"_id": subject_oid},
-            {
-                "$inc": {
-                    "students.$[p].attendance.total": 1,
-                    "students.$[p].attendance.present": 1,
-                },
-                "$set": {"students.$[p].attendance.lastMarkedAt": today},
-            },
-            array_filters=[
-                {
-                    "p.student_id": {"$in": present_oids},
-                    "p.attendance.lastMarkedAt": {"$ne": today},
-                }
-            ],
-        )
-
-    # Mark ABSENT students - increment total AND absent
-    if absent_oids:
-        await db.subjects.update_one(
-            {"_id": subject_oid},
-            {
-                "$inc": {
-                    "students.$[a].attendance.total": 1,
-                    "students.$[a].attendance.absent": 1,
-                },
-                "$set": {"students.$[a].attendance.lastMarkedAt": today},
-            },
-            array_filters=[
-                {
-                    "a.student_id": {"$in": absent_oids},
-                    "a.attendance.lastMarkedAt": {"$ne": today},
-                }
-            ],
-        )
-
-    # Update percentage for all modified students
-    # Fetch the subject to get updated student records
-    updated_subject = await db.subjects.find_one({"_id": subject_oid}, {"students": 1})
-
-    if updated_subject:
-        # Calculate and update percentages for students with attendance marked
-        all_modified_student_ids = present_oids + absent_oids
-
-        for student in updated_subject.get("students", []):
-            student_id = student.get("student_id")
-            if student_id not in all_modified_student_ids:
-                continue
-
-            attendance = student.get("attendance", {})
-            total = attendance.get("total", 0)
-            present = attendance.get("present", 0)
-
-            # Calculate percentage
-            percentage = round((present / total) * 100, 2) if total > 0 else 0
-
-            # Update percentage in database
-            await db.subjects.update_one(
-                {"_id": subject_oid, "students.student_id": student_id},
-                {"$set": {"students.$[s].attendance.percentage": percentage}},
-                array_filters=[{"s.student_id": student_id}],
-            )
-
-    # --- Write daily attendance summary ---
     teacher_id = (
         subject["professor_ids"][0]
         if subject and subject.get("professor_ids")
         else None
     )
 
-    await save_daily_summary(
-        subject_id=subject_oid,
-        teacher_id=teacher_id,
-        record_date=today,
-        present=len(present_oids),
-        absent=len(absent_oids),
-    )
+    # One write for the whole class plus the daily summary, atomically
+    async with transaction(db.client) as session:
+        if present_oids or absent_oids:
+            await db.subjects.update_one(
+                {
+                    "_id": subject_oid,
+                    "students.student_id": {"$in": present_oids + absent_oids},
+                },
+                _confirm_update(present_oids, absent_oids, today),
+                session=session,
+            )
+
+        # --- Write daily attendance summary ---
+        await save_daily_summary(
+            subject_id=subject_oid,
+            teacher_id=teacher_id,
+            record_date=today,
+            present=len(present_oids),
+            absent=len(absent_oids),
+            session=session,
+        )
 
     return {
         "ok": True,
@@ -21,6 +21,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER
 
 from app.db.mongo import db
+from app.services.attendance_events import WITHOUT_HISTORY
 from app.api.deps import get_current_teacher
 
 logger = logging.getLogger(__name__)
@@ -103,7 +104,7 @@ async def _get_subject_and_validate(subject_id: str, current_teacher: dict):
     except (InvalidId, Exception):
         raise HTTPException(status_code=400, detail="Invalid subject ID format")
 
-    subject = await db.subjects.find_one({"_id": oid})
+    subject = await db.subjects.find_one({"_id": oid}, WITHOUT_HISTORY)
 
     # Fallback: try "classes" collection if "subjects" returned nothing
     if not subject:
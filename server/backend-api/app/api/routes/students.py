@@ -1,14 +1,22 @@
+import logging
+
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
 from bson import ObjectId
 from datetime import datetime, timezone
+from pymongo import ReturnDocument
 
 from ...db.mongo import db
 from ...core.security import get_current_user
-from app.services.students import get_student_profile
+from app.services.students import (
+    ENROLL_ENCODE_OPTIONS,
+    enrollment_update,
+    get_student_profile,
+)
 
 from cloudinary.uploader import upload
-import base64
 from app.services.ml_client import ml_client
+from app.core.config import EMBEDDING_STORAGE_FORMAT, MAX_FACE_EMBEDDINGS
+from app.utils.embedding_codec import to_storage
 
 from app.services import schedule_service
 import pytz
@@ -16,6 +24,7 @@ import os
 # from typing import List
 
 router = APIRouter(prefix="/students", tags=["students"])
+logger = logging.getLogger(__name__)
 
 
 # ============================
@@ -125,16 +134,10 @@ async def upload_image_url(
     # 1. Read image bytes
     image_bytes = await file.read()
 
-    # 2. Convert to base64 for ML service
-    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-
-    # 3. Generate face embeddings via ML service
+    # 2. Generate face embeddings via ML service (raw bytes, no base64)
     try:
-        ml_response = await ml_client.encode_face(
-            image_base64=image_base64,
-            validate_single=True,
-            min_face_area_ratio=0.05,
-            num_jitters=5,
+        ml_response = await ml_client.encode_face_bytes(
+            image_bytes=image_bytes, **ENROLL_ENCODE_OPTIONS
         )
 
         if not ml_response.get("success"):
@@ -143,14 +146,18 @@ async def upload_image_url(
                 detail=f"Face encoding failed: {ml_response.get('error', 'Unknown error')}",  # noqa: E501
             )
 
-        embedding = ml_response.get("embedding")
+        embedding = to_storage(ml_response.get("embedding"), EMBEDDING_STORAGE_FORMAT)
+        metadata = ml_response.get("metadata") or {}
+        embedding_version = metadata.get("embedding_version")
+        quality = metadata.get("quality", -1.0)
+        crop_version = metadata.get("crop_version")
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"ML service error: {str(e)}")
 
-    # 4. Upload image to Cloudinary
+    # 3. Upload image to Cloudinary
     upload_result = upload(
         image_bytes,
         folder="student_faces",
@@ -161,15 +168,36 @@ async def upload_image_url(
 
     image_url = upload_result.get("secure_url")
 
-    # 5. Store image_url + embeddings
-    await db.students.update_one(
+    # 4. Store image_url + embeddings
+    student = await db.students.find_one_and_update(
         {"userId": student_user_id},
-        {
-            "$set": {"image_url": image_url, "verified": True},
-            "$push": {"face_embeddings": embedding},
-        },
+        enrollment_update(
+            embedding,
+            quality,
+            embedding_version,
+            MAX_FACE_EMBEDDINGS,
+            image_url,
+            crop_version,
+        ),
+        projection={"face_embeddings": 1},
+        return_document=ReturnDocument.AFTER,
     )
 
+    # 5. Keep the campus-wide face index current (rebuilt by
+    # scripts/build_face_index.py if this is missed)
+    if student:
+        try:
+            await ml_client.update_face_index(
+                upsert=[
+                    {
+                        "student_id": str(student_user_id),
+                        "embeddings": student["face_embeddings"],
+                    }
+                ]
+            )
+        except Exception as e:
+            logger.warning("Face index update failed for %s: %s", student_user_id, e)
+
     return {
         "message": "Photo uploaded and face registered successfully",
         "image_url": image_url,
@@ -8,6 +8,7 @@ from datetime import datetime
 from app.core.cloudinary_config import cloudinary
 
 from app.utils.utils import serialize_bson
+from app.utils.embedding_codec import decode_embedding
 from app.api.deps import get_current_teacher
 from app.services.subject_service import add_subject_for_teacher
 from app.db.subjects_repo import get_subjects_by_ids
@@ -416,7 +417,10 @@ async def get_subject_students(
                 "roll": student_doc.get("roll"),
                 "year": student_doc.get("year"),
                 "branch": student_doc.get("branch"),
-                "embeddings": student_doc.get("face_embeddings", []),
+                "embeddings": [
+                    decode_embedding(e, "float32")
+                    for e in student_doc.get("face_embeddings", [])
+                ],
                 "avatar": student_doc.get("image_url"),
                 "verified": s.get("verified", False),
                 "attendance": s.get("attendance", {"present": 0, "absent": 0}),
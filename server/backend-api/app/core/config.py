@@ -59,10 +59,21 @@ brevo_settings = BrevoSettings()
 ML_SERVICE_URL = os.getenv("ML_SERVICE_URL", "http://localhost:8001")
 ML_SERVICE_TIMEOUT = float(os.getenv("ML_SERVICE_TIMEOUT", "30"))
 ML_SERVICE_MAX_RETRIES = int(os.getenv("ML_SERVICE_MAX_RETRIES", "3"))
+# Embedding wire format: list (JSON floats), float32, float16 or int8 (base64)
+ML_EMBEDDING_FORMAT = os.getenv("ML_EMBEDDING_FORMAT", "float32")
+# How students.face_embeddings are stored: list (float arrays) or float32,
+# float16, int8 (BSON binary, roughly 3x / 6x / 12x smaller); see
+# scripts/migrate_embedding_storage.py to convert existing documents
+EMBEDDING_STORAGE_FORMAT = os.getenv("EMBEDDING_STORAGE_FORMAT", "list")
+# Face embeddings kept per student; enrollment keeps the new one plus the
+# highest-quality earlier ones
+MAX_FACE_EMBEDDINGS = int(os.getenv("MAX_FACE_EMBEDDINGS", "1"))
 
 # ML Thresholds
 ML_CONFIDENT_THRESHOLD = float(os.getenv("ML_CONFIDENT_THRESHOLD", "0.50"))
 ML_UNCERTAIN_THRESHOLD = float(os.getenv("ML_UNCERTAIN_THRESHOLD", "0.60"))
+# Frames accepted per /api/attendance/mark/stream session
+MARK_STREAM_MAX_FRAMES = int(os.getenv("MARK_STREAM_MAX_FRAMES", "30"))
 
 CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
 CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
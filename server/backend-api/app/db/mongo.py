@@ -1,4 +1,6 @@
 import os
+from contextlib import asynccontextmanager
+
 import certifi
 import motor.motor_asyncio
 from pymongo.server_api import ServerApi
@@ -15,3 +17,33 @@ client = motor.motor_asyncio.AsyncIOMotorClient(
     server_api=ServerApi("1"),
 )
 db = client[MONGO_DB]
+
+
+# id(client) -> whether its deployment supports transactions
+_transaction_support: dict[int, bool] = {}
+
+
+async def supports_transactions(mongo_client) -> bool:
+    """Transactions need a replica set or sharded cluster, not a standalone."""
+    key = id(mongo_client)
+    if key not in _transaction_support:
+        hello = await mongo_client.admin.command("hello")
+        _transaction_support[key] = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _transaction_support[key]
+
+
+@asynccontextmanager
+async def transaction(mongo_client):
+    """
+    Session with an open transaction, committed when the block exits
+    cleanly and aborted on an exception.
+
+    Yields None on a standalone server (local development), where the
+    writes run without a session, as they would otherwise.
+    """
+    if not await supports_transactions(mongo_client):
+        yield None
+        return
+    async with await mongo_client.start_session() as session:
+        async with session.start_transaction():
+            yield session
@@ -22,6 +22,9 @@ from .core.config import APP_NAME, ORIGINS
 from app.services.attendance_daily import (
     ensure_indexes as ensure_attendance_daily_indexes,
 )
+from app.services.attendance_events import (
+    ensure_collection as ensure_attendance_events_collection,
+)
 from app.services.schedule_service import ensure_indexes as ensure_schedule_indexes
 from app.services.ml_client import ml_client
 from app.db.nonce_store import close_redis
@@ -67,6 +70,9 @@ async def lifespan(app: FastAPI):
         await ensure_schedule_indexes()
         logger.info("schedule indexes ensured")
 
+        await ensure_attendance_events_collection()
+        logger.info("attendance_events collection ensured")
+
         start_scheduler()
     except Exception as e:
         logger.warning(
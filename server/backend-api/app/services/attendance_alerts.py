@@ -1,6 +1,7 @@
 import logging
 
 from app.db.mongo import db
+from app.services.attendance_events import WITHOUT_HISTORY
 from app.core.email import BrevoEmailService
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,7 @@ async def send_low_attendance_for_teacher(teacher_id, teacher_doc):
     """
     emails_sent_count = 0
 
-    subjects_cursor = db.subjects.find({"professor_ids": teacher_id})
+    subjects_cursor = db.subjects.find({"professor_ids": teacher_id}, WITHOUT_HISTORY)
     subjects = await subjects_cursor.to_list(length=None)
 
     for subject in subjects:
@@ -0,0 +1,184 @@
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from app.db.mongo import db
+from app.services.face_gallery import batch_match_subject
+from app.services.ml_client import ml_client
+
+logger = logging.getLogger(__name__)
+
+# Detection settings for classroom photos (/mark and capture sessions)
+MARK_DETECT_OPTIONS = {"min_face_area_ratio": 0.04, "num_jitters": 3, "model": "hog"}
+
+
+def match_status(
+    distance: Optional[float], confident_threshold: float, uncertain_threshold: float
+) -> str:
+    if distance is None or distance >= uncertain_threshold:
+        return "unknown"
+    return "present" if distance < confident_threshold else "uncertain"
+
+
+class CaptureSession:
+    """
+    A burst of frames from one streaming attendance capture.
+
+    Candidates are loaded once per session and every frame is matched against
+    the same resident ML gallery (it is only uploaded if the ML service does
+    not hold it yet). Identities are fused across frames by keeping each
+    student's best (lowest distance) match, so a face occluded in one frame
+    can still be recognized in the next.
+
+    Frames go through the ML face tracker, so a face that stays put is only
+    embedded and matched when it first appears (or is seen more clearly);
+    later frames reuse its track's match.
+    """
+
+    def __init__(
+        self,
+        subject_id: str,
+        students: List[dict],
+        confident_threshold: float,
+        uncertain_threshold: float,
+    ):
+        self.subject_id = subject_id
+        self.students = students
+        self.confident_threshold = confident_threshold
+        self.uncertain_threshold = uncertain_threshold
+        self.session_id = uuid.uuid4().hex
+        self.frames = 0
+        # Most unrecognized faces seen in a single frame
+        self.unknown = 0
+        self._by_id = {str(s["userId"]): s for s in students}
+        self._best: Dict[str, Dict[str, Any]] = {}
+        self._rolls: Dict[str, Optional[str]] = {}
+        # Latest match of each live ML track
+        self._track_matches: Dict[int, Dict[str, Any]] = {}
+
+    async def add_frame(self, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Detect and match one frame.
+
+        Returns the frame's per-face results plus the fused entries it
+        improved, which is what the client needs to update a live view.
+        """
+        index = self.frames
+        self.frames += 1
+
+        detection = await ml_client.track_faces_bytes(
+            image_bytes=image_bytes, session_id=self.session_id, **MARK_DETECT_OPTIONS
+        )
+        if not detection.get("success"):
+            raise Exception(detection.get("error", "Face detection failed"))
+        faces = detection.get("faces", [])
+        for track_id in detection.get("ended_tracks", []):
+            self._track_matches.pop(track_id, None)
+
+        # Only faces with a fresh embedding need matching
+        fresh = [face for face in faces if face.get("embedding") is not None]
+        if fresh and self.students:
+            response = await batch_match_subject(
+                subject_id=self.subject_id,
+                students=self.students,
+                detected_faces=[{"embedding": face["embedding"]} for face in fresh],
+                confident_threshold=self.confident_threshold,
+                uncertain_threshold=self.uncertain_threshold,
+            )
+            if not response.get("success"):
+                raise Exception(response.get("error", "Face matching failed"))
+            for face, match in zip(fresh, response.get("matches", [])):
+                self._track_matches[face["track_id"]] = match
+
+        # A reused track without a match (its first frame failed) stays unknown
+        matches = [self._track_matches.get(face["track_id"], {}) for face in faces]
+        results = [
+            self._face_result(face, match, index) for face, match in zip(faces, matches)
+        ]
+        await self._load_rolls(results)
+
+        updated = []
+        for result in results:
+            if result["student"] is None:
+                continue
+            student_id = result["student"]["id"]
+            result["student"]["roll"] = self._rolls.get(student_id)
+            best = self._best.get(student_id)
+            if best is None or result["distance"] < best["distance"]:
+                self._best[student_id] = result
+                updated.append(result)
+
+        unknown = sum(1 for r in results if r["student"] is None)
+        self.unknown = max(self.unknown, unknown)
+        logger.debug(
+            "Capture frame %d: %d faces, %d unknown, %d improved",
+            index,
+            len(results),
+            unknown,
+            len(updated),
+        )
+        return {"type": "frame", "frame": index, "faces": results, "updated": updated}
+
+    def result(self) -> Dict[str, Any]:
+        """Fused result over every frame, best match first."""
+        faces = sorted(self._best.values(), key=lambda r: r["distance"])
+        return {
+            "type": "result",
+            "frames": self.frames,
+            "faces": faces,
+            "count": len(faces),
+            "unknown": self.unknown,
+        }
+
+    async def close(self) -> None:
+        """Release the session's face tracks in the ML service."""
+        try:
+            await ml_client.end_tracking(self.session_id)
+        except Exception as e:
+            logger.warning("Ending capture tracking failed: %s", e)
+
+    def _face_result(
+        self, face: Dict[str, Any], match: Dict[str, Any], frame: int
+    ) -> Dict[str, Any]:
+        distance = match.get("distance")
+        status = match_status(
+            distance, self.confident_threshold, self.uncertain_threshold
+        )
+        student = self._by_id.get(match.get("student_id") or "")
+        if status == "unknown" or student is None:
+            status, student = "unknown", None
+
+        location = face.get("location", {})
+        return {
+            "box": {
+                "top": location.get("top"),
+                "right": location.get("right"),
+                "bottom": location.get("bottom"),
+                "left": location.get("left"),
+            },
+            "status": status,
+            "distance": None if not student else round(distance, 4),
+            "confidence": None if not student else round(max(0.0, 1.0 - distance), 3),
+            "student": None
+            if not student
+            else {"id": str(student["userId"]), "roll": None, "name": student["name"]},
+            "frame": frame,
+            "track_id": face.get("track_id"),
+        }
+
+    async def _load_rolls(self, results: List[Dict[str, Any]]) -> None:
+        missing = {
+            r["student"]["id"]
+            for r in results
+            if r["student"] and r["student"]["id"] not in self._rolls
+        }
+        if not missing:
+            return
+        cursor = db.users.find(
+            {"_id": {"$in": [self._by_id[sid]["userId"] for sid in missing]}},
+            {"roll": 1},
+        )
+        async for user in cursor:
+            self._rolls[str(user["_id"])] = user.get("roll")
+        for sid in missing:
+            self._rolls.setdefault(sid, None)
@@ -1,16 +1,30 @@
 from datetime import datetime, UTC
 
 from bson import ObjectId
+from pymongo.errors import OperationFailure
 
 from app.db.mongo import db
 
 COLLECTION = "attendance_daily"
 
+# Unique index of the old one-document-per-subject ``daily`` map schema
+LEGACY_INDEX = "subjectId_1"
 
-async def ensure_indexes():
-    """Create unique index to prevent duplicate records for the same subject."""  # noqa: E501
-    await db[COLLECTION].create_index(
-        [("subjectId", 1)],
+
+async def ensure_indexes(database=None):
+    """
+    Create the unique (subjectId, date) index: one summary per subject per day.
+
+    Drops the legacy unique ``subjectId`` index, which would reject a second
+    day for the same subject.
+    """
+    database = database if database is not None else db
+    try:
+        await database[COLLECTION].drop_index(LEGACY_INDEX)
+    except OperationFailure:
+        pass  # already dropped
+    await database[COLLECTION].create_index(
+        [("subjectId", 1), ("date", 1)],
         unique=True,
     )
 
@@ -23,38 +37,36 @@ async def save_daily_summary(
     present: int,
     absent: int,
     late: int = 0,
+    session=None,
 ):
     """
     Insert or update a daily attendance summary.
 
-    Refactored to store daily summaries in a map within a single subject document.
+    One document per subject and ``record_date`` (YYYY-MM-DD), so date range
+    reads are (subjectId, date) index scans. Pass ``session`` to write it
+    inside the caller's transaction.
     """
     total = present + absent + late
     percentage = round((present / total) * 100, 2) if total > 0 else 0.0
 
     filter_q = {
         "subjectId": subject_id,
+        "date": record_date,
     }
 
-    # We update the specific date in the 'daily' map
-    daily_key = f"daily.{record_date}"
-
     update_doc = {
         "$set": {
-            daily_key: {
-                "teacherId": teacher_id,
-                "present": present,
-                "absent": absent,
-                "late": late,
-                "total": total,
-                "percentage": percentage,
-            },
+            "teacherId": teacher_id,
+            "present": present,
+            "absent": absent,
+            "late": late,
+            "total": total,
+            "percentage": percentage,
             "updatedAt": datetime.now(UTC),
         },
         "$setOnInsert": {
-            "subjectId": subject_id,
             "createdAt": datetime.now(UTC),
         },
     }
 
-    await db[COLLECTION].update_one(filter_q, update_doc, upsert=True)
+    await db[COLLECTION].update_one(filter_q, update_doc, upsert=True, session=session)
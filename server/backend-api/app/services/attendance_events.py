@@ -0,0 +1,62 @@
+from datetime import datetime, UTC
+
+from bson import ObjectId
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+from app.db.mongo import db
+
+COLLECTION = "attendance_events"
+
+# For subject reads that only need the rolling counters: excludes the
+# per-student history left on subjects that predate attendance_events
+# (scripts/migrate_attendance_events.py moves it out).
+WITHOUT_HISTORY = {"students.attendanceRecords": 0}
+
+
+async def ensure_collection(database=None):
+    """
+    Create attendance_events as a time-series collection and its indexes.
+
+    One event per attendance mark, bucketed by (subject, student) over
+    ``timestamp``. Servers without time-series support (MongoDB < 5.0) get
+    a regular collection with the same indexes.
+    """
+    database = database if database is not None else db
+    try:
+        await database.create_collection(
+            COLLECTION,
+            timeseries={
+                "timeField": "timestamp",
+                "metaField": "meta",
+                "granularity": "hours",
+            },
+        )
+    except CollectionInvalid:
+        pass  # already exists
+    except OperationFailure:
+        pass  # no time-series support; created on first insert
+    await database[COLLECTION].create_index([("meta.subjectId", 1), ("timestamp", 1)])
+    await database[COLLECTION].create_index([("meta.studentId", 1), ("timestamp", 1)])
+
+
+def attendance_event(
+    *,
+    subject_id: ObjectId,
+    student_id: ObjectId,
+    record_date: str,
+    status: str,
+    method: str,
+    timestamp: datetime | None = None,
+) -> dict:
+    return {
+        "timestamp": timestamp or datetime.now(UTC),
+        "meta": {"subjectId": subject_id, "studentId": student_id},
+        "date": record_date,
+        "status": status,
+        "method": method,
+    }
+
+
+async def record_event(**fields):
+    """Append one attendance mark (see attendance_event for the fields)."""
+    await db[COLLECTION].insert_one(attendance_event(**fields))
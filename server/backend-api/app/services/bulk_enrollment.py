@@ -0,0 +1,265 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.config import EMBEDDING_STORAGE_FORMAT, MAX_FACE_EMBEDDINGS
+from app.services.ml_client import ml_client
+from app.services.students import ENROLL_ENCODE_OPTIONS, enrollment_update
+from app.utils.embedding_codec import to_storage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RosterEntry:
+    roll: str
+    image: str  # file name inside the zip / directory
+
+
+def read_roster(path: str) -> List[RosterEntry]:
+    """Roster CSV with ``roll`` and ``image`` columns (extra columns ignored)."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        missing = {"roll", "image"} - set(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Roster is missing columns: {', '.join(sorted(missing))}")
+        return [
+            RosterEntry(row["roll"].strip(), row["image"].strip())
+            for row in reader
+            if row.get("roll", "").strip()
+        ]
+
+
+class ImageArchive:
+    """Photos read by name from a zip file or a directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._zip = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+        if self._zip is None and not os.path.isdir(path):
+            raise ValueError(f"{path} is neither a zip file nor a directory")
+
+    def read(self, name: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(name)
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+@dataclass
+class EnrollmentReport:
+    total: int = 0
+    enrolled: int = 0
+    skipped: int = 0  # already enrolled by an earlier run
+    failed: Dict[str, str] = field(default_factory=dict)  # roll -> reason
+    elapsed: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        processed = self.enrolled + len(self.failed)
+        return processed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.total} students: {self.enrolled} enrolled, "
+            f"{self.skipped} already enrolled, {len(self.failed)} failed "
+            f"in {self.elapsed:.1f}s ({self.per_second:.1f} students/s)"
+        )
+
+
+class BulkEnrollment:
+    """
+    Enrolls the faces of a whole roster.
+
+    Photos are encoded with at most ``concurrency`` ML requests in flight
+    (the ML service micro-batches concurrent encodes into one pool job) and
+    the embeddings are written ``batch_size`` students per ``bulk_write``,
+    with the same keep-the-best-quality update as a single photo upload.
+
+    Each written batch is appended to ``state_path``; a re-run skips the
+    rolls recorded there, so an interrupted or partly failed enrollment is
+    resumed by running it again. Failures are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        db,
+        images: ImageArchive,
+        state_path: Optional[str] = None,
+        concurrency: int = 8,
+        batch_size: int = 100,
+        upload_images: bool = False,
+    ):
+        self.db = db
+        self.images = images
+        self.state_path = state_path
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        self.upload_images = upload_images
+        self.report = EnrollmentReport()
+        self._pending: List[dict] = []
+        self._flush_lock = asyncio.Lock()
+
+    def _load_state(self) -> Set[str]:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return set()
+        with open(self.state_path, encoding="utf-8") as f:
+            return {json.loads(line)["roll"] for line in f if line.strip()}
+
+    def _save_state(self, rolls: List[str]) -> None:
+        if not self.state_path:
+            return
+        with open(self.state_path, "a", encoding="utf-8") as f:
+            for roll in rolls:
+                f.write(json.dumps({"roll": roll, "at": time.time()}) + "\n")
+
+    async def _resolve(self, rolls: List[str]) -> Dict[str, object]:
+        """Map rolls to student userIds with one query per 1000 rolls."""
+        user_ids = {}
+        for i in range(0, len(rolls), 1000):
+            cursor = self.db.students.find(
+                {"roll": {"$in": rolls[i : i + 1000]}}, {"userId": 1, "roll": 1}
+            )
+            async for student in cursor:
+                user_ids[student["roll"]] = student["userId"]
+        return user_ids
+
+    async def run(self, roster: List[RosterEntry]) -> EnrollmentReport:
+        start = time.perf_counter()
+        self.report.total = len(roster)
+
+        done = self._load_state()
+        todo = [e for e in roster if e.roll not in done]
+        self.report.skipped = len(roster) - len(todo)
+        user_ids = await self._resolve([e.roll for e in todo])
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for entry in todo:
+            if entry.roll in user_ids:
+                queue.put_nowait(entry)
+            else:
+                self.report.failed[entry.roll] = "No student with this roll"
+
+        async def worker():
+            while True:
+                try:
+                    entry = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._enroll(entry, user_ids[entry.roll])
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        await self._flush()
+
+        self.report.elapsed = time.perf_counter() - start
+        return self.report
+
+    async def _enroll(self, entry: RosterEntry, user_id) -> None:
+        try:
+            image_bytes = self.images.read(entry.image)
+        except (KeyError, OSError):
+            self.report.failed[entry.roll] = f"Image not found: {entry.image}"
+            return
+
+        try:
+            response = await ml_client.encode_face_bytes(
+                image_bytes=image_bytes, **ENROLL_ENCODE_OPTIONS
+            )
+            if not response.get("success"):
+                self.report.failed[entry.roll] = response.get("error", "Encode failed")
+                return
+            image_url = None
+            if self.upload_images:
+                image_url = await asyncio.to_thread(_upload_image, image_bytes, user_id)
+        except Exception as e:
+            self.report.failed[entry.roll] = str(e)
+            return
+
+        metadata = response.get("metadata") or {}
+        self._pending.append(
+            {
+                "roll": entry.roll,
+                "user_id": user_id,
+                "update": enrollment_update(
+                    to_storage(response["embedding"], EMBEDDING_STORAGE_FORMAT),
+                    metadata.get("quality", -1.0),
+                    metadata.get("embedding_version"),
+                    MAX_FACE_EMBEDDINGS,
+                    image_url,
+                    metadata.get("crop_version"),
+                ),
+            }
+        )
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                await self.db.students.bulk_write(
+                    [UpdateOne({"userId": p["user_id"]}, p["update"]) for p in batch],
+                    ordered=False,
+                )
+            except BulkWriteError as e:
+                failed = {
+                    err["index"]: err["errmsg"] for err in e.details["writeErrors"]
+                }
+                for index, message in failed.items():
+                    self.report.failed[batch[index]["roll"]] = message
+                batch = [p for i, p in enumerate(batch) if i not in failed]
+
+            self._save_state([p["roll"] for p in batch])
+            self.report.enrolled += len(batch)
+            await self._update_face_index([p["user_id"] for p in batch])
+            logger.info(
+                "Enrolled %d/%d students", self.report.enrolled, self.report.total
+            )
+
+    async def _update_face_index(self, user_ids: list) -> None:
+        """Keep the campus-wide face index current (see build_face_index.py)."""
+        if not user_ids:
+            return
+        try:
+            cursor = self.db.students.find(
+                {"userId": {"$in": user_ids}}, {"userId": 1, "face_embeddings": 1}
+            )
+            upsert = [
+                {
+                    "student_id": str(s["userId"]),
+                    "embeddings": s["face_embeddings"],
+                }
+                async for s in cursor
+                if s.get("face_embeddings")
+            ]
+            await ml_client.update_face_index(upsert=upsert)
+        except Exception as e:
+            logger.warning("Face index update failed: %s", e)
+
+
+def _upload_image(image_bytes: bytes, user_id) -> Optional[str]:
+    from cloudinary.uploader import upload
+
+    result = upload(
+        image_bytes,
+        folder="student_faces",
+        public_id=str(user_id),
+        overwrite=True,
+        resource_type="image",
+    )
+    return result.get("secure_url")
@@ -0,0 +1,94 @@
+import hashlib
+import logging
+from typing import Any, Dict, List
+
+from app.db.mongo import db
+from app.services.ml_client import ml_client
+
+logger = logging.getLogger(__name__)
+
+GALLERY_MISS_CODES = {"GALLERY_NOT_FOUND", "GALLERY_VERSION_MISMATCH"}
+
+# Projection for candidate students: everything mark_attendance needs except
+# the embeddings themselves, plus the embedding count used for versioning.
+CANDIDATE_PROJECTION = {
+    "userId": 1,
+    "name": 1,
+    "embedding_count": {"$size": "$face_embeddings"},
+    "embedding_version": 1,
+    "embedding_rev": 1,
+}
+
+
+def gallery_version(students: List[dict]) -> str:
+    """
+    Cheap fingerprint of a subject's candidate set.
+
+    Enrollment bumps embedding_rev whenever it adds or replaces a face, so
+    (userId, embedding count, version, rev) changes whenever a student is
+    added, removed, enrolls a face or has their embeddings re-projected.
+    """
+    digest = hashlib.sha1()
+    for key in sorted(
+        f"{s['userId']}:{s.get('embedding_count', 0)}:{s.get('embedding_version')}"
+        f":{s.get('embedding_rev', 0)}"
+        for s in students
+    ):
+        digest.update(key.encode())
+        digest.update(b";")
+    return digest.hexdigest()
+
+
+async def _register_subject_gallery(
+    subject_id: str, version: str, students: List[dict]
+) -> None:
+    cursor = db.students.find(
+        {"userId": {"$in": [s["userId"] for s in students]}},
+        {"userId": 1, "face_embeddings": 1},
+    )
+    candidates = [
+        {"student_id": str(s["userId"]), "embeddings": s["face_embeddings"]}
+        async for s in cursor
+        if s.get("face_embeddings")
+    ]
+
+    response = await ml_client.register_gallery(subject_id, version, candidates)
+    if not response.get("success"):
+        raise Exception(response.get("error", "Gallery registration failed"))
+
+    logger.info(
+        "Registered gallery for subject %s (%d students)", subject_id, len(candidates)
+    )
+
+
+async def batch_match_subject(
+    subject_id: str,
+    students: List[dict],
+    detected_faces: List[Dict[str, Any]],
+    confident_threshold: float,
+    uncertain_threshold: float,
+) -> Dict[str, Any]:
+    """
+    Match detected faces against the subject's resident ML gallery.
+
+    students are candidate documents fetched with CANDIDATE_PROJECTION. The
+    embeddings are only loaded and uploaded when the ML service does not hold
+    the gallery at the current version (first call, restart, or new enrollment).
+    """
+    version = gallery_version(students)
+
+    async def _match() -> Dict[str, Any]:
+        return await ml_client.batch_match(
+            detected_faces=detected_faces,
+            confident_threshold=confident_threshold,
+            uncertain_threshold=uncertain_threshold,
+            gallery_id=subject_id,
+            gallery_version=version,
+        )
+
+    response = await _match()
+    if response.get("success") or response.get("error_code") not in GALLERY_MISS_CODES:
+        return response
+
+    await _register_subject_gallery(subject_id, version, students)
+    return await _match()
@@ -2,6 +2,13 @@ import httpx
 import os
 from typing import Optional, List, Dict, Any
 
+from app.utils.embedding_codec import (
+    EMBEDDING_FORMATS,
+    decode_embedding,
+    encode_embedding,
+    encode_embeddings,
+)
+
 
 class MLClient:
     """HTTP client for communicating with ML Service"""
@@ -11,6 +18,9 @@ class MLClient:
         self.api_key = os.getenv("ML_API_KEY", "your-secret-api-key-here")
         self.timeout = float(os.getenv("ML_SERVICE_TIMEOUT", "30"))
         self.max_retries = int(os.getenv("ML_SERVICE_MAX_RETRIES", "3"))
+        self.embedding_format = os.getenv("ML_EMBEDDING_FORMAT", "float32")
+        if self.embedding_format not in EMBEDDING_FORMATS:
+            self.embedding_format = "list"
 
         # Create httpx client with connection pooling
         self.client = httpx.AsyncClient(
@@ -30,13 +40,28 @@ class MLClient:
         endpoint: str,
         json_data: Optional[Dict] = None,
         retries: int = 0,
+        content: Optional[bytes] = None,
+        params: Optional[Dict] = None,
     ) -> Dict[str, Any]:
         """
         Make HTTP request to ML service with retry logic
+
+        Pass content (raw bytes, sent as application/octet-stream) instead of
+        json_data for the /raw image endpoints.
         """
         try:
+            headers = (
+                {"Content-Type": "application/octet-stream"}
+                if content is not None
+                else None
+            )
             response = await self.client.request(
-                method=method, url=endpoint, json=json_data
+                method=method,
+                url=endpoint,
+                json=json_data,
+                content=content,
+                params=params,
+                headers=headers,
             )
             response.raise_for_status()
             return response.json()
@@ -44,7 +69,7 @@ class MLClient:
         except httpx.TimeoutException:
             if retries < self.max_retries:
                 return await self._make_request(
-                    method, endpoint, json_data, retries + 1
+                    method, endpoint, json_data, retries + 1, content, params
                 )
             raise Exception(f"ML Service timeout after {self.max_retries} retries")
 
@@ -56,10 +81,21 @@ class MLClient:
         except Exception as e:
             if retries < self.max_retries:
                 return await self._make_request(
-                    method, endpoint, json_data, retries + 1
+                    method, endpoint, json_data, retries + 1, content, params
                 )
             raise Exception(f"ML Service communication error: {str(e)}")
 
+    def _encode_candidates(
+        self, candidates: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        return [
+            {
+                "student_id": c["student_id"],
+                "embeddings": encode_embeddings(c["embeddings"], self.embedding_format),
+            }
+            for c in candidates
+        ]
+
     async def encode_face(
         self,
         image_base64: str,
@@ -84,9 +120,43 @@ class MLClient:
             "validate_single": validate_single,
             "min_face_area_ratio": min_face_area_ratio,
             "num_jitters": num_jitters,
+            "embedding_format": self.embedding_format,
+        }
+
+        response = await self._make_request("POST", "/api/ml/encode-face", request_data)
+        if response.get("embedding") is not None:
+            response["embedding"] = decode_embedding(
+                response["embedding"], self.embedding_format
+            )
+        return response
+
+    async def encode_face_bytes(
+        self,
+        image_bytes: bytes,
+        validate_single: bool = True,
+        min_face_area_ratio: float = 0.05,
+        num_jitters: int = 5,
+    ) -> Dict[str, Any]:
+        """
+        Encode a single face from raw image bytes (no base64 round trip)
+
+        Returns the same shape as encode_face.
+        """
+        params = {
+            "validate_single": validate_single,
+            "min_face_area_ratio": min_face_area_ratio,
+            "num_jitters": num_jitters,
+            "embedding_format": self.embedding_format,
         }
 
-        return await self._make_request("POST", "/api/ml/encode-face", request_data)
+        response = await self._make_request(
+            "POST", "/api/ml/encode-face/raw", content=image_bytes, params=params
+        )
+        if response.get("embedding") is not None:
+            response["embedding"] = decode_embedding(
+                response["embedding"], self.embedding_format
+            )
+        return response
 
     async def detect_faces(
         self,
@@ -109,19 +179,77 @@ class MLClient:
                 "count": int,
                 "metadata": {...}
             }
+
+        Face embeddings are returned in the client's wire format (a base64
+        string unless ML_EMBEDDING_FORMAT=list) and can be passed unchanged
+        to batch_match / match_faces.
         """
         request_data = {
             "image_base64": image_base64,
             "min_face_area_ratio": min_face_area_ratio,
             "num_jitters": num_jitters,
             "model": model,
+            "embedding_format": self.embedding_format,
         }
 
         return await self._make_request("POST", "/api/ml/detect-faces", request_data)
 
+    async def detect_faces_bytes(
+        self,
+        image_bytes: bytes,
+        min_face_area_ratio: float = 0.04,
+        num_jitters: int = 3,
+        model: str = "hog",
+    ) -> Dict[str, Any]:
+        """
+        Detect multiple faces from raw image bytes (no base64 round trip)
+
+        Returns the same shape as detect_faces.
+        """
+        params = {
+            "min_face_area_ratio": min_face_area_ratio,
+            "num_jitters": num_jitters,
+            "model": model,
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request(
+            "POST", "/api/ml/detect-faces/raw", content=image_bytes, params=params
+        )
+
+    async def track_faces_bytes(
+        self,
+        image_bytes: bytes,
+        session_id: str,
+        min_face_area_ratio: float = 0.04,
+        num_jitters: int = 3,
+        model: str = "hog",
+    ) -> Dict[str, Any]:
+        """
+        Detect faces in one frame of a capture session and track them
+
+        Faces continuing a track whose embedding is still the best come back
+        with embedding_reused=True and no embedding.
+        """
+        params = {
+            "session_id": session_id,
+            "min_face_area_ratio": min_face_area_ratio,
+            "num_jitters": num_jitters,
+            "model": model,
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request(
+            "POST", "/api/ml/track-faces/raw", content=image_bytes, params=params
+        )
+
+    async def end_tracking(self, session_id: str) -> Dict[str, Any]:
+        """Drop a capture session's face tracks from the ML service"""
+        return await self._make_request("DELETE", f"/api/ml/track-faces/{session_id}")
+
     async def match_faces(
         self,
-        query_embedding: List[float],
+        query_embedding: List[float] | str,
         candidate_embeddings: List[Dict[str, Any]],
         threshold: float = 0.6,
         return_all_distances: bool = False,
@@ -150,10 +278,11 @@ class MLClient:
             }
         """
         request_data = {
-            "query_embedding": query_embedding,
-            "candidate_embeddings": candidate_embeddings,
+            "query_embedding": encode_embedding(query_embedding, self.embedding_format),
+            "candidate_embeddings": self._encode_candidates(candidate_embeddings),
             "threshold": threshold,
             "return_all_distances": return_all_distances,
+            "embedding_format": self.embedding_format,
         }
 
         return await self._make_request("POST", "/api/ml/match-faces", request_data)
@@ -161,15 +290,22 @@ class MLClient:
     async def batch_match(
         self,
         detected_faces: List[Dict[str, Any]],
-        candidate_embeddings: List[Dict[str, Any]],
+        candidate_embeddings: Optional[List[Dict[str, Any]]] = None,
         confident_threshold: float = 0.50,
         uncertain_threshold: float = 0.60,
+        gallery_id: Optional[str] = None,
+        gallery_version: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Match multiple detected faces against candidate embeddings
 
+        When gallery_id is given the faces are matched against that resident
+        gallery and candidate_embeddings may be empty. If the gallery is
+        missing or not at gallery_version the response carries
+        error_code "GALLERY_NOT_FOUND" / "GALLERY_VERSION_MISMATCH".
+
         detected_faces format: [
-            {"embedding": [float, ...]},
+            {"embedding": [float, ...] or encoded str from detect_faces},
             ...
         ]
 
@@ -193,14 +329,185 @@ class MLClient:
             }
         """
         request_data = {
-            "detected_faces": detected_faces,
-            "candidate_embeddings": candidate_embeddings,
+            "detected_faces": [
+                {"embedding": encode_embedding(f["embedding"], self.embedding_format)}
+                for f in detected_faces
+            ],
+            "candidate_embeddings": self._encode_candidates(candidate_embeddings or []),
             "confident_threshold": confident_threshold,
             "uncertain_threshold": uncertain_threshold,
+            "embedding_format": self.embedding_format,
         }
+        if gallery_id is not None:
+            request_data["gallery_id"] = gallery_id
+            request_data["gallery_version"] = gallery_version
 
         return await self._make_request("POST", "/api/ml/batch-match", request_data)
 
+    async def register_gallery(
+        self,
+        gallery_id: str,
+        version: str,
+        candidates: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Create or replace a resident embedding gallery in the ML service
+
+        candidates format is the same as batch_match candidate_embeddings.
+
+        Returns:
+            {
+                "success": bool,
+                "gallery": {
+                    "gallery_id": str,
+                    "version": str,
+                    "student_count": int,
+                    "embedding_count": int
+                }
+            }
+        """
+        request_data = {
+            "version": version,
+            "candidates": self._encode_candidates(candidates),
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request(
+            "PUT", f"/api/ml/galleries/{gallery_id}", request_data
+        )
+
+    async def update_gallery(
+        self,
+        gallery_id: str,
+        version: str,
+        upsert: Optional[List[Dict[str, Any]]] = None,
+        remove: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Add/replace some students' embeddings in a gallery and drop others
+        """
+        request_data = {
+            "version": version,
+            "upsert": self._encode_candidates(upsert or []),
+            "remove": remove or [],
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request(
+            "PATCH", f"/api/ml/galleries/{gallery_id}", request_data
+        )
+
+    async def evict_gallery(self, gallery_id: str) -> Dict[str, Any]:
+        """Drop a resident gallery from the ML service"""
+        return await self._make_request("DELETE", f"/api/ml/galleries/{gallery_id}")
+
+    async def update_face_index(
+        self,
+        upsert: Optional[List[Dict[str, Any]]] = None,
+        remove: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Add/replace students in the campus-wide face index and drop others
+
+        upsert format is the same as batch_match candidate_embeddings.
+        """
+        request_data = {
+            "upsert": self._encode_candidates(upsert or []),
+            "remove": remove or [],
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request("PATCH", "/api/ml/index", request_data)
+
+    async def search_face_index(
+        self, query_embeddings: List[Any], k: int = 5
+    ) -> Dict[str, Any]:
+        """
+        Identify faces against every student in the campus-wide index
+
+        Returns:
+            {
+                "success": bool,
+                "results": [  # one list per query, best first
+                    [{"student_id": str, "distance": float, "confidence": float}]
+                ]
+            }
+        """
+        request_data = {
+            "query_embeddings": encode_embeddings(
+                query_embeddings, self.embedding_format
+            ),
+            "k": k,
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request("POST", "/api/ml/index/search", request_data)
+
+    async def fit_projection(
+        self,
+        version: str,
+        embeddings: List[List[float]],
+        dim: int = 128,
+        method: str = "pca",
+        input_dim: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fit a new embedding projection version on a sample of raw embeddings
+
+        Returns:
+            {
+                "success": bool,
+                "projection": {
+                    "version": str,
+                    "method": str,
+                    "input_dim": int,
+                    "output_dim": int,
+                    "active": bool
+                }
+            }
+        """
+        request_data = {
+            "version": version,
+            "method": method,
+            "dim": dim,
+            "embeddings": encode_embeddings(embeddings, self.embedding_format),
+            "input_dim": input_dim,
+            "embedding_format": self.embedding_format,
+        }
+
+        return await self._make_request("POST", "/api/ml/projections", request_data)
+
+    async def get_projection(self, version: str) -> Dict[str, Any]:
+        """Look up a stored embedding projection version"""
+        return await self._make_request("GET", f"/api/ml/projections/{version}")
+
+    async def project_embeddings(
+        self, version: str, embeddings: List[List[float]]
+    ) -> Dict[str, Any]:
+        """
+        Map raw embeddings through a projection version
+
+        The projected embeddings are returned as float lists in input order.
+        """
+        request_data = {
+            "embeddings": encode_embeddings(embeddings, self.embedding_format),
+            "embedding_format": self.embedding_format,
+        }
+
+        response = await self._make_request(
+            "POST", f"/api/ml/projections/{version}/project", request_data
+        )
+        if response.get("embeddings") is not None:
+            response["embeddings"] = [
+                decode_embedding(e, self.embedding_format)
+                for e in response["embeddings"]
+            ]
+        return response
+
+    async def snapshot_face_index(self) -> Dict[str, Any]:
+        """Persist the campus-wide face index on the ML service"""
+        return await self._make_request("POST", "/api/ml/index/snapshot")
+
     async def health_check(self) -> Dict[str, Any]:
         """
         Check ML service health
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from app.db.mongo import db
 from bson import ObjectId
 
@@ -6,6 +8,106 @@ users_col = db["users"]
 attendance_col = db["attendance"]
 subjects_col = db["subjects"]
 
+# ML encode options for enrollment photos (one clear face, larger than in
+# classroom photos)
+ENROLL_ENCODE_OPTIONS = {
+    "validate_single": True,
+    "min_face_area_ratio": 0.05,
+    "num_jitters": 5,
+}
+
+
+def enrollment_update(
+    embedding,
+    quality: float,
+    embedding_version: Optional[str],
+    limit: int,
+    image_url: Optional[str] = None,
+    crop_version: Optional[int] = None,
+) -> list:
+    """
+    Update pipeline adding an enrollment embedding, plus up to ``limit - 1``
+    of the highest-quality earlier ones.
+
+    The new embedding is always kept, so ``image_url`` (the photo it came
+    from) and the stored embeddings never belong to different uploads, and
+    a student can replace a poor enrollment by uploading again.
+
+    face_qualities runs parallel to face_embeddings; embeddings stored before
+    quality scoring count as -1 so any scored face ranks below them. Embeddings
+    from different projection or face crop versions can't be compared, so a
+    version change starts the list over (and clears needs_reenrollment, see
+    scripts/reencode_face_embeddings.py). embedding_rev is bumped on every
+    write because a replaced embedding leaves the count unchanged (see
+    gallery_version).
+    """
+    same_version = {
+        "$and": [
+            {"$eq": [{"$ifNull": ["$embedding_version", None]}, embedding_version]},
+            {"$eq": [{"$ifNull": ["$crop_version", None]}, crop_version]},
+        ]
+    }
+    existing = {
+        "$map": {
+            "input": {"$range": [0, {"$size": {"$ifNull": ["$face_embeddings", []]}}]},
+            "as": "i",
+            "in": {
+                "e": {"$arrayElemAt": ["$face_embeddings", "$$i"]},
+                "q": {
+                    "$ifNull": [
+                        {"$arrayElemAt": [{"$ifNull": ["$face_qualities", []]}, "$$i"]},
+                        -1.0,
+                    ]
+                },
+            },
+        }
+    }
+    return [
+        {
+            "$set": {
+                "_kept": {
+                    "$sortArray": {
+                        "input": {
+                            "$concatArrays": [
+                                {"$literal": [{"e": embedding, "q": quality}]},
+                                {
+                                    "$slice": [
+                                        {
+                                            "$sortArray": {
+                                                "input": {
+                                                    "$cond": [
+                                                        same_version,
+                                                        existing,
+                                                        [],
+                                                    ]
+                                                },
+                                                "sortBy": {"q": -1},
+                                            }
+                                        },
+                                        max(limit - 1, 0),
+                                    ]
+                                },
+                            ]
+                        },
+                        "sortBy": {"q": -1},
+                    }
+                }
+            }
+        },
+        {
+            "$set": {
+                **({"image_url": image_url} if image_url else {}),
+                "verified": True,
+                "embedding_version": embedding_version,
+                "crop_version": crop_version,
+                "face_embeddings": "$_kept.e",
+                "face_qualities": "$_kept.q",
+                "embedding_rev": {"$add": [{"$ifNull": ["$embedding_rev", 0]}, 1]},
+            }
+        },
+        {"$unset": ["_kept", "needs_reenrollment"]},
+    ]
+
 
 async def get_student_profile(user_id: str):
     # 1. Get user document
@@ -48,6 +150,8 @@ async def get_student_profile(user_id: str):
         "subjects": subjects,  # ✅ populated & serialized
         "avatarUrl": student.get("avatarUrl"),
         "image_url": student.get("image_url"),
+        # Set when the stored face could not be re-encoded; ask for a new photo
+        "needs_reenrollment": student.get("needs_reenrollment", False),
         "attendance": attendance_summary,
         "recent_attendance": attendance_summary["recent_attendance"],
     }
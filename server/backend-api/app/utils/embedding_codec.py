@@ -0,0 +1,110 @@
+"""
+Compact embedding wire and storage formats shared with the ML service.
+
+"float32" / "float16" embeddings travel as base64 strings of little-endian
+IEEE floats instead of JSON float arrays. "int8" is a little-endian float32
+scale followed by one signed byte per value (``value ~= byte * scale``).
+Mirrors ml-service/app/utils/embedding_codec.py without needing numpy.
+
+The same byte layouts are stored in Mongo as BSON Binary values whose
+user-defined subtype names the format (see ``to_storage``), so a stored
+embedding is sent to the ML service without re-encoding when the formats
+match.
+"""
+
+import base64
+import struct
+import sys
+from array import array
+from typing import List, Sequence, Union
+
+from bson.binary import Binary
+
+EMBEDDING_FORMATS = ("list", "float32", "float16", "int8")
+
+# BSON Binary subtype of each stored format (0x80-0xFF are user defined)
+_SUBTYPES = {"float32": 0x80, "float16": 0x81, "int8": 0x82}
+_FORMATS_BY_SUBTYPE = {subtype: fmt for fmt, subtype in _SUBTYPES.items()}
+
+Embedding = Union[List[float], str, Binary]
+
+
+def _pack(values: Sequence[float], fmt: str) -> bytes:
+    if fmt == "float16":
+        return struct.pack(f"<{len(values)}e", *values)
+    if fmt == "int8":
+        scale = max((abs(v) for v in values), default=0.0) / 127.0 or 1.0
+        quantized = [max(-127, min(127, round(v / scale))) for v in values]
+        return struct.pack(f"<f{len(values)}b", scale, *quantized)
+    packed = array("f", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(raw: bytes, fmt: str) -> List[float]:
+    if fmt == "float16":
+        return list(struct.unpack(f"<{len(raw) // 2}e", raw))
+    if fmt == "int8":
+        (scale,) = struct.unpack_from("<f", raw)
+        return [b * scale for b in struct.unpack_from(f"<{len(raw) - 4}b", raw, 4)]
+    values = array("f")
+    values.frombytes(raw)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tolist()
+
+
+def _stored_format(embedding: Binary) -> str:
+    try:
+        return _FORMATS_BY_SUBTYPE[embedding.subtype]
+    except KeyError:
+        raise ValueError(f"Unknown embedding subtype {embedding.subtype:#x}")
+
+
+def encode_embedding(embedding: Embedding, fmt: str) -> Embedding:
+    """
+    Encode an embedding for the wire. Already-encoded strings pass through;
+    stored Binary values are re-encoded only if their format differs.
+    """
+    if isinstance(embedding, str):
+        return embedding
+    if isinstance(embedding, Binary):
+        if _stored_format(embedding) == fmt:
+            return base64.b64encode(embedding).decode("ascii")
+        embedding = decode_embedding(embedding, fmt)
+    if fmt == "list":
+        return embedding
+    return base64.b64encode(_pack(embedding, fmt)).decode("ascii")
+
+
+def decode_embedding(embedding: Embedding, fmt: str) -> List[float]:
+    """Decode a wire string or stored Binary embedding back to a float list."""
+    if isinstance(embedding, Binary):
+        return _unpack(bytes(embedding), _stored_format(embedding))
+    if not isinstance(embedding, str):
+        return list(embedding)
+    return _unpack(base64.b64decode(embedding), fmt)
+
+
+def encode_embeddings(embeddings: Sequence[Embedding], fmt: str) -> List[Embedding]:
+    return [encode_embedding(e, fmt) for e in embeddings]
+
+
+def to_storage(embedding: Embedding, fmt: str) -> Union[List[float], Binary]:
+    """
+    Embedding as stored in ``students.face_embeddings``: a float list for
+    "list", otherwise a Binary of the format's bytes (4 bytes per value for
+    float32, 2 for float16, 1 plus a 4-byte scale for int8).
+    """
+    if fmt == "list":
+        return decode_embedding(embedding, "float32")
+    if isinstance(embedding, Binary) and _stored_format(embedding) == fmt:
+        return embedding
+    values = decode_embedding(embedding, "float32")
+    return Binary(_pack(values, fmt), _SUBTYPES[fmt])
+
+
+def storage_format(embedding: Embedding) -> str:
+    """Format an embedding is stored in ("list" for plain float arrays)."""
+    return _stored_format(embedding) if isinstance(embedding, Binary) else "list"
@@ -0,0 +1,77 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Dict, List
+
+
+class StagePipeline:
+    """
+    Runs the independent stages of a request concurrently and times them.
+
+    ``start`` runs a stage as a task and ``result`` waits for it; ``run``
+    does both for a stage on the critical path. The first stage to fail
+    cancels every other stage, and its exception is what ``result`` raises,
+    so a rejected request neither waits for nor keeps paying for work whose
+    result is no longer needed. Leaving the ``async with`` block cancels
+    whatever is still running (e.g. on an early return).
+
+    ``timings`` maps each stage to its duration in milliseconds.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._stages: List[Awaitable] = []
+        self._failed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def __aenter__(self) -> "StagePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Close stages cancelled before they ever ran (never-awaited warning)
+        for stage in self._stages:
+            if not inspect.iscoroutine(stage):
+                continue
+            if inspect.getcoroutinestate(stage) == inspect.CORO_CREATED:
+                stage.close()
+        if self._failed.done():
+            self._failed.exception()  # retrieved, even if nobody waited on it
+        else:
+            self._failed.cancel()
+
+    def start(self, name: str, stage: Awaitable) -> asyncio.Task:
+        task = asyncio.create_task(self._timed(name, stage))
+        self._stages.append(stage)
+        self._tasks.append(task)
+        return task
+
+    async def result(self, task: asyncio.Task) -> Any:
+        await asyncio.wait({task, self._failed}, return_when=asyncio.FIRST_COMPLETED)
+        if self._failed.done():
+            raise self._failed.exception()
+        return task.result()
+
+    async def run(self, name: str, stage: Awaitable) -> Any:
+        return await self.result(self.start(name, stage))
+
+    async def _timed(self, name: str, stage: Awaitable) -> Any:
+        started = time.perf_counter()
+        try:
+            return await stage
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not self._failed.done():
+                self._failed.set_exception(e)
+                self._cancel()
+            raise
+        finally:
+            self.timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def _cancel(self) -> None:
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current and not task.done():
+                task.cancel()
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.services.ml_client import ml_client  # noqa: E402
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+# Students uploaded to the ML service per request
+BATCH_SIZE = int(os.getenv("FACE_INDEX_BATCH_SIZE", "200"))
+
+
+async def build_face_index():
+    """Load every enrolled student's face embeddings into the ML face index."""
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+
+    cursor = db.students.find(
+        {"face_embeddings": {"$exists": True, "$ne": []}},
+        {"userId": 1, "face_embeddings": 1},
+    ).batch_size(BATCH_SIZE)
+
+    total = 0
+    batch = []
+    async for student in cursor:
+        batch.append(
+            {
+                "student_id": str(student["userId"]),
+                "embeddings": student["face_embeddings"],
+            }
+        )
+        if len(batch) >= BATCH_SIZE:
+            total += await _upload(batch)
+            batch = []
+    if batch:
+        total += await _upload(batch)
+
+    print(f"Indexed {total} students.")
+
+    response = await ml_client.snapshot_face_index()
+    if response.get("success"):
+        print("Index snapshot saved.")
+    else:
+        print(f"Index not snapshotted: {response.get('error')}")
+
+    await ml_client.close()
+
+
+async def _upload(batch):
+    response = await ml_client.update_face_index(upsert=batch)
+    if not response.get("success"):
+        raise Exception(response.get("error", "Face index update failed"))
+    index = response["index"]
+    print(
+        f"Uploaded {len(batch)} students "
+        f"(index: {index['student_count']} students, {index['list_count']} lists)"
+    )
+    return len(batch)
+
+
+if __name__ == "__main__":
+    asyncio.run(build_face_index())
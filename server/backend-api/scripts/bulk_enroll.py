@@ -0,0 +1,91 @@
+"""
+Enroll the faces of a whole roster at once.
+
+    python scripts/bulk_enroll.py photos.zip roster.csv
+    python scripts/bulk_enroll.py photos/ roster.csv --upload-images
+
+The roster CSV needs ``roll`` and ``image`` columns; ``image`` is the photo's
+file name inside the zip or directory. Each photo goes through the same ML
+encoding and keep-the-best-quality update as /students/me/face-image.
+
+Enrolled rolls are recorded in the state file (default: next to the roster),
+so re-running the same command resumes after an interruption and retries
+only the students that failed. Failures are listed in --report.
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.services.bulk_enrollment import (  # noqa: E402
+    BulkEnrollment,
+    ImageArchive,
+    read_roster,
+)
+from app.services.ml_client import ml_client  # noqa: E402
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+
+async def bulk_enroll(args):
+    roster = read_roster(args.roster)
+    images = ImageArchive(args.images)
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+
+    enrollment = BulkEnrollment(
+        client[DB_NAME],
+        images,
+        state_path=args.state or f"{os.path.splitext(args.roster)[0]}.enrolled.jsonl",
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        upload_images=args.upload_images,
+    )
+    try:
+        report = await enrollment.run(roster)
+    finally:
+        images.close()
+        await ml_client.close()
+
+    print(report.summary())
+    if report.failed:
+        if args.report:
+            with open(args.report, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["roll", "error"])
+                writer.writerows(sorted(report.failed.items()))
+            print(f"Failures written to {args.report}; re-run to retry them.")
+        else:
+            for roll, error in sorted(report.failed.items()):
+                print(f"  {roll}: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Enroll student faces from a photo archive and a roster CSV"
+    )
+    parser.add_argument("images", help="Zip file or directory of student photos")
+    parser.add_argument("roster", help="CSV with roll and image columns")
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="ML encode requests in flight"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100, help="Students per Mongo bulk_write"
+    )
+    parser.add_argument(
+        "--upload-images",
+        action="store_true",
+        help="Also upload each photo to Cloudinary as the student's image_url",
+    )
+    parser.add_argument("--state", help="Resume state file")
+    parser.add_argument("--report", help="Write failures to this CSV")
+    asyncio.run(bulk_enroll(parser.parse_args()))
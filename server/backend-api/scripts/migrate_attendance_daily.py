@@ -0,0 +1,96 @@
+"""
+Split map-schema attendance_daily documents into one document per day.
+
+    python scripts/migrate_attendance_daily.py
+    python scripts/migrate_attendance_daily.py --dry-run
+
+Older deployments kept every date of a subject in a single document under
+``daily.<YYYY-MM-DD>``. Each entry becomes its own {subjectId, date, ...}
+document, indexed on (subjectId, date), and the map document is then removed.
+
+Days are upserted by (subjectId, date) before the map document is deleted, so
+re-running after an interruption neither loses nor duplicates summaries. A day
+already written by the new backend is kept as is.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, UTC
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.services.attendance_daily import COLLECTION, ensure_indexes  # noqa: E402
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+SUMMARY_FIELDS = ("teacherId", "present", "absent", "late", "total", "percentage")
+
+
+def daily_documents(doc: dict) -> list[dict]:
+    """One per-day summary for each entry of a map-schema document."""
+    created_at = doc.get("createdAt") or datetime.now(UTC)
+    days = []
+    for record_date, summary in sorted((doc.get("daily") or {}).items()):
+        day = {field: summary[field] for field in SUMMARY_FIELDS if field in summary}
+        day.update(
+            subjectId=doc["subjectId"],
+            date=record_date,
+            createdAt=created_at,
+            updatedAt=doc.get("updatedAt") or created_at,
+        )
+        days.append(day)
+    return days
+
+
+async def migrate_attendance_daily(args):
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+    if not args.dry_run:
+        # Replaces the unique subjectId index, which allows one document only
+        await ensure_indexes(db)
+
+    subjects = split = 0
+    async for doc in db[COLLECTION].find({"daily": {"$exists": True}}):
+        days = daily_documents(doc)
+        subjects += 1
+        split += len(days)
+        if args.dry_run:
+            continue
+
+        if days:
+            await db[COLLECTION].bulk_write(
+                [
+                    UpdateOne(
+                        {"subjectId": day["subjectId"], "date": day["date"]},
+                        {"$setOnInsert": day},
+                        upsert=True,
+                    )
+                    for day in days
+                ],
+                ordered=False,
+            )
+        await db[COLLECTION].delete_one({"_id": doc["_id"]})
+
+    if args.dry_run:
+        print(f"Would split {subjects} subject documents into {split} days.")
+        return
+    print(f"Split {subjects} subject documents into {split} days in {COLLECTION}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Split attendance_daily map documents into per-day documents"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count what would be split"
+    )
+    asyncio.run(migrate_attendance_daily(parser.parse_args()))
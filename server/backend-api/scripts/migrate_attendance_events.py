@@ -0,0 +1,134 @@
+"""
+Move per-student attendance history out of subjects into attendance_events.
+
+    python scripts/migrate_attendance_events.py
+    python scripts/migrate_attendance_events.py --dry-run
+
+Each subjects.students[].attendanceRecords entry becomes one event in the
+attendance_events time-series collection, and the arrays are then removed so
+subject documents keep only the rolling attendance counters.
+
+Subjects are migrated one at a time: the subject's previously migrated events
+are replaced before its arrays are unset, so re-running after an interruption
+neither loses nor duplicates history. Run it once the backend writing to
+attendance_events is deployed.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, UTC
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.services.attendance_events import (  # noqa: E402
+    COLLECTION,
+    attendance_event,
+    ensure_collection,
+)
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+
+def record_time(record: dict) -> datetime | None:
+    """The mark's timestamp, or midnight UTC of its date for older records."""
+    for field in ("timestamp", "date"):
+        try:
+            timestamp = datetime.fromisoformat(record[field])
+        except (KeyError, TypeError, ValueError):
+            continue
+        return timestamp if timestamp.tzinfo else timestamp.replace(tzinfo=UTC)
+    return None
+
+
+async def document_size(db, subject_id) -> int:
+    sizes = await db.subjects.aggregate(
+        [
+            {"$match": {"_id": subject_id}},
+            {"$project": {"size": {"$bsonSize": "$$ROOT"}}},
+        ]
+    ).to_list(length=1)
+    return sizes[0]["size"] if sizes else 0
+
+
+def subject_events(subject: dict) -> list[dict]:
+    events = []
+    for student in subject.get("students", []):
+        for record in student.get("attendanceRecords") or []:
+            timestamp = record_time(record)
+            if timestamp is None:
+                print(f"Skipping undated record in subject {subject['_id']}")
+                continue
+            event = attendance_event(
+                subject_id=subject["_id"],
+                student_id=student["student_id"],
+                record_date=record.get("date") or timestamp.date().isoformat(),
+                status=record.get("status", "Present"),
+                method=record.get("method", "qr"),
+                timestamp=timestamp,
+            )
+            # Marks migrated ones, so a re-run can replace them
+            event["meta"]["migrated"] = True
+            events.append(event)
+    return events
+
+
+async def migrate_attendance_events(args):
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+    if not args.dry_run:
+        await ensure_collection(db)
+
+    subjects = moved = 0
+    bytes_before = bytes_after = 0
+    cursor = db.subjects.find(
+        {"students.attendanceRecords": {"$exists": True}},
+        {"students.student_id": 1, "students.attendanceRecords": 1},
+    )
+    async for subject in cursor:
+        events = subject_events(subject)
+        subjects += 1
+        moved += len(events)
+        if args.dry_run:
+            continue
+
+        bytes_before += await document_size(db, subject["_id"])
+
+        await db[COLLECTION].delete_many(
+            {"meta.subjectId": subject["_id"], "meta.migrated": True}
+        )
+        if events:
+            await db[COLLECTION].insert_many(events, ordered=False)
+        await db.subjects.update_one(
+            {"_id": subject["_id"]},
+            {"$unset": {"students.$[].attendanceRecords": ""}},
+        )
+
+        bytes_after += await document_size(db, subject["_id"])
+
+    if args.dry_run:
+        print(f"Would move {moved} records from {subjects} subjects.")
+        return
+    print(f"Moved {moved} records from {subjects} subjects to {COLLECTION}.")
+    if subjects:
+        print(
+            f"Subject documents: {bytes_before / 2**10:.1f} KiB -> "
+            f"{bytes_after / 2**10:.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Move subject attendance history to attendance_events"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count what would be moved"
+    )
+    asyncio.run(migrate_attendance_events(parser.parse_args()))
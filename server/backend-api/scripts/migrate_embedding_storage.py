@@ -0,0 +1,103 @@
+"""
+Convert stored student face embeddings to another storage format.
+
+    python scripts/migrate_embedding_storage.py --format int8
+
+Rewrites students.face_embeddings as float lists ("list") or BSON binary
+float32 / float16 / int8 (defaults to EMBEDDING_STORAGE_FORMAT). Students
+already in the target format are skipped, so re-running resumes where it
+stopped. Converting to a lower precision is lossy; keep a database backup
+if you may want to go back.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.core.config import EMBEDDING_STORAGE_FORMAT  # noqa: E402
+from app.utils.embedding_codec import (  # noqa: E402
+    EMBEDDING_FORMATS,
+    storage_format,
+    to_storage,
+)
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+
+def encoded_size(embeddings):
+    return sum(len(e) if isinstance(e, bytes) else 8 * len(e) for e in embeddings)
+
+
+async def migrate_embedding_storage(args):
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+
+    converted = skipped = 0
+    bytes_before = bytes_after = 0
+    updates = []
+    cursor = db.students.find(
+        {"face_embeddings": {"$exists": True, "$ne": []}},
+        {"face_embeddings": 1, "embedding_version": 1},
+    ).batch_size(args.batch_size)
+    async for student in cursor:
+        embeddings = student["face_embeddings"]
+        if all(storage_format(e) == args.format for e in embeddings):
+            skipped += 1
+            continue
+
+        stored = [to_storage(e, args.format) for e in embeddings]
+        bytes_before += encoded_size(embeddings)
+        bytes_after += encoded_size(stored)
+        # Guard against the student enrolling a new face meanwhile
+        updates.append(
+            UpdateOne(
+                {
+                    "_id": student["_id"],
+                    "embedding_version": student.get("embedding_version"),
+                    "face_embeddings": {"$size": len(embeddings)},
+                },
+                {"$set": {"face_embeddings": stored}},
+            )
+        )
+        if len(updates) >= args.batch_size:
+            converted += (
+                await db.students.bulk_write(updates, ordered=False)
+            ).modified_count
+            print(f"Converted {converted} students...")
+            updates = []
+    if updates:
+        converted += (
+            await db.students.bulk_write(updates, ordered=False)
+        ).modified_count
+
+    print(
+        f"Migration complete: {converted} students converted to {args.format}, "
+        f"{skipped} already {args.format}."
+    )
+    if bytes_before:
+        print(
+            f"Embedding payload: {bytes_before / 2**20:.1f} MiB -> "
+            f"{bytes_after / 2**20:.1f} MiB"
+        )
+    client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert stored face embeddings to another storage format"
+    )
+    parser.add_argument(
+        "--format", choices=EMBEDDING_FORMATS, default=EMBEDDING_STORAGE_FORMAT
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    asyncio.run(migrate_embedding_storage(parser.parse_args()))
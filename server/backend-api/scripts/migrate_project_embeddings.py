@@ -0,0 +1,182 @@
+"""
+Re-project stored student face embeddings with a learned projection.
+
+    python scripts/migrate_project_embeddings.py pca-128-v1 --dim 128
+
+1. Fits projection VERSION in the ML service on a random sample of raw
+   embeddings (skipped if the version already exists).
+2. Copies each student's raw embeddings to face_embeddings_backup.
+3. Replaces face_embeddings with the projected embeddings (stored as
+   EMBEDDING_STORAGE_FORMAT) and sets embedding_version. Re-running resumes
+   where it stopped.
+
+Afterwards set EMBEDDING_PROJECTION_VERSION=VERSION on the ML service,
+restart it and rebuild the face index (scripts/build_face_index.py).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.core.config import EMBEDDING_STORAGE_FORMAT  # noqa: E402
+from app.services.ml_client import ml_client  # noqa: E402
+from app.utils.embedding_codec import decode_embedding, to_storage  # noqa: E402
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+# Only raw (never projected) embeddings can be re-projected
+RAW_FILTER = {
+    "face_embeddings": {"$exists": True, "$ne": []},
+    "embedding_version": None,
+}
+
+
+async def ensure_projection(db, args):
+    response = await ml_client.get_projection(args.version)
+    if response.get("success"):
+        print(f"Using existing projection {args.version}.")
+        return response["projection"]
+
+    sample = []
+    if args.method == "pca":
+        pipeline = [
+            {"$match": RAW_FILTER},
+            {"$unwind": "$face_embeddings"},
+            {"$sample": {"size": args.sample}},
+            {"$project": {"_id": 0, "embedding": "$face_embeddings"}},
+        ]
+        sample = [doc["embedding"] async for doc in db.students.aggregate(pipeline)]
+        print(f"Fitting PCA on {len(sample)} sampled embeddings...")
+
+    input_dim = None
+    if args.method == "random":
+        student = await db.students.find_one(RAW_FILTER, {"face_embeddings": 1})
+        if student is None:
+            raise Exception("No raw embeddings to size the random projection")
+        input_dim = len(decode_embedding(student["face_embeddings"][0], "float32"))
+
+    response = await ml_client.fit_projection(
+        args.version, sample, dim=args.dim, method=args.method, input_dim=input_dim
+    )
+    if not response.get("success"):
+        raise Exception(response.get("error", "Projection fit failed"))
+    print(f"Stored projection {args.version}.")
+    return response["projection"]
+
+
+async def migrate_batch(db, version, students):
+    embeddings = [e for s in students for e in s["face_embeddings"]]
+    response = await ml_client.project_embeddings(version, embeddings)
+    if not response.get("success"):
+        raise Exception(response.get("error", "Projection failed"))
+    projected = response["embeddings"]
+
+    now = datetime.now(timezone.utc)
+    backups = []
+    updates = []
+    offset = 0
+    for student in students:
+        count = len(student["face_embeddings"])
+        backups.append(
+            UpdateOne(
+                {"userId": student["userId"]},
+                {
+                    "$setOnInsert": {
+                        "userId": student["userId"],
+                        "face_embeddings": student["face_embeddings"],
+                        "backed_up_at": now,
+                    }
+                },
+                upsert=True,
+            )
+        )
+        # Guard against the student enrolling a new face meanwhile
+        updates.append(
+            UpdateOne(
+                {
+                    "_id": student["_id"],
+                    "embedding_version": None,
+                    "face_embeddings": {"$size": count},
+                },
+                {
+                    "$set": {
+                        "face_embeddings": [
+                            to_storage(e, EMBEDDING_STORAGE_FORMAT)
+                            for e in projected[offset : offset + count]
+                        ],
+                        "embedding_version": version,
+                    }
+                },
+            )
+        )
+        offset += count
+
+    await db.face_embeddings_backup.bulk_write(backups, ordered=False)
+    result = await db.students.bulk_write(updates, ordered=False)
+    return result.modified_count
+
+
+async def migrate_project_embeddings(args):
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+
+    projection = await ensure_projection(db, args)
+    print(
+        f"Projection {projection['version']}: "
+        f"{projection['input_dim']} -> {projection['output_dim']} dims"
+    )
+
+    skipped = await db.students.count_documents(
+        {
+            "face_embeddings": {"$exists": True, "$ne": []},
+            "embedding_version": {"$nin": [None, args.version]},
+        }
+    )
+    if skipped:
+        print(f"Skipping {skipped} students projected with another version.")
+
+    migrated = 0
+    batch = []
+    cursor = db.students.find(
+        RAW_FILTER, {"userId": 1, "face_embeddings": 1}
+    ).batch_size(args.batch_size)
+    async for student in cursor:
+        batch.append(student)
+        if len(batch) >= args.batch_size:
+            migrated += await migrate_batch(db, args.version, batch)
+            print(f"Re-projected {migrated} students...")
+            batch = []
+    if batch:
+        migrated += await migrate_batch(db, args.version, batch)
+
+    print(f"Migration complete: {migrated} students re-projected.")
+    print(
+        f"Next: set EMBEDDING_PROJECTION_VERSION={args.version} on the ML service, "
+        "restart it and run scripts/build_face_index.py."
+    )
+    await ml_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-project stored face embeddings with a learned projection"
+    )
+    parser.add_argument("version", help="Projection artifact version, e.g. pca-128-v1")
+    parser.add_argument("--method", choices=["pca", "random"], default="pca")
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument(
+        "--sample", type=int, default=2000, help="Embeddings sampled to fit PCA"
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    asyncio.run(migrate_project_embeddings(parser.parse_args()))
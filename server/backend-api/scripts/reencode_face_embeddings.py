@@ -0,0 +1,164 @@
+"""
+Re-encode student face embeddings computed from an outdated face crop.
+
+    python scripts/reencode_face_embeddings.py
+    python scripts/reencode_face_embeddings.py --dry-run
+
+Embeddings only match when they come from the same kind of face crop, and the
+ML service reports its crop as metadata.crop_version (FACE_CROP_VERSION).
+Crop version 2 fixed detector boxes that cropped the wrong region, so every
+embedding enrolled before it (stored without crop_version) is stale.
+
+Each stale student is re-encoded from their stored photo (image_url), which
+replaces their embeddings. Students without a photo, or whose photo no longer
+encodes, keep their old embeddings and are flagged needs_reenrollment until
+they upload a new one. Re-running resumes where it stopped; flagged students
+are skipped unless --retry-flagged is given.
+
+Afterwards rebuild the face index (scripts/build_face_index.py).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+load_dotenv()
+
+from app.core.config import EMBEDDING_STORAGE_FORMAT, MAX_FACE_EMBEDDINGS  # noqa: E402
+from app.services.ml_client import ml_client  # noqa: E402
+from app.services.students import ENROLL_ENCODE_OPTIONS, enrollment_update  # noqa: E402
+from app.utils.embedding_codec import to_storage  # noqa: E402
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+DB_NAME = os.getenv("MONGO_DB", "smart_attendance")
+
+PROJECTION = {"userId": 1, "image_url": 1, "embedding_rev": 1}
+
+
+def stale_query(crop_version: int, retry_flagged: bool = False) -> dict:
+    """Students with embeddings from a crop older than ``crop_version``."""
+    query = {
+        "face_embeddings": {"$exists": True, "$ne": []},
+        "crop_version": {"$not": {"$gte": crop_version}},
+    }
+    if not retry_flagged:
+        query["needs_reenrollment"] = {"$ne": True}
+    return query
+
+
+async def reencode_student(db, http, student: dict, crop_version: int) -> str:
+    """
+    Re-encode one student from their photo; returns "reencoded", "flagged"
+    or "changed" (they enrolled again meanwhile).
+    """
+    # Guard against the student uploading a new photo meanwhile
+    unchanged = {"_id": student["_id"], "embedding_rev": student.get("embedding_rev")}
+
+    response = None
+    if student.get("image_url"):
+        try:
+            photo = await http.get(student["image_url"])
+            photo.raise_for_status()
+            response = await ml_client.encode_face_bytes(
+                image_bytes=photo.content, **ENROLL_ENCODE_OPTIONS
+            )
+        except Exception as e:
+            print(f"Could not re-encode {student['userId']}: {e}")
+
+    if not response or not response.get("success"):
+        result = await db.students.update_one(
+            unchanged, {"$set": {"needs_reenrollment": True}}
+        )
+        return "flagged" if result.matched_count else "changed"
+
+    metadata = response.get("metadata") or {}
+    if (metadata.get("crop_version") or 0) < crop_version:
+        raise Exception(
+            f"ML service encodes crop version {metadata.get('crop_version')}, "
+            f"expected {crop_version}; update it first"
+        )
+
+    result = await db.students.update_one(
+        unchanged,
+        enrollment_update(
+            to_storage(response["embedding"], EMBEDDING_STORAGE_FORMAT),
+            metadata.get("quality", -1.0),
+            metadata.get("embedding_version"),
+            MAX_FACE_EMBEDDINGS,
+            crop_version=metadata["crop_version"],
+        ),
+    )
+    return "reencoded" if result.matched_count else "changed"
+
+
+async def reencode_face_embeddings(args):
+    print(f"Connecting to {MONGO_URI} / {DB_NAME}")
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[DB_NAME]
+    query = stale_query(args.crop_version, args.retry_flagged)
+
+    if args.dry_run:
+        stale = await db.students.count_documents(query)
+        no_photo = await db.students.count_documents(
+            {**query, "image_url": {"$in": [None, ""]}}
+        )
+        print(
+            f"Would re-encode {stale - no_photo} students and flag {no_photo} "
+            "without a photo."
+        )
+        return
+
+    counts = {"reencoded": 0, "flagged": 0, "changed": 0}
+    async with httpx.AsyncClient(timeout=30.0) as http:
+        batch = []
+        cursor = db.students.find(query, PROJECTION).batch_size(args.batch_size)
+        async for student in cursor:
+            batch.append(student)
+            if len(batch) >= args.batch_size:
+                for outcome in await asyncio.gather(
+                    *(reencode_student(db, http, s, args.crop_version) for s in batch)
+                ):
+                    counts[outcome] += 1
+                print(f"Re-encoded {counts['reencoded']} students...")
+                batch = []
+        for outcome in await asyncio.gather(
+            *(reencode_student(db, http, s, args.crop_version) for s in batch)
+        ):
+            counts[outcome] += 1
+
+    print(
+        f"Re-encoded {counts['reencoded']} students, flagged {counts['flagged']} "
+        f"for re-enrollment, {counts['changed']} re-enrolled meanwhile."
+    )
+    print("Next: run scripts/build_face_index.py.")
+    await ml_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Re-encode face embeddings computed from an outdated face crop"
+    )
+    parser.add_argument(
+        "--crop-version",
+        type=int,
+        default=2,
+        help="FACE_CROP_VERSION of the ML service (default: 2)",
+    )
+    parser.add_argument(
+        "--retry-flagged",
+        action="store_true",
+        help="Also retry students already flagged needs_reenrollment",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=20, help="Students re-encoded concurrently"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count what would be re-encoded"
+    )
+    asyncio.run(reencode_face_embeddings(parser.parse_args()))
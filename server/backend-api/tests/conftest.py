@@ -132,6 +132,7 @@ def mock_ml_client():
     with patch("app.services.ml_client.ml_client") as mock:
         mock.close = AsyncMock()
         mock.detect_faces = AsyncMock(return_value={"success": True, "faces": []})
+        mock.detect_faces_bytes = AsyncMock(return_value={"success": True, "faces": []})
         mock.get_embeddings = AsyncMock(
             return_value={"success": True, "embeddings": []}
         )
@@ -8,6 +8,14 @@ from bson import ObjectId
 from datetime import datetime, timedelta
 
 
+def _daily(subject_id, days):
+    """attendance_daily documents (one per day) for a {date: summary} map."""
+    return [
+        {"subjectId": subject_id, "date": date, **summary}
+        for date, summary in days.items()
+    ]
+
+
 @pytest.mark.asyncio
 async def test_attendance_trend(client: AsyncClient, db, teacher_token_header):
     """Test GET /api/analytics/attendance-trend endpoint"""
@@ -45,14 +53,7 @@ async def test_attendance_trend(client: AsyncClient, db, teacher_token_header):
             "teacherId": ObjectId(),
         }
 
-    await db.attendance_daily.insert_one(
-        {
-            "classId": class_id,
-            "subjectId": subject_id,
-            "daily": daily_map,
-            "createdAt": datetime.now(),
-        }
-    )
+    await db.attendance_daily.insert_many(_daily(subject_id, daily_map))
 
     # Test the endpoint
     response = await client.get(
@@ -163,9 +164,7 @@ async def test_monthly_summary(client: AsyncClient, db, teacher_token_header):
         },
     }
 
-    await db.attendance_daily.insert_one(
-        {"classId": class_id, "subjectId": class_id, "daily": daily_map}
-    )
+    await db.attendance_daily.insert_many(_daily(class_id, daily_map))
 
     # Test without filter
     response = await client.get("/api/analytics/monthly-summary", headers=headers)
@@ -236,11 +235,10 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
             "professor_ids": [teacher_id],
         }
     )
-    await db.attendance_daily.insert_one(
-        {
-            "classId": class1_id,
-            "subjectId": class1_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            class1_id,
+            {
                 "2024-01-15": {
                     "present": 23,
                     "absent": 3,
@@ -249,7 +247,7 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
                     "percentage": 88.46,
                 }
             },
-        }
+        )
     )
 
     # Class 2: Low attendance (<75%)
@@ -262,11 +260,10 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
             "professor_ids": [teacher_id],
         }
     )
-    await db.attendance_daily.insert_one(
-        {
-            "classId": class2_id,
-            "subjectId": class2_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            class2_id,
+            {
                 "2024-01-15": {
                     "present": 15,
                     "absent": 11,
@@ -275,7 +272,7 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
                     "percentage": 57.69,
                 }
             },
-        }
+        )
     )
 
     # Class 3: Low attendance (<75%)
@@ -288,11 +285,10 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
             "professor_ids": [teacher_id],
         }
     )
-    await db.attendance_daily.insert_one(
-        {
-            "classId": class3_id,
-            "subjectId": class3_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            class3_id,
+            {
                 "2024-01-16": {
                     "present": 18,
                     "absent": 8,
@@ -301,7 +297,7 @@ async def test_class_risk(client: AsyncClient, db, teacher_token_header):
                     "percentage": 69.23,
                 }
             },
-        }
+        )
     )
 
     # Test the endpoint
@@ -352,11 +348,10 @@ async def test_class_risk_empty(client: AsyncClient, db, teacher_token_header):
             "professor_ids": [teacher_id],
         }
     )
-    await db.attendance_daily.insert_one(
-        {
-            "classId": class_id,
-            "subjectId": class_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            class_id,
+            {
                 "2024-01-15": {
                     "present": 24,
                     "absent": 2,
@@ -365,7 +360,7 @@ async def test_class_risk_empty(client: AsyncClient, db, teacher_token_header):
                     "percentage": 92.31,
                 }
             },
-        }
+        )
     )
 
     # Test the endpoint
@@ -499,34 +494,30 @@ async def test_monthly_summary_filters_to_teacher_subjects(
     )
 
     await db.attendance_daily.insert_many(
-        [
+        _daily(
+            own_subject,
             {
-                "classId": own_subject,
-                "subjectId": own_subject,
-                "daily": {
-                    "2024-01-15": {
-                        "present": 18,
-                        "absent": 8,
-                        "late": 0,
-                        "total": 26,
-                        "percentage": 69.23,
-                    }
-                },
+                "2024-01-15": {
+                    "present": 18,
+                    "absent": 8,
+                    "late": 0,
+                    "total": 26,
+                    "percentage": 69.23,
+                }
             },
+        )
+        + _daily(
+            other_subject,
             {
-                "classId": other_subject,
-                "subjectId": other_subject,
-                "daily": {
-                    "2024-01-15": {
-                        "present": 5,
-                        "absent": 21,
-                        "late": 0,
-                        "total": 26,
-                        "percentage": 19.23,
-                    }
-                },
+                "2024-01-15": {
+                    "present": 5,
+                    "absent": 21,
+                    "late": 0,
+                    "total": 26,
+                    "percentage": 19.23,
+                }
             },
-        ]
+        )
     )
 
     response = await client.get("/api/analytics/monthly-summary", headers=headers)
@@ -564,34 +555,30 @@ async def test_class_risk_filters_to_teacher_subjects(
     )
 
     await db.attendance_daily.insert_many(
-        [
+        _daily(
+            own_subject,
             {
-                "classId": own_subject,
-                "subjectId": own_subject,
-                "daily": {
-                    "2024-01-15": {
-                        "present": 18,
-                        "absent": 8,
-                        "late": 0,
-                        "total": 26,
-                        "percentage": 69.23,
-                    }
-                },
+                "2024-01-15": {
+                    "present": 18,
+                    "absent": 8,
+                    "late": 0,
+                    "total": 26,
+                    "percentage": 69.23,
+                }
             },
+        )
+        + _daily(
+            other_subject,
             {
-                "classId": other_subject,
-                "subjectId": other_subject,
-                "daily": {
-                    "2024-01-15": {
-                        "present": 3,
-                        "absent": 23,
-                        "late": 0,
-                        "total": 26,
-                        "percentage": 11.54,
-                    }
-                },
+                "2024-01-15": {
+                    "present": 3,
+                    "absent": 23,
+                    "late": 0,
+                    "total": 26,
+                    "percentage": 11.54,
+                }
             },
-        ]
+        )
     )
 
     response = await client.get("/api/analytics/class-risk", headers=headers)
@@ -639,11 +626,10 @@ async def test_global_stats(client: AsyncClient, db, teacher_token_header):
 
     # Create attendance records for each subject
     # Subject 1: High attendance (85%)
-    await db.attendance_daily.insert_one(
-        {
-            "classId": subject1_id,
-            "subjectId": subject1_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            subject1_id,
+            {
                 "2024-01-15": {
                     "present": 22,
                     "absent": 4,
@@ -661,15 +647,14 @@ async def test_global_stats(client: AsyncClient, db, teacher_token_header):
                     "teacherId": teacher_id,
                 },
             },
-        }
+        )
     )
 
     # Subject 2: Medium attendance (70% - at risk)
-    await db.attendance_daily.insert_one(
-        {
-            "classId": subject2_id,
-            "subjectId": subject2_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            subject2_id,
+            {
                 "2024-01-15": {
                     "present": 18,
                     "absent": 8,
@@ -679,15 +664,14 @@ async def test_global_stats(client: AsyncClient, db, teacher_token_header):
                     "teacherId": teacher_id,
                 }
             },
-        }
+        )
     )
 
     # Subject 3: High attendance (90%)
-    await db.attendance_daily.insert_one(
-        {
-            "classId": subject3_id,
-            "subjectId": subject3_id,
-            "daily": {
+    await db.attendance_daily.insert_many(
+        _daily(
+            subject3_id,
+            {
                 "2024-01-15": {
                     "present": 24,
                     "absent": 2,
@@ -697,7 +681,7 @@ async def test_global_stats(client: AsyncClient, db, teacher_token_header):
                     "teacherId": teacher_id,
                 }
             },
-        }
+        )
     )
 
     # Test the endpoint
@@ -86,7 +86,7 @@ async def test_teacher_exempt_from_device_binding(client: AsyncClient, db):
 
     # 5. Attempt to mark attendance from Device A
     with patch(
-        "app.services.ml_client.ml_client.detect_faces", new_callable=AsyncMock
+        "app.services.ml_client.ml_client.detect_faces_bytes", new_callable=AsyncMock
     ) as mock_detect:
         mock_detect.return_value = {"success": True, "faces": []}
 
@@ -110,7 +110,7 @@ async def test_teacher_exempt_from_device_binding(client: AsyncClient, db):
 
     # 6. Attempt to mark attendance from Device B (different device)
     with patch(
-        "app.services.ml_client.ml_client.detect_faces", new_callable=AsyncMock
+        "app.services.ml_client.ml_client.detect_faces_bytes", new_callable=AsyncMock
     ) as mock_detect:
         mock_detect.return_value = {"success": True, "faces": []}
 
@@ -210,7 +210,7 @@ async def test_student_device_binding_enforcement(client: AsyncClient, db):
 
     # 5. First attendance from Device A (should auto-bind)
     with patch(
-        "app.services.ml_client.ml_client.detect_faces", new_callable=AsyncMock
+        "app.services.ml_client.ml_client.detect_faces_bytes", new_callable=AsyncMock
     ) as mock_detect:
         mock_detect.return_value = {"success": True, "faces": []}
 
@@ -239,7 +239,7 @@ async def test_student_device_binding_enforcement(client: AsyncClient, db):
 
     # 7. Attempt attendance from Device B (should be blocked)
     with patch(
-        "app.services.ml_client.ml_client.detect_faces", new_callable=AsyncMock
+        "app.services.ml_client.ml_client.detect_faces_bytes", new_callable=AsyncMock
     ) as mock_detect:
         mock_detect.return_value = {"success": True, "faces": []}
 
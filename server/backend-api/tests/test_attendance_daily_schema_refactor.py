@@ -37,13 +37,12 @@ async def test_save_daily_summary_schema_refactor():
         args, kwargs = mock_collection.update_one.call_args
         filter_q, update_doc = args
 
-        # 1. Verify Filter: Should be by subject/class only, NOT date
-        assert filter_q["subjectId"] == subject_id
-        assert "date" not in filter_q  # Ensure date is NOT in filter
+        # 1. Verify Filter: one document per subject per day
+        assert filter_q == {"subjectId": subject_id, "date": record_date}
 
-        # 2. Verify Update: Should set daily.{date}
-        assert f"daily.{record_date}" in update_doc["$set"]
-        daily_summary = update_doc["$set"][f"daily.{record_date}"]
+        # 2. Verify Update: summary fields at the top level, no daily map
+        daily_summary = update_doc["$set"]
+        assert not any(key.startswith("daily") for key in daily_summary)
         assert daily_summary["teacherId"] == teacher_id
         assert daily_summary["present"] == present
         assert daily_summary["absent"] == absent
@@ -0,0 +1,213 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+
+
+class _AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _face(left, track_id=1, reused=False):
+    return {
+        "track_id": track_id,
+        "location": {"top": 0, "right": left + 10, "bottom": 10, "left": left},
+        "embedding": None if reused else [1.0],
+        "embedding_reused": reused,
+    }
+
+
+@pytest.mark.asyncio
+async def test_capture_session_keeps_best_match_per_student():
+    """A student seen in several frames keeps their lowest distance."""
+    from app.services.attendance_capture import CaptureSession
+
+    alice, bob = ObjectId(), ObjectId()
+    students = [
+        {"userId": alice, "name": "Alice", "embedding_count": 1},
+        {"userId": bob, "name": "Bob", "embedding_count": 1},
+    ]
+    frames = [
+        # Frame 0: Alice uncertain, one face unrecognized
+        [
+            {"student_id": str(alice), "distance": 0.55},
+            {"student_id": None, "distance": 0.9},
+        ],
+        # Frame 1: Alice clearer, Bob appears
+        [
+            {"student_id": str(alice), "distance": 0.3},
+            {"student_id": str(bob), "distance": 0.4},
+        ],
+    ]
+
+    with (
+        patch("app.services.attendance_capture.ml_client") as mock_ml,
+        patch("app.services.attendance_capture.batch_match_subject") as mock_match,
+        patch("app.services.attendance_capture.db") as mock_db,
+    ):
+        mock_ml.track_faces_bytes = AsyncMock(
+            side_effect=[
+                {"success": True, "faces": [_face(0, 1), _face(20, 2)]},
+                {"success": True, "faces": [_face(0, 3), _face(20, 4)]},
+            ]
+        )
+        mock_match.side_effect = [
+            {"success": True, "matches": matches} for matches in frames
+        ]
+        mock_db.users.find = MagicMock(
+            side_effect=[
+                _AsyncIter([{"_id": alice, "roll": "R1"}]),
+                _AsyncIter([{"_id": bob, "roll": "R2"}]),
+            ]
+        )
+
+        session = CaptureSession("sub1", students, 0.5, 0.6)
+        first = await session.add_frame(b"frame-0")
+        second = await session.add_frame(b"frame-1")
+
+    assert [f["status"] for f in first["faces"]] == ["uncertain", "unknown"]
+    assert [u["student"]["id"] for u in first["updated"]] == [str(alice)]
+    assert [u["student"]["id"] for u in second["updated"]] == [str(alice), str(bob)]
+
+    result = session.result()
+    assert result["frames"] == 2
+    assert result["unknown"] == 1
+    assert [
+        (f["student"]["name"], f["status"], f["frame"]) for f in result["faces"]
+    ] == [
+        ("Alice", "present", 1),
+        ("Bob", "present", 1),
+    ]
+    assert result["faces"][0]["student"]["roll"] == "R1"
+    # Every frame is matched against the same candidate set (one gallery)
+    assert all(c.kwargs["students"] is students for c in mock_match.call_args_list)
+    # Rolls are looked up once per student
+    assert mock_db.users.find.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_capture_session_skips_matching_without_faces():
+    from app.services.attendance_capture import CaptureSession
+
+    with (
+        patch("app.services.attendance_capture.ml_client") as mock_ml,
+        patch("app.services.attendance_capture.batch_match_subject") as mock_match,
+    ):
+        mock_ml.track_faces_bytes = AsyncMock(
+            return_value={"success": True, "faces": []}
+        )
+        session = CaptureSession(
+            "sub1", [{"userId": ObjectId(), "name": "A"}], 0.5, 0.6
+        )
+        update = await session.add_frame(b"frame")
+
+    assert update["faces"] == [] and update["updated"] == []
+    mock_match.assert_not_called()
+
+
+def test_mark_stream_fuses_frames_over_websocket():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    alice = ObjectId()
+    subject = {"_id": ObjectId(), "students": []}
+    students = [{"userId": alice, "name": "Alice", "embedding_count": 1}]
+
+    with (
+        patch("app.api.routes.attendance._authorize_mark", new=AsyncMock()),
+        patch(
+            "app.api.routes.attendance._load_mark_subject",
+            new=AsyncMock(return_value=subject),
+        ),
+        patch(
+            "app.api.routes.attendance._load_candidates",
+            new=AsyncMock(return_value=students),
+        ),
+        patch("app.services.attendance_capture.ml_client") as mock_ml,
+        patch("app.services.attendance_capture.batch_match_subject") as mock_match,
+        patch("app.services.attendance_capture.db") as mock_db,
+    ):
+        mock_ml.end_tracking = AsyncMock()
+        mock_ml.track_faces_bytes = AsyncMock(
+            side_effect=[
+                {"success": False, "error": "Invalid image"},
+                {"success": True, "faces": [_face(0)]},
+            ]
+        )
+        mock_match.return_value = {
+            "success": True,
+            "matches": [{"student_id": str(alice), "distance": 0.2}],
+        }
+        mock_db.users.find = MagicMock(return_value=_AsyncIter([]))
+
+        with TestClient(app).websocket_connect("/api/attendance/mark/stream") as ws:
+            ws.send_json(
+                {"token": "t", "device_id": "d", "subject_id": str(subject["_id"])}
+            )
+            assert ws.receive_json()["type"] == "ready"
+
+            ws.send_bytes(b"broken")
+            assert ws.receive_json() == {
+                "type": "frame",
+                "frame": 0,
+                "error": "Invalid image",
+            }
+            ws.send_bytes(b"frame")
+            assert ws.receive_json()["updated"][0]["student"]["name"] == "Alice"
+
+            ws.send_json({"type": "end"})
+            result = ws.receive_json()
+
+    assert result["type"] == "result"
+    assert result["frames"] == 2
+    assert result["count"] == 1
+    mock_ml.end_tracking.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_capture_session_reuses_matches_of_tracked_faces():
+    """Faces whose ML track kept its embedding are not matched again."""
+    from app.services.attendance_capture import CaptureSession
+
+    alice = ObjectId()
+    students = [{"userId": alice, "name": "Alice", "embedding_count": 1}]
+
+    with (
+        patch("app.services.attendance_capture.ml_client") as mock_ml,
+        patch("app.services.attendance_capture.batch_match_subject") as mock_match,
+        patch("app.services.attendance_capture.db") as mock_db,
+    ):
+        mock_ml.track_faces_bytes = AsyncMock(
+            side_effect=[
+                {"success": True, "faces": [_face(0, 7)]},
+                {"success": True, "faces": [_face(2, 7, reused=True)]},
+            ]
+        )
+        mock_match.return_value = {
+            "success": True,
+            "matches": [{"student_id": str(alice), "distance": 0.3}],
+        }
+        mock_db.users.find = MagicMock(return_value=_AsyncIter([]))
+
+        session = CaptureSession("sub1", students, 0.5, 0.6)
+        await session.add_frame(b"frame-0")
+        second = await session.add_frame(b"frame-1")
+
+    assert mock_match.await_count == 1
+    assert second["faces"][0]["student"]["name"] == "Alice"
+    assert second["faces"][0]["track_id"] == 7
+    assert second["updated"] == []
+    session_ids = {
+        c.kwargs["session_id"] for c in mock_ml.track_faces_bytes.call_args_list
+    }
+    assert session_ids == {session.session_id}
@@ -0,0 +1,79 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_replaces_subject_index_with_subject_date():
+    from app.services.attendance_daily import ensure_indexes
+
+    collection = MagicMock()
+    collection.drop_index = AsyncMock(side_effect=OperationFailure("not found"))
+    collection.create_index = AsyncMock()
+    database = MagicMock()
+    database.__getitem__.return_value = collection
+
+    await ensure_indexes(database)
+
+    database.__getitem__.assert_called_with("attendance_daily")
+    collection.drop_index.assert_awaited_once_with("subjectId_1")
+    (keys,), kwargs = collection.create_index.call_args
+    assert keys == [("subjectId", 1), ("date", 1)]
+    assert kwargs["unique"] is True
+
+
+def test_migration_splits_daily_map_into_days():
+    from scripts.migrate_attendance_daily import daily_documents
+
+    subject_id, teacher_id = ObjectId(), ObjectId()
+    created_at = datetime(2026, 1, 5, tzinfo=UTC)
+    doc = {
+        "_id": ObjectId(),
+        "subjectId": subject_id,
+        "createdAt": created_at,
+        "daily": {
+            "2026-02-11": {"teacherId": teacher_id, "present": 8, "total": 10},
+            "2026-01-20": {"present": 5, "absent": 5, "total": 10},
+        },
+    }
+
+    days = daily_documents(doc)
+
+    assert [d["date"] for d in days] == ["2026-01-20", "2026-02-11"]
+    assert all(d["subjectId"] == subject_id for d in days)
+    assert all(d["createdAt"] == created_at for d in days)
+    assert days[1]["teacherId"] == teacher_id
+    assert days[1]["present"] == 8
+    assert "daily" not in days[0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "endpoint", ["get_monthly_summary", "get_class_risk", "get_global_stats"]
+)
+async def test_analytics_skip_map_schema_documents(endpoint):
+    from app.api.routes import analytics
+
+    teacher_id, subject_id = ObjectId(), ObjectId()
+    aggregate = MagicMock()
+    aggregate.return_value.to_list = AsyncMock(return_value=[])
+
+    with (
+        patch.object(analytics, "db") as mock_db,
+        patch.object(
+            analytics,
+            "_get_teacher_subjects",
+            AsyncMock(return_value=[{"_id": subject_id}]),
+        ),
+    ):
+        mock_db.attendance_daily.aggregate = aggregate
+        mock_db.subjects.find.return_value.to_list = AsyncMock(return_value=[])
+        kwargs = {"classId": None} if endpoint == "get_monthly_summary" else {}
+        await getattr(analytics, endpoint)(
+            current_user={"role": "teacher", "id": str(teacher_id)}, **kwargs
+        )
+
+    (pipeline,) = aggregate.call_args.args
+    assert pipeline[0]["$match"]["date"] == {"$exists": True}
@@ -0,0 +1,83 @@
+import pytest
+from datetime import datetime, UTC
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+from pymongo.errors import CollectionInvalid
+
+
+@pytest.mark.asyncio
+async def test_record_event_writes_one_time_series_document():
+    from app.services.attendance_events import record_event
+
+    subject_id, student_id = ObjectId(), ObjectId()
+    events = MagicMock()
+    events.insert_one = AsyncMock()
+
+    with patch("app.services.attendance_events.db") as mock_db:
+        mock_db.__getitem__.return_value = events
+        await record_event(
+            subject_id=subject_id,
+            student_id=student_id,
+            record_date="2026-02-11",
+            status="Present",
+            method="qr",
+        )
+
+    mock_db.__getitem__.assert_called_with("attendance_events")
+    (event,) = events.insert_one.call_args.args
+    assert event["meta"] == {"subjectId": subject_id, "studentId": student_id}
+    assert isinstance(event["timestamp"], datetime)
+    assert event["date"] == "2026-02-11"
+    assert event["status"] == "Present"
+
+
+@pytest.mark.asyncio
+async def test_ensure_collection_is_idempotent():
+    from app.services.attendance_events import ensure_collection
+
+    database = MagicMock()
+    database.create_collection = AsyncMock(side_effect=CollectionInvalid("exists"))
+    events = MagicMock()
+    events.create_index = AsyncMock()
+    database.__getitem__.return_value = events
+
+    await ensure_collection(database)
+
+    options = database.create_collection.call_args.kwargs["timeseries"]
+    assert options["timeField"] == "timestamp"
+    assert options["metaField"] == "meta"
+    indexed = [call.args[0] for call in events.create_index.call_args_list]
+    assert [("meta.subjectId", 1), ("timestamp", 1)] in indexed
+    assert [("meta.studentId", 1), ("timestamp", 1)] in indexed
+
+
+def test_migration_turns_history_into_events():
+    from scripts.migrate_attendance_events import subject_events
+
+    subject_id, student_id = ObjectId(), ObjectId()
+    subject = {
+        "_id": subject_id,
+        "students": [
+            {
+                "student_id": student_id,
+                "attendanceRecords": [
+                    {
+                        "date": "2026-02-10",
+                        "status": "Present",
+                        "timestamp": "2026-02-10T09:05:00+00:00",
+                        "method": "qr",
+                    },
+                    {"date": "2026-02-11", "status": "Present"},
+                ],
+            },
+            {"student_id": ObjectId()},
+        ],
+    }
+
+    events = subject_events(subject)
+
+    assert [e["date"] for e in events] == ["2026-02-10", "2026-02-11"]
+    assert events[0]["timestamp"] == datetime(2026, 2, 10, 9, 5, tzinfo=UTC)
+    assert events[1]["timestamp"] == datetime(2026, 2, 11, tzinfo=UTC)
+    assert all(e["meta"]["studentId"] == student_id for e in events)
+    assert all(e["meta"]["migrated"] for e in events)
@@ -0,0 +1,242 @@
+import zipfile
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+
+
+class _AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _write_inputs(tmp_path):
+    archive = tmp_path / "photos.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        for name in ("r1.jpg", "r2.jpg", "r3.jpg", "blurry.jpg"):
+            zf.writestr(name, name.encode())
+    roster = tmp_path / "roster.csv"
+    roster.write_text(
+        "roll,image,name\n"
+        "R1,r1.jpg,Alice\n"
+        "R2,r2.jpg,Bob\n"
+        "R3,r3.jpg,Carol\n"
+        "R4,blurry.jpg,Dan\n"
+        "R5,missing.jpg,Eve\n"
+        "R9,r1.jpg,Nobody\n"
+    )
+    return archive, roster
+
+
+def _encode(image_bytes, **options):
+    if image_bytes == b"blurry.jpg":
+        return {"success": False, "error": "Face too blurry, dark or turned away"}
+    return {"success": True, "embedding": [0.1, 0.2], "metadata": {"quality": 0.8}}
+
+
+def _db(students):
+    db = MagicMock()
+    db.students.find = MagicMock(
+        side_effect=lambda query, projection: _AsyncIter(
+            [
+                s
+                for s in students
+                if s["roll"] in query.get("roll", {}).get("$in", [])
+                or s["userId"] in query.get("userId", {}).get("$in", [])
+            ]
+        )
+    )
+    db.students.bulk_write = AsyncMock()
+    return db
+
+
+@pytest.mark.asyncio
+async def test_bulk_enrollment_batches_writes_and_resumes(tmp_path):
+    from app.services.bulk_enrollment import BulkEnrollment, ImageArchive, read_roster
+
+    archive, roster = _write_inputs(tmp_path)
+    students = [
+        {"roll": f"R{i}", "userId": ObjectId(), "face_embeddings": [[0.1, 0.2]]}
+        for i in range(1, 6)
+    ]
+    db = _db(students)
+    state = tmp_path / "state.jsonl"
+
+    with patch("app.services.bulk_enrollment.ml_client") as mock_ml:
+        mock_ml.encode_face_bytes = AsyncMock(side_effect=_encode)
+        mock_ml.update_face_index = AsyncMock(return_value={"success": True})
+
+        report = await BulkEnrollment(
+            db, ImageArchive(str(archive)), str(state), concurrency=3, batch_size=2
+        ).run(read_roster(str(roster)))
+
+        assert report.total == 6
+        assert report.enrolled == 3
+        assert set(report.failed) == {"R4", "R5", "R9"}
+        assert "blurry" in report.failed["R4"]
+        assert "missing.jpg" in report.failed["R5"]
+        # Three students in batches of two: two bulk writes, unordered
+        assert db.students.bulk_write.await_count == 2
+        assert all(
+            c.kwargs["ordered"] is False for c in db.students.bulk_write.call_args_list
+        )
+        written = [
+            op._filter["userId"]
+            for c in db.students.bulk_write.call_args_list
+            for op in c.args[0]
+        ]
+        assert sorted(map(str, written)) == sorted(
+            str(s["userId"]) for s in students[:3]
+        )
+        # Enrollment photos use the same ML options as a single upload
+        assert mock_ml.encode_face_bytes.call_args.kwargs["validate_single"] is True
+        assert mock_ml.update_face_index.await_count == 2
+
+        # Re-running skips the enrolled students and retries the failures
+        db.students.bulk_write.reset_mock()
+        mock_ml.encode_face_bytes.reset_mock()
+        rerun = await BulkEnrollment(db, ImageArchive(str(archive)), str(state)).run(
+            read_roster(str(roster))
+        )
+
+    assert rerun.skipped == 3
+    assert rerun.enrolled == 0
+    assert mock_ml.encode_face_bytes.await_count == 1  # blurry.jpg again
+    db.students.bulk_write.assert_not_awaited()
+
+
+def test_read_roster_requires_roll_and_image_columns(tmp_path):
+    from app.services.bulk_enrollment import read_roster
+
+    roster = tmp_path / "roster.csv"
+    roster.write_text("roll,photo\nR1,r1.jpg\n")
+    with pytest.raises(ValueError, match="image"):
+        read_roster(str(roster))
+
+
+def test_enrollment_update_keeps_new_and_best_earlier_embeddings():
+    from app.services.students import enrollment_update
+
+    pipeline = enrollment_update([0.5], 0.9, "pca-128", 2)
+    kept = pipeline[0]["$set"]["_kept"]["$sortArray"]
+    assert kept["sortBy"] == {"q": -1}
+    new, earlier = kept["input"]["$concatArrays"]
+    # The uploaded embedding is always kept, whatever its quality
+    assert new == {"$literal": [{"e": [0.5], "q": 0.9}]}
+    assert earlier["$slice"][1] == 1
+    assert earlier["$slice"][0]["$sortArray"]["sortBy"] == {"q": -1}
+    fields = pipeline[1]["$set"]
+    # No photo uploaded: the stored image_url is left alone
+    assert "image_url" not in fields
+    assert fields["embedding_version"] == "pca-128"
+    assert "embedding_rev" in fields
+
+
+def test_enrollment_update_starts_over_on_a_new_crop_version():
+    from app.services.students import enrollment_update
+
+    pipeline = enrollment_update([0.5], 0.9, None, 2, crop_version=2)
+    earlier = pipeline[0]["$set"]["_kept"]["$sortArray"]["input"]["$concatArrays"][1]
+    same_version = earlier["$slice"][0]["$sortArray"]["input"]["$cond"][0]
+    assert {"$eq": [{"$ifNull": ["$crop_version", None]}, 2]} in same_version["$and"]
+    assert pipeline[1]["$set"]["crop_version"] == 2
+    assert "needs_reenrollment" in pipeline[2]["$unset"]
+
+
+def _photo_client(content=b"photo"):
+    http = MagicMock()
+    response = MagicMock(content=content)
+    http.get = AsyncMock(return_value=response)
+    return http
+
+
+def _students_db(matched=1):
+    db = MagicMock()
+    db.students.update_one = AsyncMock(return_value=MagicMock(matched_count=matched))
+    return db
+
+
+@pytest.mark.asyncio
+async def test_reencode_replaces_stale_embeddings_from_the_stored_photo():
+    from scripts.reencode_face_embeddings import reencode_student
+
+    student = {"_id": ObjectId(), "userId": ObjectId(), "image_url": "https://x/p.jpg"}
+    db = _students_db()
+    http = _photo_client()
+
+    with patch("scripts.reencode_face_embeddings.ml_client") as mock_ml:
+        mock_ml.encode_face_bytes = AsyncMock(
+            return_value={
+                "success": True,
+                "embedding": [0.1, 0.2],
+                "metadata": {"quality": 0.7, "crop_version": 2},
+            }
+        )
+        outcome = await reencode_student(db, http, student, 2)
+
+    assert outcome == "reencoded"
+    http.get.assert_awaited_once_with("https://x/p.jpg")
+    assert mock_ml.encode_face_bytes.call_args.kwargs["image_bytes"] == b"photo"
+    query, pipeline = db.students.update_one.call_args.args
+    # Skipped if the student uploaded a new photo meanwhile
+    assert query == {"_id": student["_id"], "embedding_rev": None}
+    assert pipeline[1]["$set"]["crop_version"] == 2
+    # The photo is unchanged, so image_url is left alone
+    assert "image_url" not in pipeline[1]["$set"]
+
+
+@pytest.mark.asyncio
+async def test_reencode_flags_students_without_a_usable_photo():
+    from scripts.reencode_face_embeddings import reencode_student
+
+    db = _students_db()
+    with patch("scripts.reencode_face_embeddings.ml_client") as mock_ml:
+        mock_ml.encode_face_bytes = AsyncMock(return_value={"success": False})
+        no_photo = await reencode_student(
+            db, _photo_client(), {"_id": ObjectId(), "userId": ObjectId()}, 2
+        )
+        bad_photo = await reencode_student(
+            db,
+            _photo_client(),
+            {"_id": ObjectId(), "userId": ObjectId(), "image_url": "https://x/p.jpg"},
+            2,
+        )
+
+    assert (no_photo, bad_photo) == ("flagged", "flagged")
+    mock_ml.encode_face_bytes.assert_awaited_once()
+    for call in db.students.update_one.call_args_list:
+        assert call.args[1] == {"$set": {"needs_reenrollment": True}}
+
+
+@pytest.mark.asyncio
+async def test_reencode_refuses_an_ml_service_on_the_old_crop():
+    from scripts.reencode_face_embeddings import reencode_student
+
+    db = _students_db()
+    student = {"_id": ObjectId(), "userId": ObjectId(), "image_url": "https://x/p.jpg"}
+    with patch("scripts.reencode_face_embeddings.ml_client") as mock_ml:
+        mock_ml.encode_face_bytes = AsyncMock(
+            return_value={"success": True, "embedding": [0.1], "metadata": {}}
+        )
+        with pytest.raises(Exception, match="crop version"):
+            await reencode_student(db, _photo_client(), student, 2)
+
+    db.students.update_one.assert_not_awaited()
+
+
+def test_stale_query_skips_flagged_students_unless_retried():
+    from scripts.reencode_face_embeddings import stale_query
+
+    query = stale_query(2)
+    assert query["crop_version"] == {"$not": {"$gte": 2}}
+    assert query["needs_reenrollment"] == {"$ne": True}
+    assert "needs_reenrollment" not in stale_query(2, retry_flagged=True)
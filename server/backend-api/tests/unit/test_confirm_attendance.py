@@ -0,0 +1,162 @@
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+
+
+@pytest.mark.asyncio
+async def test_confirm_is_one_subject_write_and_summary_in_one_transaction():
+    """Class size does not change the number of writes a confirmation makes."""
+    from app.api.routes import attendance
+
+    subject_id = ObjectId()
+    present = [str(ObjectId()) for _ in range(40)]
+    absent = [str(ObjectId()) for _ in range(20)]
+    session = object()
+
+    @asynccontextmanager
+    async def transaction(client):
+        yield session
+
+    with (
+        patch.object(attendance, "db") as mock_db,
+        patch.object(attendance, "transaction", transaction),
+        patch("app.services.attendance_daily.db") as mock_daily_db,
+    ):
+        mock_db.subjects.find_one = AsyncMock(
+            return_value={"_id": subject_id, "professor_ids": [ObjectId()]}
+        )
+        mock_db.subjects.update_one = AsyncMock()
+        summaries = MagicMock()
+        summaries.update_one = AsyncMock()
+        mock_daily_db.__getitem__.return_value = summaries
+
+        response = await attendance.confirm_attendance(
+            {
+                "subject_id": str(subject_id),
+                "present_students": present,
+                "absent_students": absent,
+            }
+        )
+
+    assert response == {"ok": True, "present_updated": 40, "absent_updated": 20}
+    mock_db.subjects.find_one.assert_awaited_once()
+    mock_db.subjects.update_one.assert_awaited_once()
+    (query, update), kwargs = mock_db.subjects.update_one.call_args
+    assert query["_id"] == subject_id
+    assert len(query["students.student_id"]["$in"]) == 60
+    assert isinstance(update, list)  # update pipeline, percentage included
+    assert kwargs["session"] is session
+    assert summaries.update_one.call_args.kwargs["session"] is session
+
+
+def _path(value, parts):
+    for part in parts:
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _eval(expr, doc, variables):
+    """Evaluates the aggregation operators used by _confirm_update."""
+    if isinstance(expr, str) and expr.startswith("$$"):
+        name, *rest = expr[2:].split(".")
+        return _path(variables[name], rest)
+    if isinstance(expr, str) and expr.startswith("$"):
+        return _path(doc, expr[1:].split("."))
+    if isinstance(expr, list):
+        return [_eval(e, doc, variables) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+    if not (len(expr) == 1 and next(iter(expr)).startswith("$")):
+        return {k: _eval(v, doc, variables) for k, v in expr.items()}
+
+    ((op, args),) = expr.items()
+    if op == "$cond":
+        condition, then, otherwise = args
+        branch = then if _eval(condition, doc, variables) else otherwise
+        return _eval(branch, doc, variables)
+    if op == "$let":
+        bound = {k: _eval(v, doc, variables) for k, v in args["vars"].items()}
+        return _eval(args["in"], doc, {**variables, **bound})
+    if op == "$map":
+        return [
+            _eval(args["in"], doc, {**variables, args["as"]: item})
+            for item in _eval(args["input"], doc, variables)
+        ]
+
+    values = _eval(args, doc, variables)
+    if op == "$mergeObjects":
+        return {k: v for value in values for k, v in value.items()}
+    return {
+        "$add": lambda: sum(values),
+        "$ifNull": lambda: values[0] if values[0] is not None else values[1],
+        "$ne": lambda: values[0] != values[1],
+        "$in": lambda: values[0] in values[1],
+        "$and": lambda: all(values),
+        "$not": lambda: not values[0],
+        "$gt": lambda: values[0] > values[1],
+        "$multiply": lambda: values[0] * values[1],
+        "$divide": lambda: values[0] / values[1],
+        "$round": lambda: round(values[0], values[1]),
+    }[op]()
+
+
+def test_confirm_update_counts_and_recomputes_percentage():
+    from app.api.routes.attendance import _confirm_update
+
+    today = "2026-02-11"
+    present, first_time, absent, again, unlisted = (ObjectId() for _ in range(5))
+    subject = {
+        "students": [
+            {
+                "student_id": present,
+                "attendance": {
+                    "present": 3,
+                    "absent": 1,
+                    "total": 4,
+                    "lastMarkedAt": "2026-02-10",
+                },
+            },
+            {"student_id": first_time},
+            {
+                "student_id": absent,
+                "attendance": {"present": 2, "absent": 0, "total": 2},
+            },
+            {
+                "student_id": again,
+                "attendance": {
+                    "present": 1,
+                    "absent": 0,
+                    "total": 1,
+                    "lastMarkedAt": today,
+                },
+            },
+            {"student_id": unlisted, "attendance": {"present": 2, "total": 2}},
+        ]
+    }
+
+    (stage,) = _confirm_update([present, first_time, again], [absent], today)
+    students = _eval(stage["$set"]["students"], subject, {})
+    by_id = {s["student_id"]: s["attendance"] for s in students}
+
+    assert by_id[present] == {
+        "present": 4,
+        "absent": 1,
+        "total": 5,
+        "lastMarkedAt": today,
+        "percentage": 80.0,
+    }
+    assert by_id[first_time] == {
+        "present": 1,
+        "absent": 0,
+        "total": 1,
+        "lastMarkedAt": today,
+        "percentage": 100.0,
+    }
+    assert by_id[absent]["absent"] == 1
+    assert by_id[absent]["total"] == 3
+    assert by_id[absent]["percentage"] == 66.67
+    # Already marked today: counters unchanged
+    assert by_id[again]["total"] == 1
+    assert by_id[again]["present"] == 1
+    assert by_id[unlisted] == {"present": 2, "total": 2}
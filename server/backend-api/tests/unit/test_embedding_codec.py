@@ -0,0 +1,80 @@
+import base64
+import struct
+
+import pytest
+from bson.binary import Binary
+
+from app.utils.embedding_codec import (
+    decode_embedding,
+    encode_embedding,
+    storage_format,
+    to_storage,
+)
+
+
+def test_list_format_passes_through():
+    emb = [0.5, -0.25]
+    assert encode_embedding(emb, "list") is emb
+    assert decode_embedding(emb, "float32") == emb
+
+
+def test_float32_roundtrip_is_little_endian():
+    emb = [0.5, -0.25, 1.0]
+    encoded = encode_embedding(emb, "float32")
+
+    assert base64.b64decode(encoded) == struct.pack("<3f", *emb)
+    assert decode_embedding(encoded, "float32") == emb
+
+
+def test_float16_roundtrip():
+    emb = [0.5, -0.25, 0.0103]
+    encoded = encode_embedding(emb, "float16")
+
+    assert len(base64.b64decode(encoded)) == 6
+    decoded = decode_embedding(encoded, "float16")
+    assert all(abs(a - b) < 1e-4 for a, b in zip(decoded, emb))
+
+
+def test_encoded_strings_pass_through():
+    encoded = encode_embedding([1.0], "float32")
+    assert encode_embedding(encoded, "float32") is encoded
+
+
+def test_int8_roundtrip_carries_scale():
+    emb = [0.5, -0.25, 0.0103]
+    encoded = encode_embedding(emb, "int8")
+
+    raw = base64.b64decode(encoded)
+    assert len(raw) == 4 + 3
+    assert struct.unpack_from("<f", raw)[0] == pytest.approx(0.5 / 127)
+    decoded = decode_embedding(encoded, "int8")
+    assert all(abs(a - b) <= 0.5 / 127 for a, b in zip(decoded, emb))
+
+
+@pytest.mark.parametrize("fmt,size", [("float32", 12), ("float16", 6), ("int8", 7)])
+def test_storage_binary_is_self_describing(fmt, size):
+    emb = [0.5, -0.25, 0.0103]
+    stored = to_storage(emb, fmt)
+
+    assert isinstance(stored, Binary)
+    assert len(stored) == size
+    assert storage_format(stored) == fmt
+    # Decoding ignores the requested format in favour of the stored one
+    assert decode_embedding(stored, "float32") == pytest.approx(emb, abs=4e-3)
+    assert to_storage(stored, fmt) is stored
+
+
+def test_stored_binary_is_sent_without_reencoding():
+    stored = to_storage([0.5, -0.25], "float16")
+
+    assert encode_embedding(stored, "float16") == base64.b64encode(stored).decode()
+    assert encode_embedding(stored, "list") == [0.5, -0.25]
+    assert decode_embedding(encode_embedding(stored, "float32"), "float32") == [
+        0.5,
+        -0.25,
+    ]
+
+
+def test_list_storage_decodes_binary():
+    assert to_storage(to_storage([0.5], "float32"), "list") == [0.5]
+    assert storage_format([0.5]) == "list"
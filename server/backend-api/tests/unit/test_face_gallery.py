@@ -0,0 +1,103 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from bson import ObjectId
+
+
+class _AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def test_gallery_version_changes_with_embeddings():
+    from app.services.face_gallery import gallery_version
+
+    a, b = ObjectId(), ObjectId()
+    base = gallery_version(
+        [{"userId": a, "embedding_count": 1}, {"userId": b, "embedding_count": 2}]
+    )
+
+    reordered = gallery_version(
+        [{"userId": b, "embedding_count": 2}, {"userId": a, "embedding_count": 1}]
+    )
+    enrolled = gallery_version(
+        [{"userId": a, "embedding_count": 2}, {"userId": b, "embedding_count": 2}]
+    )
+
+    reprojected = gallery_version(
+        [
+            {"userId": a, "embedding_count": 1, "embedding_version": "pca-128"},
+            {"userId": b, "embedding_count": 2, "embedding_version": "pca-128"},
+        ]
+    )
+
+    # Enrollment replaced a face: same count, new revision
+    replaced = gallery_version(
+        [
+            {"userId": a, "embedding_count": 1, "embedding_rev": 2},
+            {"userId": b, "embedding_count": 2},
+        ]
+    )
+
+    assert base == reordered
+    assert base != enrolled
+    assert base != reprojected
+    assert base != replaced
+
+
+@pytest.mark.asyncio
+async def test_batch_match_subject_uses_resident_gallery():
+    """A gallery hit must not load or upload embeddings."""
+    from app.services.face_gallery import batch_match_subject
+
+    students = [{"userId": ObjectId(), "embedding_count": 1}]
+    hit = {"success": True, "matches": []}
+
+    with (
+        patch("app.services.face_gallery.ml_client") as mock_ml,
+        patch("app.services.face_gallery.db") as mock_db,
+    ):
+        mock_ml.batch_match = AsyncMock(return_value=hit)
+        mock_ml.register_gallery = AsyncMock()
+        result = await batch_match_subject("sub1", students, [], 0.5, 0.6)
+
+    assert result == hit
+    mock_ml.register_gallery.assert_not_called()
+    mock_db.students.find.assert_not_called()
+    assert mock_ml.batch_match.call_args.kwargs["gallery_id"] == "sub1"
+
+
+@pytest.mark.asyncio
+async def test_batch_match_subject_registers_on_miss():
+    """A stale gallery is re-registered and the match retried once."""
+    from app.services.face_gallery import batch_match_subject
+
+    user_id = ObjectId()
+    students = [{"userId": user_id, "embedding_count": 1}]
+    miss = {"success": False, "error_code": "GALLERY_VERSION_MISMATCH"}
+    hit = {"success": True, "matches": []}
+
+    with (
+        patch("app.services.face_gallery.ml_client") as mock_ml,
+        patch("app.services.face_gallery.db") as mock_db,
+    ):
+        mock_ml.batch_match = AsyncMock(side_effect=[miss, hit])
+        mock_ml.register_gallery = AsyncMock(return_value={"success": True})
+        mock_db.students.find = MagicMock(
+            return_value=_AsyncIter([{"userId": user_id, "face_embeddings": [[1.0]]}])
+        )
+        result = await batch_match_subject("sub1", students, [], 0.5, 0.6)
+
+    assert result == hit
+    assert mock_ml.batch_match.call_count == 2
+    gallery_id, _, candidates = mock_ml.register_gallery.call_args.args
+    assert gallery_id == "sub1"
+    assert candidates == [{"student_id": str(user_id), "embeddings": [[1.0]]}]
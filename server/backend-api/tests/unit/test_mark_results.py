@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from bson import ObjectId
+
+
+class _AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _face(left):
+    return {"location": {"top": 0, "right": left + 10, "bottom": 10, "left": left}}
+
+
+@pytest.mark.asyncio
+async def test_mark_results_fetch_rolls_in_one_query():
+    """Every matched face's roll comes from a single users query."""
+    from app.api.routes.attendance import _mark_results
+
+    students = [
+        {"userId": ObjectId(), "name": f"Student {i}", "embedding_count": 1}
+        for i in range(60)
+    ]
+    matches = [
+        {"student_id": str(s["userId"]), "distance": 0.3, "status": "present"}
+        for s in students
+    ]
+    faces = [_face(i * 20) for i in range(60)]
+    users = [{"_id": s["userId"], "roll": f"R{i}"} for i, s in enumerate(students)]
+
+    with patch("app.api.routes.attendance.db") as mock_db:
+        mock_db.users.find = MagicMock(return_value=_AsyncIter(users))
+        results = await _mark_results(faces, matches, students)
+
+    mock_db.users.find.assert_called_once()
+    query, projection = mock_db.users.find.call_args.args
+    assert set(query["_id"]["$in"]) == {s["userId"] for s in students}
+    assert projection == {"roll": 1}
+    assert [r["student"]["roll"] for r in results] == [f"R{i}" for i in range(60)]
+    assert results[0]["box"] == {"top": 0, "right": 10, "bottom": 10, "left": 0}
+
+
+@pytest.mark.asyncio
+async def test_mark_results_without_matches_skip_the_users_query():
+    from app.api.routes.attendance import _mark_results
+
+    student = {"userId": ObjectId(), "name": "Alice", "embedding_count": 1}
+    matches = [
+        {"student_id": None, "distance": 0.9, "status": "unknown"},
+        # Too far to count, even though the ML service named a student
+        {"student_id": str(student["userId"]), "distance": 0.7, "status": "unknown"},
+    ]
+
+    with patch("app.api.routes.attendance.db") as mock_db:
+        results = await _mark_results([_face(0), _face(20)], matches, [student])
+
+    mock_db.users.find.assert_not_called()
+    assert [r["status"] for r in results] == ["unknown", "unknown"]
+    assert all(r["student"] is None and r["distance"] is None for r in results)
@@ -0,0 +1,103 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.ml_client import MLClient
+from app.utils.embedding_codec import encode_embedding
+
+
+def _client_with_transport(handler) -> MLClient:
+    client = MLClient()
+    client.embedding_format = "float32"
+    client.client = httpx.AsyncClient(
+        base_url="http://ml", transport=httpx.MockTransport(handler)
+    )
+    return client
+
+
+@pytest.mark.asyncio
+async def test_encode_face_bytes_sends_raw_body():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["path"] = request.url.path
+        seen["content_type"] = request.headers["content-type"]
+        seen["body"] = request.content
+        seen["params"] = dict(request.url.params)
+        return httpx.Response(
+            200,
+            json={"success": True, "embedding": encode_embedding([0.5], "float32")},
+        )
+
+    client = _client_with_transport(handler)
+    response = await client.encode_face_bytes(b"\xff\xd8jpeg-bytes")
+    await client.close()
+
+    assert seen["path"] == "/api/ml/encode-face/raw"
+    assert seen["content_type"] == "application/octet-stream"
+    assert seen["body"] == b"\xff\xd8jpeg-bytes"
+    assert seen["params"]["embedding_format"] == "float32"
+    assert response["embedding"] == [0.5]
+
+
+@pytest.mark.asyncio
+async def test_batch_match_encodes_embeddings():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["json"] = json.loads(request.content)
+        return httpx.Response(200, json={"success": True, "matches": []})
+
+    client = _client_with_transport(handler)
+    await client.batch_match(
+        detected_faces=[{"embedding": [1.0, 0.0]}],
+        candidate_embeddings=[{"student_id": "s1", "embeddings": [[0.0, 1.0]]}],
+    )
+    await client.close()
+
+    body = seen["json"]
+    assert body["embedding_format"] == "float32"
+    assert body["detected_faces"][0]["embedding"] == encode_embedding(
+        [1.0, 0.0], "float32"
+    )
+    assert isinstance(body["candidate_embeddings"][0]["embeddings"][0], str)
+
+
+@pytest.mark.asyncio
+async def test_search_face_index_encodes_queries():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["path"] = request.url.path
+        seen["json"] = json.loads(request.content)
+        return httpx.Response(200, json={"success": True, "results": [[]]})
+
+    client = _client_with_transport(handler)
+    await client.search_face_index([[1.0, 0.0]], k=3)
+    await client.close()
+
+    assert seen["path"] == "/api/ml/index/search"
+    assert seen["json"]["k"] == 3
+    assert seen["json"]["query_embeddings"] == [encode_embedding([1.0, 0.0], "float32")]
+
+
+@pytest.mark.asyncio
+async def test_project_embeddings_decodes_results():
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/api/ml/projections/pca-2/project"
+        return httpx.Response(
+            200,
+            json={
+                "success": True,
+                "embeddings": [encode_embedding([0.6, 0.8], "float32")],
+            },
+        )
+
+    client = _client_with_transport(handler)
+    response = await client.project_embeddings("pca-2", [[1.0, 2.0, 3.0]])
+    await client.close()
+
+    assert response["embeddings"] == [
+        pytest.approx([0.6, 0.8]),
+    ]
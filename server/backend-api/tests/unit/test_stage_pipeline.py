@@ -0,0 +1,194 @@
+import asyncio
+import time
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.utils.pipeline import StagePipeline
+
+
+async def _sleep(seconds, value=None):
+    await asyncio.sleep(seconds)
+    return value
+
+
+async def _fail_after(seconds):
+    await asyncio.sleep(seconds)
+    raise HTTPException(status_code=404, detail="Subject not found")
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap_and_are_timed():
+    start = time.perf_counter()
+    async with StagePipeline() as stages:
+        a = stages.start("a", _sleep(0.1, "A"))
+        b = stages.start("b", _sleep(0.1, "B"))
+        assert await stages.result(a) == "A"
+        assert await stages.result(b) == "B"
+        assert await stages.run("c", _sleep(0, "C")) == "C"
+
+    assert time.perf_counter() - start < 0.18
+    assert set(stages.timings) == {"a", "b", "c"}
+    assert stages.timings["a"] >= 100
+
+
+@pytest.mark.asyncio
+async def test_failing_stage_cancels_the_others():
+    slow = None
+    start = time.perf_counter()
+    with pytest.raises(HTTPException) as exc:
+        async with StagePipeline() as stages:
+            slow = stages.start("slow", _sleep(5))
+            stages.start("fails", _fail_after(0.01))
+            # Waiting on the slow stage surfaces the other stage's failure
+            await stages.result(slow)
+
+    assert exc.value.status_code == 404
+    assert slow.cancelled()
+    assert time.perf_counter() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_leaving_the_pipeline_cancels_unfinished_stages():
+    async with StagePipeline() as stages:
+        pending = stages.start("unused", _sleep(5))
+
+    assert pending.cancelled()
+
+
+class _AsyncIter:
+    def __init__(self, items):
+        self._items = iter(items)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._items)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_mark_loads_candidates_while_detecting():
+    """/mark overlaps ML detection with the candidate load."""
+    from app.api.routes import attendance
+
+    subject_id, student_id = ObjectId(), ObjectId()
+    subject = {"_id": subject_id, "students": [{"student_id": student_id}]}
+    students = [{"userId": student_id, "name": "Alice", "embedding_count": 1}]
+
+    async def load_subject(*args):
+        await asyncio.sleep(0.1)
+        return subject
+
+    async def detect(*args, **kwargs):
+        await asyncio.sleep(0.1)
+        return {
+            "success": True,
+            "faces": [{"embedding": [1.0], "location": {"top": 0, "left": 0}}],
+        }
+
+    async def load_candidates(*args):
+        await asyncio.sleep(0.1)
+        return students
+
+    request = MagicMock()
+    request.headers = {"Authorization": "Bearer token", "X-Device-ID": "device"}
+
+    with (
+        patch.object(
+            attendance,
+            "_read_mark_payload",
+            AsyncMock(return_value=({"subject_id": str(subject_id)}, b"jpeg")),
+        ),
+        patch.object(
+            attendance, "decode_jwt", return_value={"user_id": "t", "role": "teacher"}
+        ),
+        patch.object(attendance, "_load_mark_subject", load_subject),
+        patch.object(attendance, "_load_candidates", load_candidates),
+        patch.object(attendance.ml_client, "detect_faces_bytes", detect),
+        patch.object(
+            attendance,
+            "batch_match_subject",
+            AsyncMock(
+                return_value={
+                    "success": True,
+                    "matches": [{"student_id": str(student_id), "distance": 0.2}],
+                }
+            ),
+        ),
+        patch.object(attendance, "db") as mock_db,
+    ):
+        mock_db.users.find = MagicMock(
+            return_value=_AsyncIter([{"_id": student_id, "roll": "R1"}])
+        )
+        response = await attendance.mark_attendance(request)
+
+    assert response["faces"][0]["student"]["roll"] == "R1"
+    timings = response["metadata"]["timings_ms"]
+    assert {"device_check", "subject", "detect", "candidates", "match"} <= set(timings)
+    # Detection ran alongside the candidate load, not after it
+    assert timings["total"] < 280
+
+
+@pytest.mark.asyncio
+async def test_mark_rejects_outside_geofence_before_detecting():
+    """A request the geofence rejects never sends its photo to the ML service."""
+    from app.api.routes import attendance
+
+    async def load_subject(*args):
+        await asyncio.sleep(0.05)  # subject lookup round trip
+        raise HTTPException(403, "Outside the geofence")
+
+    request = MagicMock()
+    request.headers = {"Authorization": "Bearer token", "X-Device-ID": "device"}
+    detect = AsyncMock()
+
+    with (
+        patch.object(
+            attendance,
+            "_read_mark_payload",
+            AsyncMock(return_value=({"subject_id": str(ObjectId())}, b"jpeg")),
+        ),
+        patch.object(
+            attendance, "decode_jwt", return_value={"user_id": "t", "role": "teacher"}
+        ),
+        patch.object(attendance, "_load_mark_subject", load_subject),
+        patch.object(attendance.ml_client, "detect_faces_bytes", detect),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await attendance.mark_attendance(request)
+
+    assert exc.value.status_code == 403
+    detect.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_mark_checks_device_before_validating_the_payload():
+    """An unbound device gets 403 even when its image is missing."""
+    from app.api.routes import attendance
+
+    request = MagicMock()
+    request.headers = {"Authorization": "Bearer token", "X-Device-ID": "device"}
+
+    with (
+        patch.object(
+            attendance, "_read_mark_payload", AsyncMock(return_value=({}, b""))
+        ),
+        patch.object(
+            attendance, "decode_jwt", return_value={"user_id": "s", "role": "student"}
+        ),
+        patch.object(
+            attendance,
+            "_check_mark_device",
+            AsyncMock(side_effect=HTTPException(403, "Device not trusted")),
+        ),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            await attendance.mark_attendance(request)
+
+    assert exc.value.status_code == 403
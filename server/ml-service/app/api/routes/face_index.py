@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends
+
+from app.schemas.requests import SearchIndexRequest, UpdateIndexRequest
+from app.schemas.responses import (
+    IndexInfo,
+    IndexMatch,
+    IndexResponse,
+    SearchIndexResponse,
+)
+from app.core.config import settings
+from app.core.constants import ERROR_PROCESSING
+from app.core.security import verify_api_key
+from app.core.workers import match_pool
+
+from app.ml.ann_index import campus_index
+from app.utils.embedding_codec import decode_embeddings
+
+router = APIRouter(
+    prefix="/api/ml/index",
+    tags=["ML Face Index"],
+    dependencies=[Depends(verify_api_key)],
+)
+
+
+def _index_info() -> IndexInfo:
+    return IndexInfo(
+        student_count=campus_index.student_count,
+        embedding_count=campus_index.embedding_count,
+        list_count=campus_index.list_count,
+        trained=campus_index.trained,
+    )
+
+
+def _update(request: UpdateIndexRequest) -> IndexResponse:
+    try:
+        fmt = request.embedding_format
+        campus_index.upsert(
+            [
+                (c.student_id, decode_embeddings(c.embeddings, fmt))
+                for c in request.upsert
+            ],
+            remove=request.remove,
+        )
+        return IndexResponse(success=True, index=_index_info())
+
+    except Exception as e:
+        return IndexResponse(success=False, error=str(e), error_code=ERROR_PROCESSING)
+
+
+def _search(request: SearchIndexRequest) -> SearchIndexResponse:
+    try:
+        queries = decode_embeddings(request.query_embeddings, request.embedding_format)
+        if not queries:
+            return SearchIndexResponse(success=True, results=[])
+
+        results = campus_index.search(queries, k=request.k, n_probe=request.n_probe)
+        return SearchIndexResponse(
+            success=True,
+            results=[
+                [
+                    IndexMatch(
+                        student_id=student_id,
+                        distance=1 - similarity,
+                        confidence=similarity,
+                    )
+                    for student_id, similarity in matches
+                ]
+                for matches in results
+            ],
+        )
+
+    except Exception as e:
+        return SearchIndexResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        )
+
+
+@router.get("", response_model=IndexResponse)
+async def get_index():
+    return IndexResponse(success=True, index=_index_info())
+
+
+@router.patch("", response_model=IndexResponse)
+async def update_index(request: UpdateIndexRequest):
+    return await match_pool.run_local("index_update", _update, request)
+
+
+@router.post("/search", response_model=SearchIndexResponse)
+async def search_index(request: SearchIndexRequest):
+    return await match_pool.run_local("index_search", _search, request)
+
+
+@router.post("/rebuild", response_model=IndexResponse)
+async def rebuild_index():
+    """Re-cluster the index cells, e.g. after many students were added."""
+    await match_pool.run_local("index_rebuild", campus_index.rebuild)
+    return IndexResponse(success=True, index=_index_info())
+
+
+@router.post("/snapshot", response_model=IndexResponse)
+async def snapshot_index():
+    """Save the index to ANN_INDEX_PATH so it survives restarts."""
+    if not settings.ANN_INDEX_PATH:
+        return IndexResponse(
+            success=False,
+            error="ANN_INDEX_PATH is not configured",
+            error_code=ERROR_PROCESSING,
+        )
+    try:
+        await match_pool.run_local(
+            "index_snapshot", campus_index.save, settings.ANN_INDEX_PATH
+        )
+        return IndexResponse(success=True, index=_index_info())
+
+    except Exception as e:
+        return IndexResponse(success=False, error=str(e), error_code=ERROR_PROCESSING)
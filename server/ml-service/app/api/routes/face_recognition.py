@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Awaitable, Callable, List, Type, TypeVar
+
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import BaseModel
 import base64
-from io import BytesIO
+import binascii
 import time
 import numpy as np
-from PIL import Image
 
 from app.schemas.requests import (
+    EncodeFaceOptions,
     EncodeFaceRequest,
+    DetectFacesOptions,
     DetectFacesRequest,
+    TrackFacesOptions,
+    TrackFacesRequest,
     MatchFacesRequest,
     BatchMatchRequest,
 )
@@ -23,39 +31,124 @@ from app.schemas.responses import (
     MatchResult,
     DistanceInfo,
     BatchMatchResult,
+    TrackedFaceInfo,
+    TrackFacesMetadata,
+    TrackFacesResponse,
 )
 from app.core.constants import (
     ERROR_NO_FACE,
     ERROR_MULTIPLE_FACES,
     ERROR_FACE_TOO_SMALL,
+    ERROR_FACE_LOW_QUALITY,
     ERROR_PROCESSING,
+    ERROR_INVALID_IMAGE,
+    ERROR_GALLERY_NOT_FOUND,
+    ERROR_GALLERY_VERSION_MISMATCH,
 )
+from app.core import tracing
 from app.core.security import verify_api_key
-
-from app.ml.face_detector import detect_faces
-from app.ml.face_encoder import get_face_embedding
-from app.ml.face_matcher import cosine_similarity
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import DETECTION_TILES, TRACKED_FACES
+from app.core.result_cache import result_cache
+from app.core.workers import image_pool, match_pool
+
+from app.ml.face_detector import FaceBox, detect_faces
+from app.ml.face_encoder import get_face_embeddings
+from app.ml.face_matcher import CandidateMatrix
+from app.ml.face_quality import assess_face
+from app.ml.face_tracker import tracker_store
+from app.ml.tiling import Tile, merge_detections, tile_grid
+from app.ml.gallery import gallery_store
+from app.ml.projection import projection_store
+from app.utils.image_utils import ImageSource
+from app.utils.embedding_codec import (
+    decode_embedding,
+    decode_embeddings,
+    encode_embedding,
+)
 
 router = APIRouter(
     prefix="/api/ml", tags=["ML"], dependencies=[Depends(verify_api_key)]
 )
 
+ResponseT = TypeVar("ResponseT", EncodeFaceResponse, DetectFacesResponse)
 
-@router.post("/encode-face", response_model=EncodeFaceResponse)
-async def encode_face(request: EncodeFaceRequest):
+# Failures that depend only on the image; other errors may be transient
+_CACHEABLE_ERRORS = {
+    ERROR_NO_FACE,
+    ERROR_MULTIPLE_FACES,
+    ERROR_FACE_TOO_SMALL,
+    ERROR_FACE_LOW_QUALITY,
+}
+
+
+@dataclass
+class _PreparedImage:
+    """A decoded request whose face crops are waiting for the embedding stage."""
+
+    options: Any
+    image_dimensions: List[int]
+    locations: List[FaceLocation]
+    area_ratios: List[float]
+    crops: List[np.ndarray]
+    qualities: List[float] = field(default_factory=list)
+    low_quality_count: int = 0
+    start: float = 0.0
+    embedding_version: str | None = None
+
+
+def _load_image(image: bytes | str) -> ImageSource:
+    """Open raw image bytes, or a base64 string from the JSON routes."""
+    if isinstance(image, str):
+        with tracing.span("base64_decode"):
+            image = base64.b64decode(image)
+    return ImageSource(image, max_side=settings.DETECTION_MAX_SIDE)
+
+
+def _detect(source: ImageSource) -> list[FaceBox]:
+    """Detect on the bounded-size image and map boxes to full resolution."""
+    image_np, scale = source.detection_image()
+    with tracing.span("detect"):
+        faces = [
+            face if isinstance(face, FaceBox) else FaceBox(face)
+            for face in detect_faces(image_np)
+        ]
+    if scale == 1.0:
+        return faces
+    return [face.scaled(scale) for face in faces]
+
+
+def _min_quality(options: EncodeFaceOptions | DetectFacesOptions) -> float:
+    if options.min_quality is not None:
+        return options.min_quality
+    return settings.FACE_MIN_QUALITY
+
+
+def _prepare_encode(
+    image: bytes | str, options: EncodeFaceOptions
+) -> EncodeFaceResponse | _PreparedImage:
     try:
-        image_bytes = base64.b64decode(request.image_base64)
-        image = Image.open(BytesIO(image_bytes)).convert("RGB")
-        image_np = np.array(image)
+        source = _load_image(image)
+    except binascii.Error as e:
+        return EncodeFaceResponse(
+            success=False, error=str(e), error_code=ERROR_INVALID_IMAGE
+        )
+    except Exception as e:
+        return EncodeFaceResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        )
 
-        faces = detect_faces(image_np)
+    try:
+        faces = _detect(source)
 
         if not faces:
             return EncodeFaceResponse(
                 success=False, error="No face detected", error_code=ERROR_NO_FACE
             )
 
-        if request.validate_single and len(faces) > 1:
+        if options.validate_single and len(faces) > 1:
             return EncodeFaceResponse(
                 success=False,
                 error="Multiple faces detected",
@@ -68,25 +161,32 @@ async def encode_face(request: EncodeFaceRequest):
         bottom = y + face_h
         left = x
 
-        im_h, im_w, _ = image_np.shape
+        im_w, im_h = source.width, source.height
         face_area = face_w * face_h
         image_area = im_h * im_w
 
-        if (face_area / image_area) < request.min_face_area_ratio:
+        if (face_area / image_area) < options.min_face_area_ratio:
             return EncodeFaceResponse(
                 success=False, error="Face too small", error_code=ERROR_FACE_TOO_SMALL
             )
 
-        face_img = image_np[top:bottom, left:right]
-        embedding = get_face_embedding(face_img)
+        with tracing.span("crop", faces=1):
+            crop = source.full[top:bottom, left:right]
+            quality = assess_face(crop, faces[0].keypoints).score
+        if quality < _min_quality(options):
+            return EncodeFaceResponse(
+                success=False,
+                error="Face too blurry, dark or turned away",
+                error_code=ERROR_FACE_LOW_QUALITY,
+            )
 
-        return EncodeFaceResponse(
-            success=True,
-            embedding=embedding,
-            face_location=FaceLocation(top=top, right=right, bottom=bottom, left=left),
-            metadata=EncodeFaceMetadata(
-                face_area_ratio=face_area / image_area, image_dimensions=[im_w, im_h]
-            ),
+        return _PreparedImage(
+            options=options,
+            image_dimensions=[im_w, im_h],
+            locations=[FaceLocation(top=top, right=right, bottom=bottom, left=left)],
+            area_ratios=[face_area / image_area],
+            crops=[crop],
+            qualities=[quality],
         )
 
     except Exception as e:
@@ -95,82 +195,230 @@ async def encode_face(request: EncodeFaceRequest):
         )
 
 
-@router.post("/detect-faces", response_model=DetectFacesResponse)
-async def detect_faces_api(request: DetectFacesRequest):
-    start = time.time()
-
+def _finish_encode(
+    prepared: _PreparedImage, embeddings: np.ndarray
+) -> EncodeFaceResponse:
+    return EncodeFaceResponse(
+        success=True,
+        embedding=encode_embedding(embeddings[0], prepared.options.embedding_format),
+        face_location=prepared.locations[0],
+        metadata=EncodeFaceMetadata(
+            face_area_ratio=prepared.area_ratios[0],
+            quality=prepared.qualities[0],
+            image_dimensions=prepared.image_dimensions,
+            embedding_version=prepared.embedding_version,
+        ),
+    )
+
+
+def _prepare_detect(
+    image: bytes | str, options: DetectFacesOptions, start: float
+) -> DetectFacesResponse | _PreparedImage:
     try:
-        image_bytes = base64.b64decode(request.image_base64)
-        image = Image.open(BytesIO(image_bytes)).convert("RGB")
-        image_np = np.array(image)
+        source = _load_image(image)
+        return _prepare_faces(source, _detect(source), options, start)
+    except Exception as e:
+        return DetectFacesResponse(success=False, error=str(e))
 
-        faces = detect_faces(image_np)
-        h, w, _ = image_np.shape
+
+def _prepare_faces(
+    source: ImageSource,
+    faces: List[FaceBox],
+    options: DetectFacesOptions,
+    start: float,
+) -> DetectFacesResponse | _PreparedImage:
+    try:
+        w, h = source.width, source.height
         image_area = h * w
 
-        detected = []
-        for x, y, cw, ch in faces:
-            # Convert to TRBL
-            top = y
-            left = x
-            bottom = y + ch
-            right = x + cw
-
-            face_area = cw * ch
-
-            if face_area / image_area < request.min_face_area_ratio:
-                continue
-
-            face_img = image_np[top:bottom, left:right]
-            embedding = get_face_embedding(face_img)
-
-            detected.append(
-                DetectedFaceInfo(
-                    embedding=embedding,
-                    location=FaceLocation(
-                        top=top, right=right, bottom=bottom, left=left
-                    ),
-                    face_area_ratio=face_area / image_area,
+        prepared = _PreparedImage(
+            options=options,
+            image_dimensions=[w, h],
+            locations=[],
+            area_ratios=[],
+            crops=[],
+            start=start,
+        )
+        min_quality = _min_quality(options)
+        with tracing.span("crop", faces=len(faces)):
+            for face in faces:
+                x, y, cw, ch = face
+                # Convert to TRBL
+                top = y
+                left = x
+                bottom = y + ch
+                right = x + cw
+
+                face_area = cw * ch
+
+                if face_area / image_area < options.min_face_area_ratio:
+                    continue
+
+                # Quality stage: crops that would never match are not embedded
+                crop = source.full[top:bottom, left:right]
+                quality = assess_face(crop, face.keypoints).score
+                if quality < min_quality:
+                    prepared.low_quality_count += 1
+                    continue
+
+                prepared.locations.append(
+                    FaceLocation(top=top, right=right, bottom=bottom, left=left)
                 )
-            )
+                prepared.area_ratios.append(face_area / image_area)
+                prepared.crops.append(crop)
+                prepared.qualities.append(quality)
 
-        return DetectFacesResponse(
-            success=True,
-            faces=detected,
-            count=len(detected),
-            metadata=DetectFacesMetadata(
-                image_dimensions=[w, h], processing_time_ms=(time.time() - start) * 1000
-            ),
-        )
+        return prepared
 
     except Exception as e:
         return DetectFacesResponse(success=False, error=str(e))
 
 
-@router.post("/match-faces", response_model=MatchFacesResponse)
-async def match_faces(request: MatchFacesRequest):
+def _finish_detect(
+    prepared: _PreparedImage, embeddings: np.ndarray
+) -> DetectFacesResponse:
+    fmt = prepared.options.embedding_format
+    detected = [
+        DetectedFaceInfo(
+            embedding=encode_embedding(embedding, fmt),
+            location=location,
+            face_area_ratio=ratio,
+            quality=quality,
+        )
+        for embedding, location, ratio, quality in zip(
+            embeddings, prepared.locations, prepared.area_ratios, prepared.qualities
+        )
+    ]
+    w, h = prepared.image_dimensions
+
+    return DetectFacesResponse(
+        success=True,
+        faces=detected,
+        count=len(detected),
+        metadata=DetectFacesMetadata(
+            image_dimensions=[w, h],
+            processing_time_ms=(time.time() - prepared.start) * 1000,
+            embedding_version=prepared.embedding_version,
+            low_quality_count=prepared.low_quality_count,
+        ),
+    )
+
+
+def _embed(crops: List[np.ndarray]) -> tuple[np.ndarray, str | None]:
+    """Embeddings of face crops and the projection version they are in."""
+    with tracing.span("embed", faces=len(crops)):
+        embeddings = get_face_embeddings(crops)
+        # Projection stage: compact embeddings once a projection is active
+        projection = projection_store.active
+        if projection is not None and len(embeddings):
+            embeddings = projection.project(embeddings)
+        return embeddings, projection.version if projection else None
+
+
+def _embed_batch(
+    prepared: List[BaseModel | _PreparedImage],
+    finish: Callable[[_PreparedImage, np.ndarray], BaseModel],
+    on_error: Callable[[Exception], BaseModel],
+) -> List[BaseModel]:
+    """
+    Embed every pending crop of a batch in one pass and build responses.
+
+    If the batched pass fails, each request is retried on its own, so one
+    bad crop only fails the request it came from.
+    """
+    pending = [p for p in prepared if isinstance(p, _PreparedImage)]
     try:
-        best_match = None
-        best_score = -1.0
-        all_distances = []
+        embeddings, version = _embed([c for p in pending for c in p.crops])
+        for p in pending:
+            p.embedding_version = version
+    except Exception as e:
+        if len(pending) > 1:
+            return _embed_each(prepared, finish, on_error)
+        return [on_error(e) if isinstance(p, _PreparedImage) else p for p in prepared]
+
+    results = []
+    offset = 0
+    for p in prepared:
+        if isinstance(p, _PreparedImage):
+            n = len(p.crops)
+            results.append(finish(p, embeddings[offset : offset + n]))
+            offset += n
+        else:
+            results.append(p)
+    return results
+
+
+def _embed_each(
+    prepared: List[BaseModel | _PreparedImage],
+    finish: Callable[[_PreparedImage, np.ndarray], BaseModel],
+    on_error: Callable[[Exception], BaseModel],
+) -> List[BaseModel]:
+    """_embed_batch one request at a time, isolating the ones that fail."""
+    results = []
+    for p in prepared:
+        if not isinstance(p, _PreparedImage):
+            results.append(p)
+            continue
+        try:
+            embeddings, p.embedding_version = _embed(p.crops)
+        except Exception as e:
+            results.append(on_error(e))
+            continue
+        results.append(finish(p, embeddings))
+    return results
+
+
+def _encode_face_batch(
+    jobs: List[tuple[bytes | str, EncodeFaceOptions]],
+) -> List[EncodeFaceResponse]:
+    return _embed_batch(
+        [_prepare_encode(image, options) for image, options in jobs],
+        _finish_encode,
+        lambda e: EncodeFaceResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        ),
+    )
+
+
+def _detect_faces_batch(
+    jobs: List[tuple[bytes | str, DetectFacesOptions, float]],
+) -> List[DetectFacesResponse]:
+    return _embed_batch(
+        [_prepare_detect(image, options, start) for image, options, start in jobs],
+        _finish_detect,
+        lambda e: DetectFacesResponse(success=False, error=str(e)),
+    )
+
+
+def _match_faces(request: MatchFacesRequest) -> MatchFacesResponse:
+    with tracing.span("match", faces=1):
+        return _match_one(request)
+
 
-        for candidate in request.candidate_embeddings:
-            scores = [
-                cosine_similarity(request.query_embedding, emb)
-                for emb in candidate.embeddings
+def _match_one(request: MatchFacesRequest) -> MatchFacesResponse:
+    try:
+        fmt = request.embedding_format
+        candidates = CandidateMatrix.from_candidates(
+            [
+                (c.student_id, decode_embeddings(c.embeddings, fmt))
+                for c in request.candidate_embeddings
             ]
-            score = max(scores)
+        )
+        scores = candidates.score(decode_embedding(request.query_embedding, fmt))[0]
 
-            if request.return_all_distances:
-                all_distances.append(
-                    DistanceInfo(
-                        student_id=candidate.student_id, min_distance=1 - score
-                    )
-                )
+        all_distances = []
+        if request.return_all_distances:
+            all_distances = [
+                DistanceInfo(student_id=student_id, min_distance=1 - float(score))
+                for student_id, score in zip(candidates.student_ids, scores)
+            ]
 
-            if score > best_score:
-                best_score = score
-                best_match = candidate.student_id
+        best_match = None
+        best_score = -1.0
+        if len(candidates):
+            best_idx = int(np.argmax(scores))
+            best_match = candidates.student_ids[best_idx]
+            best_score = float(scores[best_idx])
 
         if best_score >= request.threshold:
             return MatchFacesResponse(
@@ -190,26 +438,35 @@ async def match_faces(request: MatchFacesRequest):
         return MatchFacesResponse(success=False, error=str(e))
 
 
-@router.post("/batch-match", response_model=BatchMatchResponse)
-async def batch_match(request: BatchMatchRequest):
-    try:
-        results = []
+def _batch_match(
+    request: BatchMatchRequest, candidates: CandidateMatrix | None
+) -> BatchMatchResponse:
+    """Match detected faces against a resident gallery or the inline candidates."""
+    with tracing.span("match", faces=len(request.detected_faces)):
+        return _match_batch(request, candidates)
 
-        for idx, face in enumerate(request.detected_faces):
-            best_id = None
-            best_score = -1.0
 
-            for candidate in request.candidate_embeddings:
-                scores = [
-                    cosine_similarity(face.embedding, emb)
-                    for emb in candidate.embeddings
+def _match_batch(
+    request: BatchMatchRequest, candidates: CandidateMatrix | None
+) -> BatchMatchResponse:
+    try:
+        fmt = request.embedding_format
+        if candidates is None:
+            candidates = CandidateMatrix.from_candidates(
+                [
+                    (c.student_id, decode_embeddings(c.embeddings, fmt))
+                    for c in request.candidate_embeddings
                 ]
-                score = max(scores)
+            )
 
-                if score > best_score:
-                    best_score = score
-                    best_id = candidate.student_id
+        queries = np.vstack(
+            [decode_embedding(face.embedding, fmt) for face in request.detected_faces]
+        )
+        best_ids, best_scores = candidates.best_matches(queries)
 
+        results = []
+        for idx, (best_id, best_score) in enumerate(zip(best_ids, best_scores)):
+            best_score = float(best_score)
             status = (
                 "present" if best_score >= request.confident_threshold else "unknown"
             )
@@ -227,3 +484,356 @@ async def batch_match(request: BatchMatchRequest):
 
     except Exception as e:
         return BatchMatchResponse(success=False, error=str(e))
+
+
+# Concurrent detect/encode requests are coalesced into one image-pool job
+encode_batcher = MicroBatcher(
+    "encode_face",
+    _encode_face_batch,
+    image_pool,
+    settings.IMAGE_BATCH_MAX_SIZE,
+    settings.IMAGE_BATCH_MAX_WAIT_MS,
+)
+detect_batcher = MicroBatcher(
+    "detect_faces",
+    _detect_faces_batch,
+    image_pool,
+    settings.IMAGE_BATCH_MAX_SIZE,
+    settings.IMAGE_BATCH_MAX_WAIT_MS,
+)
+
+
+def _load_tiles(image: bytes | str) -> DetectFacesResponse | tuple:
+    """Decode the full image and lay out its detection tiles."""
+    try:
+        source = _load_image(image)
+        source.full
+    except Exception as e:
+        return DetectFacesResponse(success=False, error=str(e))
+    tiles = tile_grid(
+        source.width,
+        source.height,
+        settings.DETECTION_TILE_SIZE,
+        settings.DETECTION_TILE_OVERLAP,
+        settings.DETECTION_MAX_TILES,
+    )
+    return source, tiles
+
+
+def _detect_tiles(image: np.ndarray, tiles: List[Tile]) -> list[FaceBox]:
+    """Detect on each tile of a full-resolution image, in image coordinates."""
+    faces = []
+    with tracing.span("detect", tiles=len(tiles)):
+        for x, y, w, h in tiles:
+            tile = np.ascontiguousarray(image[y : y + h, x : x + w])
+            for face in detect_faces(tile):
+                face = face if isinstance(face, FaceBox) else FaceBox(face)
+                faces.append(face.shifted(x, y))
+    return faces
+
+
+def _embed_detect(
+    source: ImageSource,
+    faces: List[FaceBox],
+    options: DetectFacesOptions,
+    start: float,
+) -> DetectFacesResponse:
+    prepared = _prepare_faces(source, faces, options, start)
+    return _embed_batch(
+        [prepared],
+        _finish_detect,
+        lambda e: DetectFacesResponse(success=False, error=str(e)),
+    )[0]
+
+
+async def _detect_tiled(image: bytes | str) -> DetectFacesResponse | tuple:
+    """
+    Tiled detection for large photos with small faces.
+
+    The downscaled single-pass detection (which finds the large faces) and
+    the full-resolution tiles run concurrently on the image pool, the tiles
+    split into at most one job per worker; the detections are then merged
+    by non-max suppression. Returns (source, faces) or an error response.
+    """
+    loaded = await image_pool.run("tile_decode", _load_tiles, image)
+    if isinstance(loaded, DetectFacesResponse):
+        return loaded
+    source, tiles = loaded
+
+    jobs = min(len(tiles), image_pool.workers)
+    chunks = [tiles[i::jobs] for i in range(jobs)]
+    try:
+        results = await asyncio.gather(
+            image_pool.run("tile_global", _detect, source),
+            *(
+                image_pool.run("tile_detect", _detect_tiles, source.full, chunk)
+                for chunk in chunks
+            ),
+        )
+    except ServiceOverloadedError:
+        raise
+    except Exception as e:
+        return DetectFacesResponse(success=False, error=str(e))
+
+    faces = merge_detections(
+        [face for result in results for face in result],
+        settings.DETECTION_TILE_NMS_IOU,
+        settings.DETECTION_TILE_NMS_CONTAINMENT,
+    )
+    DETECTION_TILES.observe(len(tiles))
+    return source, faces
+
+
+async def _detect_faces_tiled(
+    image: bytes | str, options: DetectFacesOptions, start: float
+) -> DetectFacesResponse:
+    detected = await _detect_tiled(image)
+    if isinstance(detected, DetectFacesResponse):
+        return detected
+    source, faces = detected
+    return await image_pool.run(
+        "tile_embed", _embed_detect, source, faces, options, start
+    )
+
+
+async def _prepare_frame(
+    image: bytes | str, options: DetectFacesOptions, start: float
+) -> DetectFacesResponse | _PreparedImage:
+    """Detection stage of /track-faces, tiled when the request asks for it."""
+    if options.model != "tiled":
+        return await image_pool.run(
+            "track_detect", _prepare_detect, image, options, start
+        )
+    detected = await _detect_tiled(image)
+    if isinstance(detected, DetectFacesResponse):
+        return detected
+    source, faces = detected
+    return await image_pool.run(
+        "track_prepare", _prepare_faces, source, faces, options, start
+    )
+
+
+async def _cached(
+    kind: str,
+    image: bytes | str,
+    options: BaseModel,
+    response_model: Type[ResponseT],
+    compute: Callable[[], Awaitable[ResponseT]],
+) -> ResponseT:
+    """Serve a detect/encode result from the result cache, or compute and store it."""
+    if not result_cache.enabled:
+        return await compute()
+
+    def lookup():
+        key = result_cache.key(kind, image, options)
+        return key, result_cache.get(key)
+
+    # Hashing a multi-megabyte image releases the GIL; keep it off the loop
+    key, cached = await asyncio.to_thread(lookup)
+    if cached is not None:
+        return response_model.model_validate_json(cached)
+
+    response = await compute()
+    if response.success or getattr(response, "error_code", None) in _CACHEABLE_ERRORS:
+        await asyncio.to_thread(
+            lambda: result_cache.put(key, response.model_dump_json().encode())
+        )
+    return response
+
+
+async def _encode_face(image: bytes | str, options: EncodeFaceOptions):
+    return await _cached(
+        "encode",
+        image,
+        options,
+        EncodeFaceResponse,
+        lambda: encode_batcher.submit((image, options)),
+    )
+
+
+async def _detect_faces(image: bytes | str, options: DetectFacesOptions):
+    start = time.time()
+    response = await _cached(
+        "detect",
+        image,
+        options,
+        DetectFacesResponse,
+        # Tiled requests fan out over the pool themselves; not micro-batched
+        lambda: (
+            _detect_faces_tiled(image, options, start)
+            if options.model == "tiled"
+            else detect_batcher.submit((image, options, start))
+        ),
+    )
+    if response.metadata is not None:
+        response.metadata.processing_time_ms = (time.time() - start) * 1000
+    return response
+
+
+async def _track_faces(
+    image: bytes | str, options: TrackFacesOptions
+) -> TrackFacesResponse:
+    """
+    Detect faces in one frame of a capture and follow them across frames.
+
+    Detection runs on every frame, but only faces that start a track or are
+    seen clearly enough to beat their track's embedding are embedded; the
+    rest reuse the track's embedding and are returned without one.
+    """
+    start = time.time()
+    prepared = await _prepare_frame(image, options, start)
+    if not isinstance(prepared, _PreparedImage):
+        return TrackFacesResponse(success=False, error=prepared.error)
+
+    tracker = tracker_store.get(options.session_id)
+    assignments, ended = tracker.associate(
+        [(loc.top, loc.right, loc.bottom, loc.left) for loc in prepared.locations],
+        prepared.qualities,
+    )
+    pending = [i for i, a in enumerate(assignments) if a.needs_embedding]
+
+    embeddings = {}
+    version = projection_store.active_version or None
+    if pending:
+        try:
+            computed, version = await image_pool.run(
+                "track_embed", _embed, [prepared.crops[i] for i in pending]
+            )
+        except ServiceOverloadedError:
+            raise
+        except Exception as e:
+            return TrackFacesResponse(success=False, error=str(e))
+        for i, embedding in zip(pending, computed):
+            tracker.record(assignments[i].track, embedding, prepared.qualities[i])
+            embeddings[i] = embedding
+
+    TRACKED_FACES.labels("computed").inc(len(pending))
+    TRACKED_FACES.labels("reused").inc(len(assignments) - len(pending))
+
+    fmt = options.embedding_format
+    faces = [
+        TrackedFaceInfo(
+            track_id=assignment.track.track_id,
+            embedding=encode_embedding(embeddings[i], fmt) if i in embeddings else None,
+            embedding_reused=i not in embeddings,
+            location=location,
+            face_area_ratio=ratio,
+            quality=quality,
+            frames_seen=assignment.track.hits,
+        )
+        for i, (assignment, location, ratio, quality) in enumerate(
+            zip(
+                assignments,
+                prepared.locations,
+                prepared.area_ratios,
+                prepared.qualities,
+            )
+        )
+    ]
+    return TrackFacesResponse(
+        success=True,
+        faces=faces,
+        count=len(faces),
+        ended_tracks=ended,
+        metadata=TrackFacesMetadata(
+            image_dimensions=prepared.image_dimensions,
+            processing_time_ms=(time.time() - start) * 1000,
+            embedding_version=version,
+            low_quality_count=prepared.low_quality_count,
+            frame=tracker.frames,
+            embedded_count=len(pending),
+            reused_count=len(faces) - len(pending),
+            active_tracks=tracker.active_tracks,
+        ),
+    )
+
+
+@router.post("/encode-face", response_model=EncodeFaceResponse)
+async def encode_face(request: EncodeFaceRequest):
+    return await _encode_face(request.image_base64, request)
+
+
+@router.post("/encode-face/raw", response_model=EncodeFaceResponse)
+async def encode_face_raw(
+    request: Request, options: Annotated[EncodeFaceOptions, Query()]
+):
+    """Same as /encode-face, with the image as the raw request body."""
+    return await _encode_face(await request.body(), options)
+
+
+@router.post("/detect-faces", response_model=DetectFacesResponse)
+async def detect_faces_api(request: DetectFacesRequest):
+    return await _detect_faces(request.image_base64, request)
+
+
+@router.post("/detect-faces/raw", response_model=DetectFacesResponse)
+async def detect_faces_raw(
+    request: Request, options: Annotated[DetectFacesOptions, Query()]
+):
+    """Same as /detect-faces, with the image as the raw request body."""
+    return await _detect_faces(await request.body(), options)
+
+
+@router.post("/track-faces", response_model=TrackFacesResponse)
+async def track_faces(request: TrackFacesRequest):
+    """Detect faces in one frame of a capture session and track them."""
+    return await _track_faces(request.image_base64, request)
+
+
+@router.post("/track-faces/raw", response_model=TrackFacesResponse)
+async def track_faces_raw(
+    request: Request, options: Annotated[TrackFacesOptions, Query()]
+):
+    """Same as /track-faces, with the frame as the raw request body."""
+    return await _track_faces(await request.body(), options)
+
+
+@router.delete("/track-faces/{session_id}", response_model=TrackFacesResponse)
+async def end_tracking(session_id: str):
+    """Drop a capture session's tracks."""
+    if not tracker_store.end(session_id):
+        return TrackFacesResponse(
+            success=False, error=f"Tracking session {session_id} not found"
+        )
+    return TrackFacesResponse(success=True)
+
+
+@router.post("/match-faces", response_model=MatchFacesResponse)
+async def match_faces(request: MatchFacesRequest):
+    return await match_pool.run("match_faces", _match_faces, request)
+
+
+@router.post("/batch-match", response_model=BatchMatchResponse)
+async def batch_match(request: BatchMatchRequest):
+    if not request.detected_faces:
+        return BatchMatchResponse(success=True, matches=[])
+
+    candidates = None
+    if request.gallery_id is not None:
+        gallery = gallery_store.get(request.gallery_id)
+        if gallery is None:
+            return BatchMatchResponse(
+                success=False,
+                error=f"Gallery {request.gallery_id} not found",
+                error_code=ERROR_GALLERY_NOT_FOUND,
+            )
+        if (
+            request.gallery_version is not None
+            and gallery.version != request.gallery_version
+        ):
+            return BatchMatchResponse(
+                success=False,
+                error=(
+                    f"Gallery {request.gallery_id} is at version "
+                    f"{gallery.version}, expected {request.gallery_version}"
+                ),
+                error_code=ERROR_GALLERY_VERSION_MISMATCH,
+            )
+        candidates = gallery.matrix
+
+    if candidates is not None:
+        # Match against the resident matrix rather than pickling it to a worker
+        return await match_pool.run_local(
+            "batch_match", _batch_match, request, candidates
+        )
+    return await match_pool.run("batch_match", _batch_match, request, candidates)
@@ -0,0 +1,103 @@
+from typing import List
+
+from fastapi import APIRouter, Depends
+
+from app.schemas.requests import (
+    CandidateEmbedding,
+    RegisterGalleryRequest,
+    UpdateGalleryRequest,
+)
+from app.schemas.responses import GalleryInfo, GalleryResponse
+from app.core.constants import ERROR_GALLERY_NOT_FOUND, ERROR_PROCESSING
+from app.core.security import verify_api_key
+from app.core.workers import match_pool
+
+from app.ml.gallery import Gallery, gallery_store
+from app.utils.embedding_codec import decode_embeddings
+
+router = APIRouter(
+    prefix="/api/ml/galleries",
+    tags=["ML Galleries"],
+    dependencies=[Depends(verify_api_key)],
+)
+
+
+def _gallery_info(gallery: Gallery) -> GalleryInfo:
+    return GalleryInfo(
+        gallery_id=gallery.gallery_id,
+        version=gallery.version,
+        student_count=gallery.student_count,
+        embedding_count=gallery.embedding_count,
+        dtype=gallery.matrix.dtype,
+        memory_bytes=gallery.memory_bytes,
+    )
+
+
+def _decode_candidates(candidates: List[CandidateEmbedding], fmt: str):
+    return [(c.student_id, decode_embeddings(c.embeddings, fmt)) for c in candidates]
+
+
+def _not_found(gallery_id: str) -> GalleryResponse:
+    return GalleryResponse(
+        success=False,
+        error=f"Gallery {gallery_id} not found",
+        error_code=ERROR_GALLERY_NOT_FOUND,
+    )
+
+
+def _register(gallery_id: str, request: RegisterGalleryRequest) -> GalleryResponse:
+    try:
+        gallery = gallery_store.register(
+            gallery_id,
+            request.version,
+            _decode_candidates(request.candidates, request.embedding_format),
+        )
+        return GalleryResponse(success=True, gallery=_gallery_info(gallery))
+
+    except Exception as e:
+        return GalleryResponse(success=False, error=str(e), error_code=ERROR_PROCESSING)
+
+
+def _update(gallery_id: str, request: UpdateGalleryRequest) -> GalleryResponse:
+    try:
+        gallery = gallery_store.update(
+            gallery_id,
+            request.version,
+            upsert=_decode_candidates(request.upsert, request.embedding_format),
+            remove=request.remove,
+        )
+        if gallery is None:
+            return _not_found(gallery_id)
+        return GalleryResponse(success=True, gallery=_gallery_info(gallery))
+
+    except Exception as e:
+        return GalleryResponse(success=False, error=str(e), error_code=ERROR_PROCESSING)
+
+
+@router.get("/{gallery_id}", response_model=GalleryResponse)
+async def get_gallery(gallery_id: str):
+    gallery = gallery_store.get(gallery_id)
+    if gallery is None:
+        return _not_found(gallery_id)
+    return GalleryResponse(success=True, gallery=_gallery_info(gallery))
+
+
+@router.put("/{gallery_id}", response_model=GalleryResponse)
+async def register_gallery(gallery_id: str, request: RegisterGalleryRequest):
+    # Decoding and quantizing a subject's embeddings is CPU-bound; keep it off
+    # the event loop, in the process that holds the galleries
+    return await match_pool.run_local(
+        "gallery_register", _register, gallery_id, request
+    )
+
+
+@router.patch("/{gallery_id}", response_model=GalleryResponse)
+async def update_gallery(gallery_id: str, request: UpdateGalleryRequest):
+    return await match_pool.run_local("gallery_update", _update, gallery_id, request)
+
+
+@router.delete("/{gallery_id}", response_model=GalleryResponse)
+async def evict_gallery(gallery_id: str):
+    if not gallery_store.evict(gallery_id):
+        return _not_found(gallery_id)
+    return GalleryResponse(success=True)
@@ -1,8 +1,12 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from datetime import datetime, timezone
 import psutil
 import shutil
 
+from app.core.workers import image_pool, match_pool
+from app.ml.warmup import warmup_state
+
 router = APIRouter()
 
 
@@ -35,6 +39,20 @@ async def health_check():
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the models have been warmed up."""
+    if not warmup_state.ready:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "failed" if warmup_state.error else "warming_up",
+                "error": warmup_state.error,
+            },
+        )
+    return {"status": "ready", "warmup_seconds": warmup_state.durations}
+
+
 @router.get("/health/detailed")
 async def detailed_health():
     try:
@@ -53,7 +71,12 @@ async def detailed_health():
         "checks": {"storage": storage},
         "metrics": {
             "uptime_seconds": get_uptime(),
+            "ready": warmup_state.ready,
             "memory": get_memory_usage(),
             "cpu_percent": get_cpu_usage(),
+            "workers": {
+                image_pool.name: image_pool.stats(),
+                match_pool.name: match_pool.stats(),
+            },
         },
     }
@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends
+
+from app.schemas.requests import FitProjectionRequest, ProjectEmbeddingsRequest
+from app.schemas.responses import ProjectionInfo, ProjectionResponse
+from app.core.constants import ERROR_PROCESSING
+from app.core.security import verify_api_key
+from app.core.workers import match_pool
+
+from app.ml.projection import (
+    EmbeddingProjection,
+    fit_pca,
+    fit_random,
+    projection_store,
+)
+from app.utils.embedding_codec import decode_embeddings, encode_embedding
+
+router = APIRouter(
+    prefix="/api/ml/projections",
+    tags=["ML Projections"],
+    dependencies=[Depends(verify_api_key)],
+)
+
+
+def _projection_info(projection: EmbeddingProjection) -> ProjectionInfo:
+    return ProjectionInfo(
+        version=projection.version,
+        method=projection.method,
+        input_dim=projection.input_dim,
+        output_dim=projection.output_dim,
+        active=projection.version == projection_store.active_version,
+    )
+
+
+def _fit(request: FitProjectionRequest) -> ProjectionResponse:
+    try:
+        if request.method == "pca":
+            embeddings = decode_embeddings(request.embeddings, request.embedding_format)
+            projection = fit_pca(embeddings, request.dim, request.version)
+        else:
+            if request.input_dim is None:
+                raise ValueError("input_dim is required for random projection")
+            projection = fit_random(request.input_dim, request.dim, request.version)
+
+        projection_store.save(projection)
+        return ProjectionResponse(success=True, projection=_projection_info(projection))
+
+    except Exception as e:
+        return ProjectionResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        )
+
+
+def _project(version: str, request: ProjectEmbeddingsRequest) -> ProjectionResponse:
+    try:
+        projection = projection_store.get(version)
+        embeddings = decode_embeddings(request.embeddings, request.embedding_format)
+        projected = projection.project(embeddings) if embeddings else []
+        return ProjectionResponse(
+            success=True,
+            projection=_projection_info(projection),
+            embeddings=[
+                encode_embedding(e, request.embedding_format) for e in projected
+            ],
+        )
+
+    except Exception as e:
+        return ProjectionResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        )
+
+
+@router.post("", response_model=ProjectionResponse)
+async def fit_projection(request: FitProjectionRequest):
+    """Fit a new projection version and store it as an artifact."""
+    return await match_pool.run("projection_fit", _fit, request)
+
+
+@router.get("/{version}", response_model=ProjectionResponse)
+async def get_projection(version: str):
+    try:
+        projection = projection_store.get(version)
+        return ProjectionResponse(success=True, projection=_projection_info(projection))
+
+    except Exception as e:
+        return ProjectionResponse(
+            success=False, error=str(e), error_code=ERROR_PROCESSING
+        )
+
+
+@router.post("/{version}/project", response_model=ProjectionResponse)
+async def project_embeddings(version: str, request: ProjectEmbeddingsRequest):
+    """Re-project stored raw embeddings, e.g. from a migration."""
+    return await match_pool.run("projection_apply", _project, version, request)
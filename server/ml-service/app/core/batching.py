@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Any, Callable, List, Set
+
+from app.core import tracing
+from app.core.metrics import BATCH_QUEUE_WAIT, BATCH_SIZE
+from app.core.workers import WorkerPool
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into small batches for one pool job.
+
+    A batch is dispatched when ``max_batch_size`` items are pending or
+    ``max_wait_ms`` after the first pending item arrived, whichever is first.
+    ``process_batch`` takes the list of items and returns one result per item,
+    in order; results (or the batch's exception) are fanned back out to the
+    awaiting callers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[List[Any]], List[Any]],
+        pool: WorkerPool,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        self.name = name
+        self.process_batch = process_batch
+        self.pool = pool
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[tuple[Any, asyncio.Future, float, Any]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(
+            (item, future, time.perf_counter(), tracing.current_context())
+        )
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple[Any, asyncio.Future, float, Any]]) -> None:
+        dispatched = time.perf_counter()
+        BATCH_SIZE.labels(self.name).observe(len(batch))
+        for _, _, queued, _ in batch:
+            BATCH_QUEUE_WAIT.labels(self.name).observe(dispatched - queued)
+
+        try:
+            # The batch job is traced under every member request's ID
+            with tracing.attach(tracing.merge(c for _, _, _, c in batch)):
+                results = await self.pool.run(
+                    self.name, self.process_batch, [item for item, _, _, _ in batch]
+                )
+        except Exception as e:
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
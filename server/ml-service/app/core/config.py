@@ -1,6 +1,6 @@
 import json
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import List, Literal, Union
 
 
 class Settings(BaseSettings):
@@ -17,6 +17,69 @@ class Settings(BaseSettings):
     ML_MODEL: str = "hog"
     NUM_JITTERS: int = 5
     MIN_FACE_AREA_RATIO: float = 0.04
+    # Faces scoring below this (0-1, blur/exposure/pose) are not embedded
+    FACE_MIN_QUALITY: float = 0.2
+
+    # Resident embedding galleries (one per subject)
+    GALLERY_MAX_COUNT: int = 256
+    # float32, float16 (2x smaller) or int8 with a per-vector scale (4x smaller)
+    GALLERY_STORAGE_DTYPE: Literal["float32", "float16", "int8"] = "float32"
+
+    # Learned embedding projection. Artifacts are <dir>/<version>.npz; new
+    # embeddings are projected with EMBEDDING_PROJECTION_VERSION when set.
+    EMBEDDING_PROJECTION_DIR: str = "models/projections"
+    EMBEDDING_PROJECTION_VERSION: str = ""
+
+    # Campus-wide ANN face index (0 lists = sqrt of the embedding count).
+    # Loaded from / snapshotted to ANN_INDEX_PATH when set.
+    ANN_INDEX_PATH: str = ""
+    ANN_INDEX_N_LISTS: int = 0
+    ANN_INDEX_N_PROBE: int = 16
+
+    # Worker pools for CPU-bound work (0 workers = one per CPU core).
+    # Kind is "thread" or "process"; jobs beyond workers + max queue get a 503.
+    # Process workers only run stateless stages: jobs on resident galleries
+    # or the campus index stay on threads of the service process.
+    IMAGE_POOL_KIND: Literal["thread", "process"] = "thread"
+    IMAGE_POOL_WORKERS: int = 0
+    IMAGE_POOL_MAX_QUEUE: int = 32
+    MATCH_POOL_KIND: Literal["thread", "process"] = "thread"
+    MATCH_POOL_WORKERS: int = 0
+    MATCH_POOL_MAX_QUEUE: int = 64
+    # Per-step pipeline spans: "off" (Prometheus histogram only), "log"
+    # (structured log line per span) or "otel" (OpenTelemetry, if installed)
+    TRACE_SPANS: Literal["off", "log", "otel"] = "off"
+
+    # Longest side of the image detection runs on (0 = full resolution)
+    DETECTION_MAX_SIDE: int = 1280
+    # MediaPipe detectors, one per image worker (0 = IMAGE_POOL_WORKERS)
+    DETECTOR_POOL_SIZE: int = 0
+    # Tiled detection (model="tiled"): full-resolution tile size and overlap
+    # in pixels, tile cap (tiles grow to stay under it) and the NMS that
+    # merges detections from overlapping tiles
+    DETECTION_TILE_SIZE: int = 512
+    DETECTION_TILE_OVERLAP: int = 96
+    DETECTION_MAX_TILES: int = 24
+    DETECTION_TILE_NMS_IOU: float = 0.3
+    DETECTION_TILE_NMS_CONTAINMENT: float = 0.7
+
+    # Micro-batching of concurrent detect/encode requests
+    IMAGE_BATCH_MAX_SIZE: int = 8
+    IMAGE_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Detect/encode result cache keyed by image digest (0 bytes = disabled).
+    # Evicted entries spill to RESULT_CACHE_DIR when set.
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_DIR: str = ""
+    RESULT_CACHE_DISK_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # Face tracking for multi-frame captures (/track-faces). A track is
+    # re-embedded when seen at TRACKER_QUALITY_GAIN x its embedding's quality.
+    TRACKER_MAX_SESSIONS: int = 256
+    TRACKER_SESSION_TTL_SECONDS: float = 300
+    TRACKER_IOU_THRESHOLD: float = 0.3
+    TRACKER_MAX_MISSED: int = 5
+    TRACKER_QUALITY_GAIN: float = 1.25
 
     # 👇 IMPORTANT FIX
     CORS_ORIGINS: Union[str, List[str]] = ["*"]
@@ -8,6 +8,10 @@ DEFAULT_MODEL = "hog"  # hog or cnn
 # Face Encoding
 ENCODING_MIN_FACE_AREA_RATIO = 0.05
 ENCODING_NUM_JITTERS = 5
+# Bumped whenever the face crop fed to the encoder changes, so embeddings
+# stored from older crops can be found and re-encoded
+# (2: detector boxes fixed to (x, y, w, h))
+FACE_CROP_VERSION = 2
 
 # Face Matching
 DEFAULT_MATCH_THRESHOLD = 0.6
@@ -18,5 +22,8 @@ UNCERTAIN_THRESHOLD = 0.60
 ERROR_NO_FACE = "NO_FACE_FOUND"
 ERROR_MULTIPLE_FACES = "MULTIPLE_FACES_FOUND"
 ERROR_FACE_TOO_SMALL = "FACE_TOO_SMALL"
+ERROR_FACE_LOW_QUALITY = "FACE_LOW_QUALITY"
 ERROR_INVALID_IMAGE = "INVALID_IMAGE"
 ERROR_PROCESSING = "PROCESSING_ERROR"
+ERROR_GALLERY_NOT_FOUND = "GALLERY_NOT_FOUND"
+ERROR_GALLERY_VERSION_MISMATCH = "GALLERY_VERSION_MISMATCH"
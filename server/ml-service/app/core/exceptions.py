@@ -30,3 +30,8 @@ class ValidationError(SmartAttendanceException):
 class MLServiceError(SmartAttendanceException):
     def __init__(self, message: str = "ML service error"):
         super().__init__(message, status_code=503)
+
+
+class ServiceOverloadedError(SmartAttendanceException):
+    def __init__(self, message: str = "ML service is at capacity, retry later"):
+        super().__init__(message, status_code=503)
@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 FACE_DETECTION_ACCURACY = Gauge(
     "face_detection_confidence", "Confidence score of face detection"
@@ -9,3 +9,77 @@ FACES_DETECTED_TOTAL = Counter(
 )
 
 ML_ERRORS = Counter("ml_service_errors_total", "ML service errors", ["error_type"])
+
+WORKER_QUEUE_WAIT = Histogram(
+    "ml_worker_queue_wait_seconds",
+    "Time a job waited for a free worker",
+    ["pool"],
+)
+
+STAGE_DURATION = Histogram(
+    "ml_stage_duration_seconds",
+    "Execution time of a pipeline stage on a worker",
+    ["stage"],
+)
+
+WORKER_INFLIGHT = Gauge(
+    "ml_worker_inflight_jobs", "Jobs queued or running in a worker pool", ["pool"]
+)
+
+WORKER_REJECTED = Counter(
+    "ml_worker_rejected_total",
+    "Jobs rejected because a worker pool queue was full",
+    ["pool"],
+)
+
+BATCH_SIZE = Histogram(
+    "ml_batch_size",
+    "Requests coalesced into one micro-batch",
+    ["batcher"],
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+
+BATCH_QUEUE_WAIT = Histogram(
+    "ml_batch_queue_wait_seconds",
+    "Time a request waited for its micro-batch to be dispatched",
+    ["batcher"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+MODEL_WARMUP_DURATION = Gauge(
+    "ml_model_warmup_seconds", "Time spent warming up a model at startup", ["component"]
+)
+
+SERVICE_READY = Gauge(
+    "ml_service_ready", "1 once models are warmed up and traffic can be served"
+)
+
+RESULT_CACHE_REQUESTS = Counter(
+    "ml_result_cache_requests_total",
+    "Detect/encode result cache lookups",
+    ["result"],
+)
+
+RESULT_CACHE_BYTES = Gauge(
+    "ml_result_cache_bytes", "Bytes held by the result cache", ["tier"]
+)
+
+TRACKED_FACES = Counter(
+    "ml_tracked_faces_total",
+    "Faces in tracked frames, by whether their embedding was computed or reused",
+    ["embedding"],
+)
+
+DETECTION_TILES = Histogram(
+    "ml_detection_tiles",
+    "Tiles a tiled-detection request was split into",
+    buckets=(1, 2, 4, 6, 9, 12, 16, 24, 32),
+)
+
+PIPELINE_STEP_DURATION = Histogram(
+    "ml_pipeline_step_seconds",
+    "Time spent in one step of the image pipeline (decode, detect, embed, ...)",
+    ["step"],
+    # Single steps are sub-millisecond to seconds
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 2.5),
+)
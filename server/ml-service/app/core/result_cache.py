@@ -0,0 +1,166 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.metrics import RESULT_CACHE_BYTES, RESULT_CACHE_REQUESTS
+
+
+class ResultCache:
+    """
+    Content-addressed cache of serialized detect/encode responses.
+
+    Keys are a digest of the image payload plus the request options, so a
+    retried or re-uploaded image costs one hash. The memory tier is an LRU
+    bounded by total bytes; entries it evicts spill to an optional disk tier
+    (``disk_dir``), which is bounded the same way and promotes hits back into
+    memory. ``max_bytes=0`` disables the cache.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        disk_dir: str = "",
+        disk_max_bytes: int = 0,
+        namespace: str = "",
+    ):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.namespace = namespace
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir:
+            self._load_disk_index()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, kind: str, payload: bytes | str, options: BaseModel) -> str:
+        """Digest of the image payload and every option that shapes the result."""
+        if isinstance(payload, str):
+            payload = payload.encode("ascii")
+        digest = hashlib.blake2b(payload, digest_size=20)
+        digest.update(b"\0" + f"{self.namespace}:{kind}".encode())
+        digest.update(
+            b"\0" + options.model_dump_json(exclude={"image_base64"}).encode()
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                RESULT_CACHE_REQUESTS.labels("memory_hit").inc()
+                return value
+
+            value = self._read_disk(key)
+            if value is None:
+                RESULT_CACHE_REQUESTS.labels("miss").inc()
+                return None
+            RESULT_CACHE_REQUESTS.labels("disk_hit").inc()
+            self._put_memory(key, value)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if not self.enabled or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._put_memory(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk):
+                self._remove_disk(key)
+        self._report_size()
+
+    def _put_memory(self, key: str, value: bytes) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory_bytes > self.max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._write_disk(evicted_key, evicted)
+        self._report_size()
+
+    # Disk tier
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _load_disk_index(self) -> None:
+        entries = []
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._report_size()
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if key not in self._disk:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                value = f.read()
+        except OSError:
+            self._disk_bytes -= self._disk.pop(key)
+            return None
+        self._disk.move_to_end(key)
+        return value
+
+    def _write_disk(self, key: str, value: bytes) -> None:
+        if not self.disk_dir or len(value) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._disk_bytes += len(value) - self._disk.pop(key, 0)
+        self._disk[key] = len(value)
+        while self._disk_bytes > self.disk_max_bytes:
+            self._remove_disk(next(iter(self._disk)))
+
+    def _remove_disk(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _report_size(self) -> None:
+        RESULT_CACHE_BYTES.labels("memory").set(self._memory_bytes)
+        RESULT_CACHE_BYTES.labels("disk").set(self._disk_bytes)
+
+
+# Detect/encode results for repeated uploads and client retries
+result_cache = ResultCache(
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    disk_dir=settings.RESULT_CACHE_DIR,
+    disk_max_bytes=settings.RESULT_CACHE_DISK_MAX_BYTES,
+    # Results change with the embedding projection, including on disk
+    namespace=f"{settings.SERVICE_VERSION}:{settings.EMBEDDING_PROJECTION_VERSION}",
+)
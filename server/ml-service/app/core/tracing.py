@@ -0,0 +1,119 @@
+import contextvars
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+import structlog
+
+from app.core.config import settings
+from app.core.metrics import PIPELINE_STEP_DURATION
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # optional: TRACE_SPANS=otel falls back to log spans
+    otel_trace = None
+
+logger = structlog.get_logger("tracing")
+
+
+@dataclass(frozen=True)
+class TraceContext:
+    """
+    Trace state of the work being done: the correlation IDs of the requests
+    it serves (several for a micro-batch) and the enclosing span.
+
+    Worker pools do not inherit context variables, so WorkerPool captures
+    this with ``current_context`` and re-enters it on the worker with
+    ``attach``. ``otel_parent`` is dropped for process pools (not picklable).
+    """
+
+    correlation_ids: Tuple[str, ...] = ()
+    parent_span_id: Optional[str] = None
+    otel_parent: Any = field(default=None, compare=False)
+
+    def for_process(self) -> "TraceContext":
+        return replace(self, otel_parent=None)
+
+
+_current: contextvars.ContextVar[TraceContext] = contextvars.ContextVar(
+    "trace_context", default=TraceContext()
+)
+
+
+def current_context() -> TraceContext:
+    return _current.get()
+
+
+def bind_request(correlation_id: str) -> None:
+    """Start the trace of a request (called by CorrelationIdMiddleware)."""
+    _current.set(TraceContext((correlation_id,)))
+
+
+def merge(contexts: Iterable[TraceContext]) -> TraceContext:
+    """Context of a micro-batch: every member request's correlation IDs."""
+    ids = tuple(dict.fromkeys(cid for c in contexts for cid in c.correlation_ids))
+    return TraceContext(ids)
+
+
+@contextmanager
+def attach(context: TraceContext) -> Iterator[None]:
+    token = _current.set(context)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _otel_tracer():
+    if settings.TRACE_SPANS != "otel" or otel_trace is None:
+        return None
+    return otel_trace.get_tracer(settings.SERVICE_NAME)
+
+
+@contextmanager
+def span(step: str, **attributes: Any) -> Iterator[None]:
+    """
+    Time one pipeline step.
+
+    Always observed in the ``ml_pipeline_step_seconds`` histogram. With
+    TRACE_SPANS=log each span is also logged with its correlation ID(s),
+    span ID and parent span ID; with TRACE_SPANS=otel it is exported as an
+    OpenTelemetry span (when the SDK is installed) with the correlation IDs
+    as an attribute. Spans nest, so a step's time includes its children's.
+    """
+    parent = _current.get()
+    span_id = uuid.uuid4().hex[:16]
+
+    tracer = _otel_tracer()
+    otel_span = None
+    if tracer is not None:
+        otel_span = tracer.start_span(
+            step,
+            context=otel_trace.set_span_in_context(parent.otel_parent)
+            if parent.otel_parent is not None
+            else None,
+            attributes={"correlation_id": list(parent.correlation_ids), **attributes},
+        )
+
+    token = _current.set(replace(parent, parent_span_id=span_id, otel_parent=otel_span))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        _current.reset(token)
+        PIPELINE_STEP_DURATION.labels(step).observe(duration)
+        if otel_span is not None:
+            otel_span.end()
+        elif settings.TRACE_SPANS != "off":
+            logger.info(
+                "span",
+                span=step,
+                span_id=span_id,
+                parent_span_id=parent.parent_span_id,
+                correlation_id=",".join(parent.correlation_ids) or None,
+                duration_ms=round(duration * 1000, 3),
+                **attributes,
+            )
@@ -0,0 +1,149 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.metrics import (
+    STAGE_DURATION,
+    WORKER_INFLIGHT,
+    WORKER_QUEUE_WAIT,
+    WORKER_REJECTED,
+)
+
+
+def _timed_call(
+    fn: Callable, args: tuple, context: tracing.TraceContext
+) -> tuple[Any, float, float]:
+    """Run fn on the worker and report when it actually started and finished."""
+    started = time.time()
+    with tracing.attach(context):
+        result = fn(*args)
+    return result, started, time.time()
+
+
+class WorkerPool:
+    """
+    Bounded executor for CPU-bound pipeline stages.
+
+    "thread" pools suit native code that releases the GIL (PIL decode,
+    MediaPipe, OpenCV, BLAS matmuls); "process" pools suit pure-Python work.
+    At most ``workers + max_queue`` jobs are admitted; further submissions
+    raise ServiceOverloadedError (503) instead of growing an unbounded queue.
+
+    Process workers each hold their own copy of module-level state, so only
+    stateless jobs go through ``run``; jobs that read or change a resident
+    store (galleries, the campus index) use ``run_local``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: Literal["thread", "process"],
+        workers: int,
+        max_queue: int,
+    ):
+        self.name = name
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.capacity = self.workers + max_queue
+        self.inflight = 0
+        self._executor: Executor | None = None
+        self._local_executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = self._get_local_executor()
+        return self._executor
+
+    def _get_local_executor(self) -> Executor:
+        if self._local_executor is None:
+            self._local_executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix=f"ml-{self.name}"
+            )
+        return self._local_executor
+
+    async def run(self, stage: str, fn: Callable, *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool, recording queue wait and stage time."""
+        return await self._run(
+            self._get_executor(), self.kind == "process", stage, fn, args
+        )
+
+    async def run_local(self, stage: str, fn: Callable, *args: Any) -> Any:
+        """
+        Like ``run``, but always on a thread of the service process.
+
+        For jobs on module-level state, which a process worker would only
+        see (and change) a copy of. Shares the pool's admission limit.
+        """
+        return await self._run(self._get_local_executor(), False, stage, fn, args)
+
+    async def _run(
+        self, executor: Executor, out_of_process: bool, stage: str, fn: Callable, args
+    ) -> Any:
+        if self.inflight >= self.capacity:
+            WORKER_REJECTED.labels(self.name).inc()
+            raise ServiceOverloadedError()
+
+        self.inflight += 1
+        WORKER_INFLIGHT.labels(self.name).inc()
+        submitted = time.time()
+        # Executors don't copy context variables; hand the trace over
+        context = tracing.current_context()
+        if out_of_process:
+            context = context.for_process()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(
+                executor, _timed_call, fn, args, context
+            )
+        finally:
+            self.inflight -= 1
+            WORKER_INFLIGHT.labels(self.name).dec()
+
+        WORKER_QUEUE_WAIT.labels(self.name).observe(max(0.0, started - submitted))
+        STAGE_DURATION.labels(stage).observe(finished - started)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "inflight": self.inflight,
+            "capacity": self.capacity,
+        }
+
+    def shutdown(self) -> None:
+        for executor in (self._executor, self._local_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._local_executor = None
+
+
+# Image decode, detection and embedding
+image_pool = WorkerPool(
+    "image",
+    settings.IMAGE_POOL_KIND,
+    settings.IMAGE_POOL_WORKERS,
+    settings.IMAGE_POOL_MAX_QUEUE,
+)
+
+# Embedding matching
+match_pool = WorkerPool(
+    "match",
+    settings.MATCH_POOL_KIND,
+    settings.MATCH_POOL_WORKERS,
+    settings.MATCH_POOL_MAX_QUEUE,
+)
+
+
+def shutdown_pools() -> None:
+    image_pool.shutdown()
+    match_pool.shutdown()
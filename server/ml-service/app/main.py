@@ -1,6 +1,8 @@
+import asyncio
 import os
 import time
 import logging
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -12,6 +14,9 @@ from sentry_sdk.integrations.fastapi import FastApiIntegration
 
 from app.core.config import settings
 from app.api.routes.face_recognition import router as ml_router
+from app.api.routes.galleries import router as galleries_router
+from app.api.routes.face_index import router as face_index_router
+from app.api.routes.projections import router as projections_router
 
 # New Imports
 from prometheus_fastapi_instrumentator import Instrumentator
@@ -23,6 +28,9 @@ from .core.error_handlers import (
 from .core.exceptions import SmartAttendanceException
 from .middleware.correlation import CorrelationIdMiddleware
 from .middleware.timing import TimingMiddleware
+from .core.workers import shutdown_pools
+from .ml.ann_index import campus_index
+from .ml.warmup import warm_up_models
 
 from .api.routes.health import router as health_router
 
@@ -42,6 +50,34 @@ if SENTRY_DSN := os.getenv("SENTRY_DSN"):
 service_start_time = time.time()
 
 
+async def _warm_up_models():
+    try:
+        durations = await asyncio.to_thread(warm_up_models)
+        logger.info(
+            f"Models warmed up in {durations['total']:.2f}s, "
+            f"ready {time.time() - service_start_time:.2f}s after start"
+        )
+    except Exception as e:
+        logger.error(f"Model warm-up failed, service stays unready: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.ANN_INDEX_PATH and os.path.exists(settings.ANN_INDEX_PATH):
+        await asyncio.to_thread(campus_index.load, settings.ANN_INDEX_PATH)
+        logger.info(
+            f"Loaded face index with {campus_index.student_count} students "
+            f"from {settings.ANN_INDEX_PATH}"
+        )
+    # Warm up in the background so /health answers immediately while /ready
+    # stays 503 until the models are loaded
+    warmup_task = asyncio.create_task(_warm_up_models())
+    yield
+    warmup_task.cancel()
+    shutdown_pools()
+    logger.info("Worker pools shut down")
+
+
 def create_app() -> FastAPI:
     """Create and configure the ML Service FastAPI application"""
 
@@ -49,6 +85,7 @@ def create_app() -> FastAPI:
         title=settings.SERVICE_NAME,
         version=settings.SERVICE_VERSION,
         description="Machine Learning Service for Face Recognition",
+        lifespan=lifespan,
     )
 
     # Middleware
@@ -72,6 +109,9 @@ def create_app() -> FastAPI:
 
     # Include routers
     app.include_router(ml_router)
+    app.include_router(galleries_router)
+    app.include_router(face_index_router)
+    app.include_router(projections_router)
     app.include_router(health_router, tags=["Health"])
 
     return app
@@ -2,6 +2,8 @@ import uuid
 import structlog
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from app.core import tracing
+
 
 class CorrelationIdMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request, call_next):
@@ -13,6 +15,7 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
         structlog.contextvars.bind_contextvars(
             correlation_id=correlation_id, path=request.url.path, method=request.method
         )
+        tracing.bind_request(correlation_id)
 
         response = await call_next(request)
         response.headers["X-Correlation-ID"] = correlation_id
@@ -0,0 +1,352 @@
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.face_matcher import normalize_rows
+
+# Rows scored per chunk when assigning vectors to lists
+_ASSIGN_CHUNK = 8192
+
+
+@dataclass(frozen=True)
+class _InvertedList:
+    vectors: np.ndarray  # (m, dim) float32, L2-normalized
+    owners: np.ndarray  # (m,) student slot of each row
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    centroids: Optional[np.ndarray]  # None while the index is still flat
+    lists: Tuple[_InvertedList, ...]
+    # Slot -> student id (None once removed). Published with the lists, so a
+    # search never attributes an older state's rows to a different student.
+    ids: Tuple[Optional[str], ...] = ()
+
+
+def _empty_list(dim: int = 0) -> _InvertedList:
+    return _InvertedList(
+        np.empty((0, dim), dtype=np.float32), np.empty(0, dtype=np.int64)
+    )
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by cosine) of each row."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), _ASSIGN_CHUNK):
+        chunk = vectors[start : start + _ASSIGN_CHUNK]
+        out[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Cluster normalized rows into ``k`` normalized centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(vectors, centroids)
+        sums = np.zeros((k, vectors.shape[1]), dtype=np.float32)
+        np.add.at(sums, assign, vectors)
+        empty = np.bincount(assign, minlength=k) == 0
+        if empty.any():
+            # Reseed clusters that lost all their members
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def _group(
+    vectors: np.ndarray, owners: np.ndarray, assign: np.ndarray, n_lists: int
+) -> List[_InvertedList]:
+    order = np.argsort(assign, kind="stable")
+    bounds = np.searchsorted(assign[order], np.arange(n_lists + 1))
+    return [
+        _InvertedList(np.ascontiguousarray(vectors[order[lo:hi]]), owners[order[lo:hi]])
+        for lo, hi in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbor index over face embeddings.
+
+    Embeddings are clustered into ``n_lists`` cells by spherical k-means; a
+    search scores the query against the centroids and scans only the
+    ``n_probe`` closest cells. Until ``train_threshold`` embeddings have been
+    added the index stays flat (one cell, exact search) and trains itself once
+    it grows past that. ``rebuild`` re-trains the cells after heavy churn.
+    Slots of removed students are compacted away on rebuild, or once they
+    outnumber the live ones.
+
+    Writers are serialized by a lock and publish a new immutable state, so
+    searches never block and always see a consistent index.
+    """
+
+    def __init__(
+        self,
+        n_lists: int = 0,
+        n_probe: int = 16,
+        train_threshold: int = 4096,
+        train_sample: int = 65536,
+    ):
+        self.n_lists = n_lists  # 0 = sqrt(embedding count) at training time
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold
+        self.train_sample = train_sample
+        self._state = _IndexState(None, (_empty_list(),))
+        self._slots: Dict[str, int] = {}  # student id -> slot in state.ids
+        self._lock = threading.Lock()
+
+    @property
+    def trained(self) -> bool:
+        return self._state.centroids is not None
+
+    @property
+    def list_count(self) -> int:
+        return len(self._state.lists) if self.trained else 0
+
+    @property
+    def student_count(self) -> int:
+        return len(self._slots)
+
+    @property
+    def embedding_count(self) -> int:
+        return sum(len(lst.owners) for lst in self._state.lists)
+
+    def upsert(
+        self,
+        candidates: Iterable[Tuple[str, Sequence[Sequence[float]]]] = (),
+        remove: Iterable[str] = (),
+    ) -> None:
+        """Replace or add students' embeddings and drop others."""
+        # One slot per student: a repeated id replaces its earlier rows
+        vectors_by_student = list(
+            {
+                student_id: normalize_rows(np.array(emb, dtype=np.float32, ndmin=2))
+                for student_id, emb in candidates
+            }.items()
+        )
+        with self._lock:
+            stale = [
+                self._slots.pop(student_id)
+                for student_id in [*remove, *(sid for sid, _ in vectors_by_student)]
+                if student_id in self._slots
+            ]
+            state = self._without_slots(self._state, stale)
+            ids = list(state.ids)
+            for slot in stale:
+                ids[slot] = None
+
+            if vectors_by_student:
+                owners = []
+                for student_id, vectors in vectors_by_student:
+                    slot = len(ids)
+                    ids.append(student_id)
+                    self._slots[student_id] = slot
+                    owners.append(np.full(len(vectors), slot, dtype=np.int64))
+                state = self._with_rows(
+                    state,
+                    np.vstack([v for _, v in vectors_by_student]),
+                    np.concatenate(owners),
+                )
+
+            state = replace(state, ids=tuple(ids))
+            if len(ids) > 2 * len(self._slots):
+                state = self._compact(state)
+            self._state = state
+
+            if not self.trained and self.embedding_count >= self.train_threshold:
+                self._state = self._train(self._state)
+
+    def rebuild(self) -> None:
+        """Re-cluster all embeddings (trains the index even below the threshold)."""
+        with self._lock:
+            state = self._compact(self._state)
+            self._state = self._train(state) if self.embedding_count else state
+
+    def search(
+        self, queries: np.ndarray, k: int = 5, n_probe: Optional[int] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """
+        Up to ``k`` closest students per query as ``(student_id, similarity)``.
+
+        A student's similarity is the best over their embeddings in the probed
+        cells.
+        """
+        state = self._state
+        ids = state.ids
+        queries = normalize_rows(np.array(queries, dtype=np.float32, ndmin=2))
+
+        if state.centroids is None:
+            probes = np.zeros((len(queries), 1), dtype=np.int64)
+        else:
+            n_probe = min(n_probe or self.n_probe, len(state.lists))
+            centroid_sims = queries @ state.centroids.T
+            probes = np.argpartition(-centroid_sims, n_probe - 1, axis=1)[:, :n_probe]
+
+        results = []
+        for query, cells in zip(queries, probes):
+            lists = [state.lists[c] for c in cells if len(state.lists[c].owners)]
+            if not lists:
+                results.append([])
+                continue
+            sims = np.concatenate([lst.vectors @ query for lst in lists])
+            owners = np.concatenate([lst.owners for lst in lists])
+            order = np.argsort(-sims, kind="stable")
+            # First (best) row of each student, in descending similarity
+            _, first = np.unique(owners[order], return_index=True)
+            best = order[np.sort(first)[:k]]
+            results.append([(ids[owners[i]], float(sims[i])) for i in best])
+        return results
+
+    def exact_search(
+        self, queries: np.ndarray, k: int = 5
+    ) -> List[List[Tuple[str, float]]]:
+        """Brute-force search over every cell, for measuring recall."""
+        return self.search(queries, k, n_probe=len(self._state.lists))
+
+    # Snapshots
+
+    def save(self, path: str) -> None:
+        """Write the index to ``path`` (.npz) atomically."""
+        with self._lock:
+            self._state = state = self._compact(self._state)
+
+        sizes = [len(lst.owners) for lst in state.lists]
+        dim = max((lst.vectors.shape[1] for lst in state.lists), default=0)
+        vectors = (
+            np.vstack([lst.vectors for lst in state.lists if len(lst.owners)])
+            if sum(sizes)
+            else np.empty((0, dim), dtype=np.float32)
+        )
+        owners = (
+            np.concatenate([lst.owners for lst in state.lists])
+            if sum(sizes)
+            else np.empty(0, dtype=np.int64)
+        )
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=(
+                state.centroids
+                if state.centroids is not None
+                else np.empty((0, dim), dtype=np.float32)
+            ),
+            vectors=vectors,
+            owners=owners,
+            list_sizes=np.asarray(sizes, dtype=np.int64),
+            ids=np.asarray(state.ids, dtype=str),
+            params=np.asarray(
+                [self.n_lists, self.n_probe, self.train_threshold, self.train_sample]
+            ),
+        )
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """Replace the index contents with a snapshot written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            centroids = data["centroids"]
+            vectors = data["vectors"]
+            owners = data["owners"]
+            bounds = np.concatenate([[0], np.cumsum(data["list_sizes"])])
+            ids = data["ids"].tolist()
+            params = data["params"].tolist()
+
+        lists = tuple(
+            _InvertedList(vectors[lo:hi], owners[lo:hi])
+            for lo, hi in zip(bounds[:-1], bounds[1:])
+        )
+        with self._lock:
+            self.n_lists, self.n_probe, self.train_threshold, self.train_sample = params
+            self._slots = {student_id: slot for slot, student_id in enumerate(ids)}
+            self._state = _IndexState(
+                centroids if len(centroids) else None,
+                lists or (_empty_list(),),
+                tuple(ids),
+            )
+
+    # State transitions (called with the lock held)
+
+    def _without_slots(self, state: _IndexState, slots: List[int]) -> _IndexState:
+        if not slots:
+            return state
+        drop = np.asarray(slots, dtype=np.int64)
+        lists = []
+        for lst in state.lists:
+            keep = ~np.isin(lst.owners, drop)
+            lists.append(
+                lst
+                if keep.all()
+                else _InvertedList(lst.vectors[keep], lst.owners[keep])
+            )
+        return replace(state, lists=tuple(lists))
+
+    def _compact(self, state: _IndexState) -> _IndexState:
+        """Renumber live slots 0..n-1, dropping those of removed students."""
+        live = sorted(self._slots.values())
+        if len(live) == len(state.ids):
+            return state
+        remap = np.full(len(state.ids), -1, dtype=np.int64)
+        remap[live] = np.arange(len(live))
+        ids = tuple(state.ids[slot] for slot in live)
+        self._slots = {student_id: slot for slot, student_id in enumerate(ids)}
+        return replace(
+            state,
+            lists=tuple(
+                _InvertedList(lst.vectors, remap[lst.owners]) for lst in state.lists
+            ),
+            ids=ids,
+        )
+
+    def _with_rows(
+        self, state: _IndexState, vectors: np.ndarray, owners: np.ndarray
+    ) -> _IndexState:
+        if state.centroids is None:
+            lst = state.lists[0]
+            merged = (
+                _InvertedList(
+                    np.vstack([lst.vectors, vectors]),
+                    np.concatenate([lst.owners, owners]),
+                )
+                if len(lst.owners)
+                else _InvertedList(vectors, owners)
+            )
+            return replace(state, lists=(merged,))
+
+        assign = _assign(vectors, state.centroids)
+        lists = list(state.lists)
+        for cell in np.unique(assign):
+            rows = assign == cell
+            lists[cell] = _InvertedList(
+                np.vstack([lists[cell].vectors, vectors[rows]]),
+                np.concatenate([lists[cell].owners, owners[rows]]),
+            )
+        return replace(state, lists=tuple(lists))
+
+    def _train(self, state: _IndexState) -> _IndexState:
+        vectors = np.vstack([lst.vectors for lst in state.lists if len(lst.owners)])
+        owners = np.concatenate([lst.owners for lst in state.lists])
+        n_lists = self.n_lists or int(np.sqrt(len(vectors)))
+        n_lists = max(1, min(n_lists, len(vectors)))
+
+        sample = vectors
+        if len(vectors) > self.train_sample:
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), self.train_sample, replace=False)]
+        centroids = spherical_kmeans(sample, n_lists)
+        assign = _assign(vectors, centroids)
+        return _IndexState(
+            centroids, tuple(_group(vectors, owners, assign, n_lists)), state.ids
+        )
+
+
+# Campus-wide index for identifying faces outside a subject's roster
+campus_index = IVFIndex(
+    n_lists=settings.ANN_INDEX_N_LISTS, n_probe=settings.ANN_INDEX_N_PROBE
+)
@@ -1,63 +1,176 @@
 import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Literal, Optional
+
 import cv2
 import mediapipe as mp
 import numpy as np
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 
+from app.core import tracing
+from app.core.config import settings
+
 MIN_FACE_AREA_RATIO = 0.04
 NUM_JITTERS = 3
 
+# "hog" and "cnn" are single-pass detection (names kept from dlib for API
+# compatibility); "tiled" also detects on overlapping full-resolution tiles
+DetectionModel = Literal["hog", "cnn", "tiled"]
+
 # Use absolute path resolution to ensure it works in Docker and all environments
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 model_path = os.path.join(BASE_DIR, "blaze_face_short_range.tflite")
 
-# Lazy-initialized detector — created on first use to avoid import-time crash
-# if the model file has not yet been downloaded.
-_detector = None
 
+def _create_detector():
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    options = vision.FaceDetectorOptions(
+        base_options=base_options,
+        running_mode=vision.RunningMode.IMAGE,
+        min_detection_confidence=0.6,
+    )
+    return vision.FaceDetector.create_from_options(options)
+
+
+class DetectorPool:
+    """
+    Pool of MediaPipe FaceDetector instances for use across worker threads.
+
+    A FaceDetector must not be used by two threads at once, so each call
+    checks one out for exclusive use and returns it afterwards. Detectors are
+    created lazily up to ``size`` (or all at once by ``warm_up``); when all
+    are busy, callers block until one is checked back in.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
 
-def _get_detector():
-    global _detector
-    if _detector is None:
-        base_options = python.BaseOptions(model_asset_path=model_path)
-        options = vision.FaceDetectorOptions(
-            base_options=base_options,
-            running_mode=vision.RunningMode.IMAGE,
-            min_detection_confidence=0.6,
+    @property
+    def created(self) -> int:
+        return self._created
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                # Created lazily so importing this module never needs the model
+                detector = _create_detector()
+                self._created += 1
+                return detector
+        return self._idle.get()
+
+    @contextmanager
+    def checkout(self) -> Iterator:
+        detector = self._acquire()
+        try:
+            yield detector
+        finally:
+            self._idle.put(detector)
+
+    def warm_up(self) -> None:
+        """Create every detector and run one inference on a blank frame each."""
+        frame = mp.Image(
+            image_format=mp.ImageFormat.SRGB,
+            data=np.zeros((128, 128, 3), dtype=np.uint8),
         )
-        _detector = vision.FaceDetector.create_from_options(options)
-    return _detector
+        detectors = [self._acquire() for _ in range(self.size)]
+        try:
+            for detector in detectors:
+                detector.detect(frame)
+        finally:
+            for detector in detectors:
+                self._idle.put(detector)
+
+
+# One detector per image worker thread
+detector_pool = DetectorPool(
+    settings.DETECTOR_POOL_SIZE or settings.IMAGE_POOL_WORKERS or os.cpu_count() or 1
+)
+
 
+class FaceBox(tuple):
+    """
+    ``(x, y, width, height)`` of a detected face in pixels.
 
-def detect_faces(image: np.ndarray) -> list[tuple[int, int, int, int]]:
+    ``keypoints`` is an (n, 2) array of landmark pixel coordinates (MediaPipe:
+    right eye, left eye, nose tip, mouth, right ear, left ear), or None.
+    ``score`` is the detector's confidence.
+    """
+
+    keypoints: Optional[np.ndarray]
+    score: float
+
+    def __new__(cls, box, keypoints: Optional[np.ndarray] = None, score: float = 1.0):
+        face = super().__new__(cls, box)
+        face.keypoints = keypoints
+        face.score = score
+        return face
+
+    def scaled(self, scale: float) -> "FaceBox":
+        """The same face in an image ``scale`` times larger."""
+        return FaceBox(
+            tuple(round(v * scale) for v in self),
+            None if self.keypoints is None else self.keypoints * scale,
+            self.score,
+        )
+
+    def shifted(self, dx: int, dy: int) -> "FaceBox":
+        """The same face in an image whose origin is (-dx, -dy) from this one's."""
+        x, y, w, h = self
+        return FaceBox(
+            (x + dx, y + dy, w, h),
+            None if self.keypoints is None else self.keypoints + (dx, dy),
+            self.score,
+        )
+
+
+def detect_faces(image: np.ndarray) -> list[FaceBox]:
     """Detect faces in image. Expects RGB (e.g. from PIL Image.convert('RGB'))."""
     # API sends RGB from PIL; MediaPipe expects RGB — use as-is.
-    if image.ndim == 2:
-        image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
+    with tracing.span("color_convert"):
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2RGB)
 
-    # Create MediaPipe Image
-    mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
+        # Create MediaPipe Image
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=image)
 
     # Detect faces
-    result = _get_detector().detect(mp_image)
+    with detector_pool.checkout() as detector:
+        result = detector.detect(mp_image)
 
     if not result.detections:
         return []
 
+    height, width = image.shape[:2]
     faces = []
 
-    # Parse results - FaceDetector returns bounding box in pixels
+    # Parse results - bounding boxes are in pixels, keypoints are normalized
     for detection in result.detections:
         bbox = detection.bounding_box
-        x1 = bbox.origin_x
-        y1 = bbox.origin_y
-        w_box = bbox.width
-        h_box = bbox.height
-
-        x2 = x1 + w_box
-        y2 = y1 + h_box
-
-        faces.append((y1, x2, y2, x1))
+        keypoints = (
+            np.asarray(
+                [(kp.x * width, kp.y * height) for kp in detection.keypoints],
+                dtype=np.float32,
+            )
+            if detection.keypoints
+            else None
+        )
+        score = detection.categories[0].score if detection.categories else 1.0
+        faces.append(
+            FaceBox(
+                (bbox.origin_x, bbox.origin_y, bbox.width, bbox.height),
+                keypoints,
+                score,
+            )
+        )
 
     return faces
@@ -1,7 +1,12 @@
-from typing import List, Union
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+StorageDtype = Literal["float32", "float16", "int8"]
+
+# Quantized rows are widened to float32 this many at a time while scoring
+_SCORE_CHUNK = 4096
+
 
 def cosine_similarity(
     a: Union[List[float], np.ndarray],
@@ -15,3 +20,162 @@ def cosine_similarity(
     if norm_a == 0 or norm_b == 0:
         return 0.0
     return float(np.dot(a_arr, b_arr) / (norm_a * norm_b))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row in place. Zero rows are left as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def quantize_rows(
+    matrix: np.ndarray, dtype: StorageDtype
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Store rows as ``dtype``. Returns ``(data, scales)``.
+
+    int8 is symmetric per row: ``row ~= data * scale`` with ``scale =
+    max|row| / 127``. Other dtypes have no scales.
+    """
+    if dtype == "int8":
+        scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.empty(0)
+        scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+        data = np.rint(matrix / scales[:, None]).astype(np.int8)
+        return data, scales
+    return np.ascontiguousarray(matrix, dtype=np.dtype(dtype)), None
+
+
+class CandidateMatrix:
+    """
+    All candidate embeddings stacked into one pre-normalized matrix.
+
+    Rows belonging to the same student are contiguous; ``offsets[i]`` is the
+    first row of ``student_ids[i]``. Scoring a batch of query faces is a single
+    matrix multiply followed by a segmented max over each student's rows, which
+    gives the same result as calling ``cosine_similarity`` per embedding.
+
+    The matrix may be float32, float16 or int8 (with per-row ``scales``), so a
+    resident gallery takes 2-4x less memory. NumPy has no fast half/int8
+    matmul, so quantized rows are widened to float32 in cache-sized chunks
+    while scoring; only the chunk is ever held at full precision.
+    """
+
+    def __init__(
+        self,
+        student_ids: List[str],
+        matrix: np.ndarray,
+        offsets: np.ndarray,
+        scales: Optional[np.ndarray] = None,
+    ):
+        self.student_ids = student_ids
+        self.matrix = matrix
+        self.offsets = offsets
+        self.scales = scales
+
+    @property
+    def dtype(self) -> str:
+        return "int8" if self.scales is not None else self.matrix.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    @classmethod
+    def from_blocks(
+        cls, blocks: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]
+    ) -> "CandidateMatrix":
+        """Stack per-student ``(rows, scales)`` blocks from ``student_blocks``."""
+        student_ids = list(blocks)
+        if not student_ids:
+            return cls([], np.empty((0, 0), dtype=np.float32), np.empty(0, np.intp))
+
+        data = [blocks[sid][0] for sid in student_ids]
+        offsets = np.cumsum([0] + [len(d) for d in data[:-1]]).astype(np.intp)
+        scales = [blocks[sid][1] for sid in student_ids]
+        return cls(
+            student_ids,
+            np.ascontiguousarray(np.vstack(data)),
+            offsets,
+            None if scales[0] is None else np.concatenate(scales),
+        )
+
+    def student_blocks(self) -> Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]:
+        """Each student's rows (and scales), as views into this matrix."""
+        bounds = [*self.offsets.tolist(), self.matrix.shape[0]]
+        return {
+            sid: (
+                self.matrix[lo:hi],
+                None if self.scales is None else self.scales[lo:hi],
+            )
+            for sid, lo, hi in zip(self.student_ids, bounds[:-1], bounds[1:])
+        }
+
+    @classmethod
+    def from_candidates(
+        cls,
+        candidates: Sequence[Tuple[str, Sequence[Sequence[float]]]],
+        dtype: StorageDtype = "float32",
+    ) -> "CandidateMatrix":
+        """Build from ``(student_id, embeddings)`` pairs."""
+        student_ids: List[str] = []
+        offsets: List[int] = []
+        rows: List[Sequence[float]] = []
+
+        for student_id, embeddings in candidates:
+            if len(embeddings) == 0:
+                raise ValueError(f"Candidate {student_id} has no embeddings")
+            student_ids.append(student_id)
+            offsets.append(len(rows))
+            rows.extend(embeddings)
+
+        matrix = (
+            np.asarray(rows, dtype=np.float32)
+            if rows
+            else np.empty((0, 0), dtype=np.float32)
+        )
+        data, scales = quantize_rows(normalize_rows(matrix), dtype)
+        return cls(student_ids, data, np.asarray(offsets, dtype=np.intp), scales)
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    def score(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Per-student best cosine similarity for each query.
+
+        Returns an array of shape ``(n_queries, n_students)``.
+        """
+        queries = normalize_rows(np.array(queries, dtype=np.float32, ndmin=2))
+        if len(self) == 0:
+            return np.empty((len(queries), 0), dtype=np.float32)
+        return np.maximum.reduceat(self._similarities(queries), self.offsets, axis=1)
+
+    def _similarities(self, queries: np.ndarray) -> np.ndarray:
+        if self.matrix.dtype == np.float32:
+            return queries @ self.matrix.T
+
+        n_rows = self.matrix.shape[0]
+        sims = np.empty((len(queries), n_rows), dtype=np.float32)
+        for start in range(0, n_rows, _SCORE_CHUNK):
+            block = self.matrix[start : start + _SCORE_CHUNK].astype(np.float32)
+            sims[:, start : start + len(block)] = queries @ block.T
+        if self.scales is not None:
+            sims *= self.scales
+        return sims
+
+    def best_matches(self, queries: np.ndarray) -> Tuple[List[str | None], np.ndarray]:
+        """
+        Best candidate for each query.
+
+        Returns ``(student_ids, scores)``. When there are no candidates every
+        query gets ``None`` with a score of -1, matching the per-pair loop.
+        """
+        per_student = self.score(queries)
+        n_queries = per_student.shape[0]
+        if per_student.shape[1] == 0:
+            return [None] * n_queries, np.full(n_queries, -1.0)
+
+        best_idx = np.argmax(per_student, axis=1)
+        best_scores = per_student[np.arange(n_queries), best_idx].astype(np.float64)
+        return [self.student_ids[i] for i in best_idx], best_scores
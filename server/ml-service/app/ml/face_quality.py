@@ -0,0 +1,80 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Crops are scored at the encoder's input size so the score reflects what
+# the embedding actually sees
+_SIZE = 96
+# Laplacian variance of a sharp face at _SIZE; blurrier crops score lower
+_SHARPNESS_REF = 200.0
+# Nose offset from the eye midpoint (in eye distances) of a full profile
+_PROFILE_YAW = 0.5
+# Eye-line tilt (radians) at which a face scores zero for roll
+_MAX_ROLL = np.pi / 4
+
+# MediaPipe face detector keypoint order
+RIGHT_EYE, LEFT_EYE, NOSE_TIP = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class FaceQuality:
+    """Quality of a face crop. Every component is in [0, 1], 1 = best."""
+
+    sharpness: float
+    brightness: float
+    frontal: float
+
+    @property
+    def score(self) -> float:
+        """Geometric mean, so any one bad component drags the score down."""
+        return float(np.cbrt(self.sharpness * self.brightness * self.frontal))
+
+
+def _sharpness(gray: np.ndarray) -> float:
+    variance = cv2.Laplacian(gray, cv2.CV_32F).var()
+    return float(min(1.0, variance / _SHARPNESS_REF))
+
+
+def _brightness(gray: np.ndarray) -> float:
+    """1 for mid-gray exposure, falling to 0 for black or blown-out crops."""
+    return float(max(0.0, 1.0 - abs(gray.mean() - 127.5) / 127.5))
+
+
+def _frontal(keypoints: Optional[np.ndarray]) -> float:
+    """
+    Pose score from detector keypoints (pixel coordinates).
+
+    Yaw is the nose tip's horizontal offset from the eye midpoint relative to
+    the eye distance; roll is the tilt of the eye line. Without keypoints the
+    pose is unknown and scores 1.
+    """
+    if keypoints is None or len(keypoints) <= NOSE_TIP:
+        return 1.0
+    right_eye, left_eye, nose = (
+        keypoints[RIGHT_EYE],
+        keypoints[LEFT_EYE],
+        keypoints[NOSE_TIP],
+    )
+    eye_vector = left_eye - right_eye
+    eye_distance = float(np.hypot(*eye_vector))
+    if eye_distance < 1e-6:
+        return 0.0
+
+    yaw = abs(nose[0] - (right_eye[0] + left_eye[0]) / 2) / eye_distance
+    roll = abs(np.arctan2(eye_vector[1], abs(eye_vector[0])))
+    yaw_score = max(0.0, 1.0 - yaw / _PROFILE_YAW)
+    roll_score = max(0.0, 1.0 - roll / _MAX_ROLL)
+    return float(yaw_score * roll_score)
+
+
+def assess_face(
+    crop: np.ndarray, keypoints: Optional[np.ndarray] = None
+) -> FaceQuality:
+    """Score a face crop for blur, exposure and pose before it is embedded."""
+    if crop.size == 0:
+        return FaceQuality(0.0, 0.0, 0.0)
+    gray = crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+    gray = cv2.resize(gray, (_SIZE, _SIZE))
+    return FaceQuality(_sharpness(gray), _brightness(gray), _frontal(keypoints))
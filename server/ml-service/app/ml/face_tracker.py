@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+# (top, right, bottom, left), the FaceLocation order
+Box = Tuple[int, int, int, int]
+
+
+@dataclass
+class Track:
+    """One face followed across the frames of a capture session."""
+
+    track_id: int
+    box: Box
+    quality: float  # quality of the frame the embedding was computed from
+    embedding: Optional[np.ndarray] = None
+    hits: int = 1
+    missed: int = 0
+
+
+@dataclass
+class Assignment:
+    track: Track
+    needs_embedding: bool
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (n, 4) and (m, 4) TRBL boxes, shape (n, m)."""
+    top = np.maximum(a[:, None, 0], b[None, :, 0])
+    right = np.minimum(a[:, None, 1], b[None, :, 1])
+    bottom = np.minimum(a[:, None, 2], b[None, :, 2])
+    left = np.maximum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(right - left, 0, None) * np.clip(bottom - top, 0, None)
+    area_a = (a[:, 1] - a[:, 3]) * (a[:, 2] - a[:, 0])
+    area_b = (b[:, 1] - b[:, 3]) * (b[:, 2] - b[:, 0])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def _centers(boxes: np.ndarray) -> np.ndarray:
+    return np.stack(
+        [(boxes[:, 1] + boxes[:, 3]) / 2, (boxes[:, 0] + boxes[:, 2]) / 2], axis=1
+    )
+
+
+class FaceTracker:
+    """
+    Associates face detections between consecutive frames of one capture.
+
+    A detection continues the track whose box overlaps it most (IoU at least
+    ``iou_threshold``) or, for faces that moved faster than their size,
+    whose center is within ``center_ratio`` box widths. Only new tracks and
+    tracks seen at ``quality_gain`` times the quality of their current
+    embedding need a new embedding, so a static classroom costs detection
+    only. Tracks unseen for more than ``max_missed`` frames end.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        center_ratio: float = 0.5,
+        max_missed: int = 5,
+        quality_gain: float = 1.25,
+    ):
+        self.iou_threshold = iou_threshold
+        self.center_ratio = center_ratio
+        self.max_missed = max_missed
+        self.quality_gain = quality_gain
+        self.frames = 0
+        self.last_used = time.monotonic()
+        self._tracks: List[Track] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def active_tracks(self) -> int:
+        return len(self._tracks)
+
+    def associate(
+        self, boxes: Sequence[Box], qualities: Sequence[float]
+    ) -> Tuple[List[Assignment], List[int]]:
+        """
+        Assign each of a frame's boxes to a track.
+
+        Returns one assignment per box and the ids of tracks that ended.
+        """
+        with self._lock:
+            self.frames += 1
+            self.last_used = time.monotonic()
+            matched = self._match(boxes)
+
+            assignments = []
+            seen = set()
+            for i, (box, quality) in enumerate(zip(boxes, qualities)):
+                track = matched.get(i)
+                if track is None:
+                    track = Track(self._next_id, tuple(box), quality)
+                    self._next_id += 1
+                    self._tracks.append(track)
+                    needs_embedding = True
+                else:
+                    track.box = tuple(box)
+                    track.hits += 1
+                    track.missed = 0
+                    needs_embedding = (
+                        track.embedding is None
+                        or quality >= track.quality * self.quality_gain
+                    )
+                seen.add(track.track_id)
+                assignments.append(Assignment(track, needs_embedding))
+
+            ended = []
+            live = []
+            for track in self._tracks:
+                if track.track_id not in seen:
+                    track.missed += 1
+                if track.missed > self.max_missed:
+                    ended.append(track.track_id)
+                else:
+                    live.append(track)
+            self._tracks = live
+            return assignments, ended
+
+    def record(self, track: Track, embedding: np.ndarray, quality: float) -> None:
+        """Store the embedding computed for a track and the quality it came from."""
+        with self._lock:
+            track.embedding = embedding
+            track.quality = quality
+
+    def _match(self, boxes: Sequence[Box]) -> dict:
+        """Greedy one-to-one matching of boxes (by index) to live tracks."""
+        if not self._tracks or not boxes:
+            return {}
+        prev = np.asarray([t.box for t in self._tracks], dtype=np.float32)
+        curr = np.asarray(boxes, dtype=np.float32)
+
+        iou = box_iou(prev, curr)
+        size = np.maximum(prev[:, 1] - prev[:, 3], prev[:, 2] - prev[:, 0])
+        distance = (
+            np.linalg.norm(
+                _centers(prev)[:, None, :] - _centers(curr)[None, :, :], axis=2
+            )
+            / np.maximum(size, 1)[:, None]
+        )
+        eligible = (iou >= self.iou_threshold) | (distance <= self.center_ratio)
+        # Prefer overlap, then proximity
+        score = np.where(eligible, iou + 1.0 / (1.0 + distance), -np.inf)
+
+        matched = {}
+        used_tracks = set()
+        for flat in np.argsort(-score, axis=None):
+            t, b = divmod(int(flat), len(boxes))
+            if not np.isfinite(score[t, b]):
+                break
+            if t in used_tracks or b in matched:
+                continue
+            matched[b] = self._tracks[t]
+            used_tracks.add(t)
+        return matched
+
+
+class TrackerStore:
+    """Thread-safe LRU of trackers keyed by capture session id."""
+
+    def __init__(self, max_sessions: int = 256, ttl_seconds: float = 300, **options):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.options = options
+        self._trackers: "OrderedDict[str, FaceTracker]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> FaceTracker:
+        """The session's tracker, starting a new one for unknown or idle sessions."""
+        now = time.monotonic()
+        with self._lock:
+            tracker = self._trackers.get(session_id)
+            if tracker is None or now - tracker.last_used > self.ttl_seconds:
+                tracker = FaceTracker(**self.options)
+                self._trackers[session_id] = tracker
+            self._trackers.move_to_end(session_id)
+            while len(self._trackers) > self.max_sessions:
+                self._trackers.popitem(last=False)
+            return tracker
+
+    def end(self, session_id: str) -> bool:
+        with self._lock:
+            return self._trackers.pop(session_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._trackers.clear()
+
+    def __len__(self) -> int:
+        return len(self._trackers)
+
+
+# Capture-session trackers used by the /track-faces routes
+tracker_store = TrackerStore(
+    max_sessions=settings.TRACKER_MAX_SESSIONS,
+    ttl_seconds=settings.TRACKER_SESSION_TTL_SECONDS,
+    iou_threshold=settings.TRACKER_IOU_THRESHOLD,
+    max_missed=settings.TRACKER_MAX_MISSED,
+    quality_gain=settings.TRACKER_QUALITY_GAIN,
+)
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.face_matcher import (
+    CandidateMatrix,
+    StorageDtype,
+    normalize_rows,
+    quantize_rows,
+)
+
+
+class Gallery:
+    """Resident, pre-normalized embeddings for one gallery (usually a subject)."""
+
+    def __init__(self, gallery_id: str, version: str, matrix: CandidateMatrix):
+        self.gallery_id = gallery_id
+        self.version = version
+        self.matrix = matrix
+
+    @property
+    def student_count(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def embedding_count(self) -> int:
+        return int(self.matrix.matrix.shape[0])
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.matrix.nbytes
+
+
+class GalleryStore:
+    """
+    Thread-safe LRU store of galleries keyed by id.
+
+    Galleries are immutable once built; updates swap in a new ``Gallery`` so a
+    reader holding the old one can finish matching against it.
+    """
+
+    def __init__(self, max_galleries: int = 256, dtype: StorageDtype = "float32"):
+        self.max_galleries = max_galleries
+        self.dtype = dtype
+        self._galleries: "OrderedDict[str, Gallery]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        gallery_id: str,
+        version: str,
+        candidates: Iterable[Tuple[str, Sequence[Sequence[float]]]],
+    ) -> Gallery:
+        """Create or fully replace a gallery."""
+        gallery = Gallery(
+            gallery_id,
+            version,
+            CandidateMatrix.from_blocks(_to_blocks(candidates, self.dtype)),
+        )
+        with self._lock:
+            self._galleries[gallery_id] = gallery
+            self._galleries.move_to_end(gallery_id)
+            while len(self._galleries) > self.max_galleries:
+                self._galleries.popitem(last=False)
+        return gallery
+
+    def update(
+        self,
+        gallery_id: str,
+        version: str,
+        upsert: Iterable[Tuple[str, Sequence[Sequence[float]]]] = (),
+        remove: Iterable[str] = (),
+    ) -> Optional[Gallery]:
+        """
+        Replace or add some students' embeddings and drop others.
+
+        Returns ``None`` if the gallery is not resident.
+        """
+        new_blocks = _to_blocks(upsert, self.dtype)
+        with self._lock:
+            current = self._galleries.get(gallery_id)
+            if current is None:
+                return None
+            blocks = current.matrix.student_blocks()
+            for student_id in remove:
+                blocks.pop(student_id, None)
+            blocks.update(new_blocks)
+            gallery = Gallery(gallery_id, version, CandidateMatrix.from_blocks(blocks))
+            self._galleries[gallery_id] = gallery
+            self._galleries.move_to_end(gallery_id)
+        return gallery
+
+    def evict(self, gallery_id: str) -> bool:
+        with self._lock:
+            return self._galleries.pop(gallery_id, None) is not None
+
+    def get(self, gallery_id: str) -> Optional[Gallery]:
+        with self._lock:
+            gallery = self._galleries.get(gallery_id)
+            if gallery is not None:
+                self._galleries.move_to_end(gallery_id)
+            return gallery
+
+    def clear(self) -> None:
+        with self._lock:
+            self._galleries.clear()
+
+    def __len__(self) -> int:
+        return len(self._galleries)
+
+
+def _to_blocks(
+    candidates: Iterable[Tuple[str, Sequence[Sequence[float]]]], dtype: StorageDtype
+) -> Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]]:
+    blocks = {}
+    for student_id, embeddings in candidates:
+        if len(embeddings) == 0:
+            raise ValueError(f"Candidate {student_id} has no embeddings")
+        rows = normalize_rows(np.array(embeddings, dtype=np.float32, ndmin=2))
+        blocks[student_id] = quantize_rows(rows, dtype)
+    return blocks
+
+
+# Process-wide gallery store shared by the gallery and matching routes
+gallery_store = GalleryStore(
+    max_galleries=settings.GALLERY_MAX_COUNT, dtype=settings.GALLERY_STORAGE_DTYPE
+)
@@ -0,0 +1,158 @@
+import os
+import re
+import threading
+from typing import Dict, Literal, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.face_matcher import normalize_rows
+
+ProjectionMethod = Literal["pca", "random"]
+
+_VERSION_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+
+class EmbeddingProjection:
+    """
+    Linear map from raw face embeddings to a compact, L2-normalized space.
+
+    ``project(x) = normalize((x - mean) @ components.T)``. Cosine similarity
+    between projected embeddings approximates cosine similarity between the
+    raw ones while every stored vector, payload and dot product shrinks from
+    ``input_dim`` to ``output_dim`` floats.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        method: str,
+        mean: np.ndarray,
+        components: np.ndarray,
+    ):
+        self.version = version
+        self.method = method
+        self.mean = mean.astype(np.float32)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+
+    @property
+    def input_dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def output_dim(self) -> int:
+        return self.components.shape[0]
+
+    def project(self, embeddings: np.ndarray) -> np.ndarray:
+        embeddings = np.array(embeddings, dtype=np.float32, ndmin=2)
+        if embeddings.shape[1] != self.input_dim:
+            raise ValueError(
+                f"Projection {self.version} expects {self.input_dim}-dim "
+                f"embeddings, got {embeddings.shape[1]}"
+            )
+        return normalize_rows((embeddings - self.mean) @ self.components.T)
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.asarray(self.version),
+            method=np.asarray(self.method),
+            mean=self.mean,
+            components=self.components,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EmbeddingProjection":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                str(data["version"]),
+                str(data["method"]),
+                data["mean"],
+                data["components"],
+            )
+
+
+def fit_pca(
+    embeddings: np.ndarray, dim: int, version: str, seed: int = 0
+) -> EmbeddingProjection:
+    """
+    PCA via a randomized range finder (Halko et al.), which only needs
+    ``O(n * d * dim)`` work instead of a full SVD of the corpus.
+    """
+    x = np.array(embeddings, dtype=np.float32, ndmin=2)
+    if len(x) < dim:
+        raise ValueError(f"Need at least {dim} embeddings to fit {dim} components")
+    mean = x.mean(axis=0)
+    x = x - mean
+
+    rng = np.random.default_rng(seed)
+    basis = x @ rng.standard_normal((x.shape[1], dim + 10)).astype(np.float32)
+    for _ in range(2):
+        # Power iterations sharpen the range estimate for slowly decaying spectra
+        basis, _ = np.linalg.qr(x @ (x.T @ basis))
+    basis, _ = np.linalg.qr(basis)
+    _, _, vt = np.linalg.svd(basis.T @ x, full_matrices=False)
+    return EmbeddingProjection(version, "pca", mean, vt[:dim])
+
+
+def fit_random(input_dim: int, dim: int, version: str, seed: int = 0):
+    """Gaussian random projection; needs no training data."""
+    rng = np.random.default_rng(seed)
+    components = rng.standard_normal((dim, input_dim)).astype(np.float32)
+    components /= np.sqrt(dim)
+    return EmbeddingProjection(
+        version, "random", np.zeros(input_dim, dtype=np.float32), components
+    )
+
+
+class ProjectionStore:
+    """
+    Versioned projection artifacts in ``EMBEDDING_PROJECTION_DIR``.
+
+    Each version is saved once as ``<version>.npz`` and never overwritten, so
+    stored embeddings can always be traced to the matrix that produced them.
+    """
+
+    def __init__(self, directory: str, active_version: str = ""):
+        self.directory = directory
+        self.active_version = active_version
+        self._cache: Dict[str, EmbeddingProjection] = {}
+        self._lock = threading.Lock()
+
+    def path(self, version: str) -> str:
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid projection version {version!r}")
+        return os.path.join(self.directory, f"{version}.npz")
+
+    def save(self, projection: EmbeddingProjection) -> None:
+        path = self.path(projection.version)
+        if os.path.exists(path):
+            raise ValueError(f"Projection {projection.version} already exists")
+        os.makedirs(self.directory, exist_ok=True)
+        projection.save(path)
+        with self._lock:
+            self._cache[projection.version] = projection
+
+    def get(self, version: str) -> EmbeddingProjection:
+        with self._lock:
+            projection = self._cache.get(version)
+        if projection is None:
+            path = self.path(version)
+            if not os.path.exists(path):
+                raise ValueError(f"Projection {version} not found")
+            projection = EmbeddingProjection.load(path)
+            with self._lock:
+                self._cache[version] = projection
+        return projection
+
+    @property
+    def active(self) -> Optional[EmbeddingProjection]:
+        """Projection applied to new embeddings, or None for raw embeddings."""
+        return self.get(self.active_version) if self.active_version else None
+
+
+projection_store = ProjectionStore(
+    settings.EMBEDDING_PROJECTION_DIR, settings.EMBEDDING_PROJECTION_VERSION
+)
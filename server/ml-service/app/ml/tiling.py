@@ -0,0 +1,83 @@
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from app.ml.face_detector import FaceBox
+
+# (x, y, width, height) of a tile in full-resolution pixels
+Tile = Tuple[int, int, int, int]
+
+
+def _starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    if length <= tile_size:
+        return [0]
+    count = math.ceil((length - overlap) / (tile_size - overlap))
+    step = (length - tile_size) / (count - 1)
+    return [round(i * step) for i in range(count)]
+
+
+def tile_grid(
+    width: int, height: int, tile_size: int, overlap: int, max_tiles: int
+) -> List[Tile]:
+    """
+    Overlapping tiles covering a ``width`` x ``height`` image.
+
+    Adjacent tiles overlap by at least ``overlap`` pixels, so a face up to that
+    size is whole in at least one tile. Tiles grow beyond ``tile_size`` when
+    more than ``max_tiles`` would be needed.
+    """
+    overlap = max(0, min(overlap, tile_size // 2))
+    while True:
+        xs = _starts(width, tile_size, overlap)
+        ys = _starts(height, tile_size, overlap)
+        if len(xs) * len(ys) <= max(1, max_tiles):
+            break
+        tile_size = math.ceil(tile_size * 1.25)
+    return [
+        (x, y, min(tile_size, width - x), min(tile_size, height - y))
+        for y in ys
+        for x in xs
+    ]
+
+
+def merge_detections(
+    faces: Sequence[FaceBox], iou_threshold: float, containment_threshold: float
+) -> List[FaceBox]:
+    """
+    Non-max suppression over detections from overlapping tiles.
+
+    Faces are taken in descending score order and dropped when they overlap
+    a kept face by ``iou_threshold`` IoU. A face cut by a tile edge is a
+    smaller box mostly inside the whole one (``containment_threshold`` of its
+    area), so between such a pair the larger box is kept regardless of score.
+    """
+    if not faces:
+        return []
+    boxes = np.asarray(faces, dtype=np.float32)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+
+    keep: List[int] = []
+    for i in sorted(range(len(faces)), key=lambda i: faces[i].score, reverse=True):
+        k = np.asarray(keep, dtype=np.intp)
+        inter = np.clip(np.minimum(x2[i], x2[k]) - np.maximum(x1[i], x1[k]), 0, None)
+        inter *= np.clip(np.minimum(y2[i], y2[k]) - np.maximum(y1[i], y1[k]), 0, None)
+        union = areas[i] + areas[k] - inter
+        smaller = np.minimum(areas[i], areas[k])
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        contained = np.divide(
+            inter, smaller, out=np.zeros_like(inter), where=smaller > 0
+        )
+
+        overlapping = (iou >= iou_threshold) | (contained >= containment_threshold)
+        if not overlapping.any():
+            keep.append(i)
+        elif (contained[overlapping] >= containment_threshold).all() and (
+            areas[i] > areas[k[overlapping]]
+        ).all():
+            # i is the whole face that the kept (cut) boxes lie inside
+            keep = [j for j in keep if j not in set(k[overlapping].tolist())]
+            keep.append(i)
+    return [faces[i] for i in sorted(keep)]
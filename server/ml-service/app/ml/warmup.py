@@ -0,0 +1,77 @@
+"""
+Startup warm-up for the detection and embedding models.
+
+Loading the MediaPipe graph and touching the OpenCV/numpy code paths for the
+first time is slow, so the service runs synthetic frames through every
+detector and the encoder before it reports ready.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.metrics import MODEL_WARMUP_DURATION, SERVICE_READY
+from app.ml.face_detector import detect_faces, detector_pool
+from app.ml.face_encoder import get_face_embeddings
+from app.ml.projection import projection_store
+
+# Typical webcam and classroom-camera resolutions
+WARMUP_FRAME_SHAPES = [(480, 640, 3), (1080, 1920, 3)]
+
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    error: str | None = None
+    durations: Dict[str, float] | None = None
+
+
+warmup_state = WarmupState()
+
+
+def _synthetic_frames() -> List[np.ndarray]:
+    rng = np.random.default_rng(0)
+    return [
+        rng.integers(0, 256, shape, dtype=np.uint8) for shape in WARMUP_FRAME_SHAPES
+    ]
+
+
+def warm_up_models() -> Dict[str, float]:
+    """
+    Create and exercise all models. Returns seconds spent per component.
+
+    Marks ``warmup_state`` ready on success and records the error otherwise.
+    """
+    durations: Dict[str, float] = {}
+    SERVICE_READY.set(0)
+    total_start = time.perf_counter()
+    try:
+        start = time.perf_counter()
+        detector_pool.warm_up()
+        durations["detector"] = time.perf_counter() - start
+
+        frames = _synthetic_frames()
+        start = time.perf_counter()
+        for frame in frames:
+            detect_faces(frame)
+        embeddings = get_face_embeddings([frame[:160, :160] for frame in frames])
+        # Fails warm-up (and readiness) if the configured artifact is missing
+        projection = projection_store.active
+        if projection is not None:
+            projection.project(embeddings)
+        durations["pipeline"] = time.perf_counter() - start
+        durations["total"] = time.perf_counter() - total_start
+    except Exception as e:
+        warmup_state.ready = False
+        warmup_state.error = str(e)
+        raise
+
+    for component, seconds in durations.items():
+        MODEL_WARMUP_DURATION.labels(component).set(seconds)
+    warmup_state.ready = True
+    warmup_state.error = None
+    warmup_state.durations = durations
+    SERVICE_READY.set(1)
+    return durations
@@ -1,11 +1,20 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
+from app.ml.face_detector import DetectionModel
+from app.ml.projection import ProjectionMethod
+from app.utils.embedding_codec import Embedding, EmbeddingFormat
 
-class EncodeFaceRequest(BaseModel):
-    """Request to encode a single face from an image"""
+EMBEDDING_FORMAT_DESCRIPTION = (
+    "Embedding wire format: list (JSON floats), float32 or float16 "
+    "(base64 little-endian blobs) or int8 (base64 float32 scale + int8 values). "
+    "Applies to request and response embeddings"
+)
+
+
+class EncodeFaceOptions(BaseModel):
+    """Options for encoding a single face from an image"""
 
-    image_base64: str = Field(..., description="Base64 encoded image string")
     validate_single: bool = Field(
         default=True, description="Validate that exactly one face exists"
     )
@@ -15,26 +24,84 @@ class EncodeFaceRequest(BaseModel):
     num_jitters: int = Field(
         default=5, description="Number of times to re-sample face for encoding"
     )
+    min_quality: Optional[float] = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description=(
+            "Skip faces whose quality score (blur, exposure, pose; 0-1) is "
+            "lower. Defaults to FACE_MIN_QUALITY"
+        ),
+    )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
 
 
-class DetectFacesRequest(BaseModel):
-    """Request to detect multiple faces from an image"""
+class EncodeFaceRequest(EncodeFaceOptions):
+    """Request to encode a single face from an image"""
 
     image_base64: str = Field(..., description="Base64 encoded image string")
+
+
+class DetectFacesOptions(BaseModel):
+    """Options for detecting multiple faces from an image"""
+
     min_face_area_ratio: float = Field(
         default=0.04, description="Minimum face area ratio"
     )
     num_jitters: int = Field(
         default=3, description="Number of times to re-sample face for encoding"
     )
-    model: str = Field(default="hog", description="Detection model: hog or cnn")
+    model: DetectionModel = Field(
+        default="hog",
+        description=(
+            "Detection model: hog or cnn (single pass) or tiled (also detects on "
+            "overlapping full-resolution tiles, for small faces in large photos)"
+        ),
+    )
+    min_quality: Optional[float] = Field(
+        default=None,
+        ge=0,
+        le=1,
+        description=(
+            "Skip faces whose quality score (blur, exposure, pose; 0-1) is "
+            "lower. Defaults to FACE_MIN_QUALITY"
+        ),
+    )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class DetectFacesRequest(DetectFacesOptions):
+    """Request to detect multiple faces from an image"""
+
+    image_base64: str = Field(..., description="Base64 encoded image string")
+
+
+class TrackFacesOptions(DetectFacesOptions):
+    """Options for detecting faces in one frame of a tracked capture"""
+
+    session_id: str = Field(
+        ...,
+        min_length=1,
+        max_length=128,
+        description="Capture session; frames with the same id share face tracks",
+    )
+
+
+class TrackFacesRequest(TrackFacesOptions):
+    """Request to detect and track faces in one frame of a capture"""
+
+    image_base64: str = Field(..., description="Base64 encoded image string")
 
 
 class CandidateEmbedding(BaseModel):
     """Candidate student embeddings for matching"""
 
     student_id: str = Field(..., description="Student ID")
-    embeddings: List[List[float]] = Field(
+    embeddings: List[Embedding] = Field(
         ..., description="List of face embeddings for this student"
     )
 
@@ -42,7 +109,7 @@ class CandidateEmbedding(BaseModel):
 class MatchFacesRequest(BaseModel):
     """Request to match a single face embedding against candidates"""
 
-    query_embedding: List[float] = Field(..., description="Face embedding to match")
+    query_embedding: Embedding = Field(..., description="Face embedding to match")
     candidate_embeddings: List[CandidateEmbedding] = Field(
         ..., description="Candidate students with embeddings"
     )
@@ -50,12 +117,15 @@ class MatchFacesRequest(BaseModel):
     return_all_distances: bool = Field(
         default=False, description="Return distances for all candidates"
     )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
 
 
 class DetectedFace(BaseModel):
     """A detected face with embedding"""
 
-    embedding: List[float] = Field(..., description="Face embedding")
+    embedding: Embedding = Field(..., description="Face embedding")
 
 
 class BatchMatchRequest(BaseModel):
@@ -65,7 +135,14 @@ class BatchMatchRequest(BaseModel):
         ..., description="List of detected faces to match"
     )
     candidate_embeddings: List[CandidateEmbedding] = Field(
-        ..., description="Candidate students with embeddings"
+        default=[], description="Candidate students with embeddings"
+    )
+    gallery_id: Optional[str] = Field(
+        default=None,
+        description="Match against a registered gallery instead of candidates",
+    )
+    gallery_version: Optional[str] = Field(
+        default=None, description="Expected gallery version; mismatch is an error"
     )
     confident_threshold: float = Field(
         default=0.50, description="Threshold for confident match"
@@ -73,3 +150,84 @@ class BatchMatchRequest(BaseModel):
     uncertain_threshold: float = Field(
         default=0.60, description="Threshold for uncertain match"
     )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class RegisterGalleryRequest(BaseModel):
+    """Request to create or replace a resident embedding gallery"""
+
+    version: str = Field(..., description="Caller-defined gallery version")
+    candidates: List[CandidateEmbedding] = Field(
+        ..., description="Students with embeddings in this gallery"
+    )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class UpdateGalleryRequest(BaseModel):
+    """Request to incrementally update a resident embedding gallery"""
+
+    version: str = Field(..., description="Gallery version after this update")
+    upsert: List[CandidateEmbedding] = Field(
+        default=[], description="Students to add or whose embeddings to replace"
+    )
+    remove: List[str] = Field(default=[], description="Student IDs to drop")
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class UpdateIndexRequest(BaseModel):
+    """Request to add, replace or drop students in the campus-wide index"""
+
+    upsert: List[CandidateEmbedding] = Field(
+        default=[], description="Students to add or whose embeddings to replace"
+    )
+    remove: List[str] = Field(default=[], description="Student IDs to drop")
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class SearchIndexRequest(BaseModel):
+    """Request to identify faces against the campus-wide index"""
+
+    query_embeddings: List[Embedding] = Field(..., description="Faces to identify")
+    k: int = Field(default=5, ge=1, le=100, description="Matches per face")
+    n_probe: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Index cells to scan (more = better recall, slower)",
+    )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class FitProjectionRequest(BaseModel):
+    """Request to fit and store a new embedding projection version"""
+
+    version: str = Field(..., description="New, unique artifact version")
+    method: ProjectionMethod = Field(default="pca", description="pca or random")
+    dim: int = Field(default=128, ge=8, le=1024, description="Output dimension")
+    embeddings: List[Embedding] = Field(
+        default=[], description="Sample of raw embeddings to fit PCA on"
+    )
+    input_dim: Optional[int] = Field(
+        default=None, description="Raw embedding dimension (random projection)"
+    )
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
+
+
+class ProjectEmbeddingsRequest(BaseModel):
+    """Request to map stored raw embeddings through a projection version"""
+
+    embeddings: List[Embedding] = Field(..., description="Raw embeddings")
+    embedding_format: EmbeddingFormat = Field(
+        default="list", description=EMBEDDING_FORMAT_DESCRIPTION
+    )
@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional, List
 
+from app.core.constants import FACE_CROP_VERSION
+from app.utils.embedding_codec import Embedding
+
 
 class FaceLocation(BaseModel):
     """Face location in image"""
@@ -15,14 +18,17 @@ class EncodeFaceMetadata(BaseModel):
     """Metadata for face encoding"""
 
     face_area_ratio: float
+    quality: float  # 0-1 blur/exposure/pose score of the face crop
     image_dimensions: List[int]
+    embedding_version: Optional[str] = None  # projection version, None = raw
+    crop_version: int = FACE_CROP_VERSION  # see FACE_CROP_VERSION
 
 
 class EncodeFaceResponse(BaseModel):
     """Response from encode face endpoint"""
 
     success: bool
-    embedding: Optional[List[float]] = None
+    embedding: Optional[Embedding] = None
     face_location: Optional[FaceLocation] = None
     metadata: Optional[EncodeFaceMetadata] = None
     error: Optional[str] = None
@@ -32,9 +38,10 @@ class EncodeFaceResponse(BaseModel):
 class DetectedFaceInfo(BaseModel):
     """Information about a detected face"""
 
-    embedding: List[float]
+    embedding: Embedding
     location: FaceLocation
     face_area_ratio: float
+    quality: float  # 0-1 blur/exposure/pose score of the face crop
 
 
 class DetectFacesMetadata(BaseModel):
@@ -42,6 +49,9 @@ class DetectFacesMetadata(BaseModel):
 
     image_dimensions: List[int]
     processing_time_ms: float
+    embedding_version: Optional[str] = None  # projection version, None = raw
+    crop_version: int = FACE_CROP_VERSION  # see FACE_CROP_VERSION
+    low_quality_count: int = 0  # faces skipped by the quality stage
 
 
 class DetectFacesResponse(BaseModel):
@@ -54,6 +64,39 @@ class DetectFacesResponse(BaseModel):
     error: Optional[str] = None
 
 
+class TrackedFaceInfo(BaseModel):
+    """A detected face and the track it belongs to"""
+
+    track_id: int
+    # None when the track's earlier embedding is still the best one
+    embedding: Optional[Embedding] = None
+    embedding_reused: bool
+    location: FaceLocation
+    face_area_ratio: float
+    quality: float
+    frames_seen: int
+
+
+class TrackFacesMetadata(DetectFacesMetadata):
+    """Metadata for a tracked frame"""
+
+    frame: int
+    embedded_count: int
+    reused_count: int
+    active_tracks: int
+
+
+class TrackFacesResponse(BaseModel):
+    """Response from track faces endpoint"""
+
+    success: bool
+    faces: List[TrackedFaceInfo] = []
+    count: int = 0
+    ended_tracks: List[int] = []
+    metadata: Optional[TrackFacesMetadata] = None
+    error: Optional[str] = None
+
+
 class MatchResult(BaseModel):
     """Result of face matching"""
 
@@ -94,6 +137,82 @@ class BatchMatchResponse(BaseModel):
     success: bool
     matches: List[BatchMatchResult] = []
     error: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class GalleryInfo(BaseModel):
+    """Summary of a resident embedding gallery"""
+
+    gallery_id: str
+    version: str
+    student_count: int
+    embedding_count: int
+    dtype: str = "float32"
+    memory_bytes: int = 0
+
+
+class GalleryResponse(BaseModel):
+    """Response from gallery endpoints"""
+
+    success: bool
+    gallery: Optional[GalleryInfo] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class ProjectionInfo(BaseModel):
+    """Summary of an embedding projection artifact"""
+
+    version: str
+    method: str
+    input_dim: int
+    output_dim: int
+    active: bool
+
+
+class ProjectionResponse(BaseModel):
+    """Response from projection endpoints"""
+
+    success: bool
+    projection: Optional[ProjectionInfo] = None
+    embeddings: Optional[List[Embedding]] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class IndexInfo(BaseModel):
+    """Summary of the campus-wide face index"""
+
+    student_count: int
+    embedding_count: int
+    list_count: int  # 0 while the index is still flat (exact search)
+    trained: bool
+
+
+class IndexResponse(BaseModel):
+    """Response from face index maintenance endpoints"""
+
+    success: bool
+    index: Optional[IndexInfo] = None
+    error: Optional[str] = None
+    error_code: Optional[str] = None
+
+
+class IndexMatch(BaseModel):
+    """A student returned by an index search"""
+
+    student_id: str
+    distance: float
+    confidence: float
+
+
+class SearchIndexResponse(BaseModel):
+    """Response from face index search, one match list per query"""
+
+    success: bool
+    results: List[List[IndexMatch]] = []
+    error: Optional[str] = None
+    error_code: Optional[str] = None
 
 
 class HealthResponse(BaseModel):
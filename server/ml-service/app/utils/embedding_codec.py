@@ -0,0 +1,65 @@
+"""
+Compact wire encoding for face embeddings.
+
+"list" is the plain JSON float array. "float32" and "float16" send each
+embedding as a base64 string of little-endian IEEE floats, which is several
+times smaller than decimal JSON and decodes without per-element parsing.
+"int8" sends a little-endian float32 scale followed by one signed byte per
+value (``value ~= byte * scale``), the same layout the backend stores.
+"""
+
+import base64
+from typing import List, Literal, Sequence, Union
+
+import numpy as np
+
+EmbeddingFormat = Literal["list", "float32", "float16", "int8"]
+Embedding = Union[List[float], str]
+
+_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+
+def encode_embedding(
+    embedding: Union[Sequence[float], np.ndarray], fmt: EmbeddingFormat = "list"
+) -> Embedding:
+    """Encode one embedding for a response in the requested format."""
+    if fmt == "list":
+        if isinstance(embedding, np.ndarray):
+            return embedding.astype(np.float64).tolist()
+        return list(embedding)
+    if fmt == "int8":
+        arr = np.asarray(embedding, dtype=np.float32)
+        scale = float(np.abs(arr).max()) / 127.0 if arr.size else 0.0
+        scale = scale or 1.0
+        raw = np.asarray([scale], dtype="<f4").tobytes()
+        raw += np.rint(arr / scale).astype(np.int8).tobytes()
+        return base64.b64encode(raw).decode("ascii")
+    arr = np.asarray(embedding, dtype=_DTYPES[fmt])
+    return base64.b64encode(arr.tobytes()).decode("ascii")
+
+
+def decode_embedding(embedding: Embedding, fmt: EmbeddingFormat = "list") -> np.ndarray:
+    """
+    Decode one embedding from a request into a float32 vector.
+
+    Float lists are accepted in any format; strings are decoded with the
+    request's binary format (float32 if the request says "list").
+    """
+    if not isinstance(embedding, str):
+        return np.asarray(embedding, dtype=np.float32)
+    raw = base64.b64decode(embedding, validate=True)
+    if fmt == "int8":
+        if len(raw) < 4:
+            raise ValueError("int8 embedding blob is missing its scale")
+        scale = np.frombuffer(raw[:4], dtype="<f4")[0]
+        return np.frombuffer(raw[4:], dtype=np.int8).astype(np.float32) * scale
+    dtype = _DTYPES.get(fmt, _DTYPES["float32"])
+    if len(raw) % dtype.itemsize:
+        raise ValueError(f"Embedding blob is not a whole number of {fmt} values")
+    return np.frombuffer(raw, dtype=dtype).astype(np.float32)
+
+
+def decode_embeddings(
+    embeddings: Sequence[Embedding], fmt: EmbeddingFormat = "list"
+) -> List[np.ndarray]:
+    return [decode_embedding(e, fmt) for e in embeddings]
@@ -0,0 +1,56 @@
+from io import BytesIO
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core import tracing
+
+
+def decode_image(image_bytes: bytes) -> np.ndarray:
+    """Decode encoded image bytes (JPEG/PNG/...) to an RGB uint8 array."""
+    with tracing.span("image_decode"):
+        image = Image.open(BytesIO(image_bytes)).convert("RGB")
+        return np.array(image)
+
+
+class ImageSource:
+    """
+    Encoded image that can be decoded at reduced size for detection.
+
+    Only the header is read up front. ``detection_image`` decodes a copy whose
+    longest side is at most ``max_side`` (JPEGs use draft mode, which scales
+    during the DCT instead of decoding every pixel), and ``full`` decodes the
+    original resolution on first access for cropping faces.
+    """
+
+    def __init__(self, image_bytes: bytes, max_side: int = 0):
+        self.image_bytes = image_bytes
+        self.max_side = max_side
+        with Image.open(BytesIO(image_bytes)) as image:
+            self.width, self.height = image.size
+        self._full: np.ndarray | None = None
+
+    @property
+    def full(self) -> np.ndarray:
+        if self._full is None:
+            self._full = decode_image(self.image_bytes)
+        return self._full
+
+    def detection_image(self) -> Tuple[np.ndarray, float]:
+        """
+        RGB array bounded by ``max_side`` and the factor that maps its pixel
+        coordinates back to full resolution.
+        """
+        if not self.max_side or max(self.width, self.height) <= self.max_side:
+            return self.full, 1.0
+
+        ratio = self.max_side / max(self.width, self.height)
+        size = (max(1, round(self.width * ratio)), max(1, round(self.height * ratio)))
+        with tracing.span("image_decode", draft=True):
+            with Image.open(BytesIO(self.image_bytes)) as image:
+                image.draft("RGB", size)
+                small = image.convert("RGB")
+            if small.size != size:
+                small = small.resize(size, Image.Resampling.BILINEAR)
+            return np.array(small), self.width / size[0]
@@ -0,0 +1,96 @@
+"""
+Recall versus latency of the campus-wide IVF index against exact search.
+
+Builds a synthetic campus (one cluster of noisy embeddings per student), then
+for each n_probe reports how often the IVF search returns the same best
+student as brute force (top-1), recall@k relative to brute force, and the
+mean per-query latency of both.
+
+    python -m benchmarks.ann_index --students 20000 --per-student 3 --dim 256
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.ann_index import IVFIndex
+
+
+def synthetic_campus(
+    students: int, per_student: int, dim: int, noise: float, seed: int
+):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((students, dim)).astype(np.float32)
+    candidates = [
+        (
+            f"student-{i}",
+            centers[i]
+            + noise * rng.standard_normal((per_student, dim)).astype(np.float32),
+        )
+        for i in range(students)
+    ]
+    queries = centers[rng.choice(students, 500, replace=False)]
+    queries += noise * rng.standard_normal(queries.shape).astype(np.float32)
+    return candidates, queries
+
+
+def _timed_search(search, queries):
+    start = time.perf_counter()
+    results = [search(q) for q in queries]
+    return results, (time.perf_counter() - start) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--per-student", type=int, default=3)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--noise", type=float, default=0.5)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--n-lists", type=int, default=0)
+    parser.add_argument("--probes", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    candidates, queries = synthetic_campus(
+        args.students, args.per_student, args.dim, args.noise, args.seed
+    )
+
+    index = IVFIndex(n_lists=args.n_lists, train_threshold=0)
+    start = time.perf_counter()
+    index.upsert(candidates)
+    print(
+        f"Built index: {index.student_count} students, "
+        f"{index.embedding_count} embeddings, {index.list_count} lists "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    exact, exact_latency = _timed_search(
+        lambda q: index.exact_search(q, k=args.k)[0], queries
+    )
+    print(f"exact search: {exact_latency * 1000:.2f} ms/query")
+    print(
+        f"{'n_probe':>8} {'top-1':>8} {'recall@' + str(args.k):>10} "
+        f"{'ms/query':>10} {'speedup':>8}"
+    )
+
+    for n_probe in args.probes:
+        approx, latency = _timed_search(
+            lambda q: index.search(q, k=args.k, n_probe=n_probe)[0], queries
+        )
+        top1 = np.mean([a[:1] == e[:1] for a, e in zip(approx, exact)])
+        recall = np.mean(
+            [
+                len({sid for sid, _ in a} & {sid for sid, _ in e}) / max(len(e), 1)
+                for a, e in zip(approx, exact)
+            ]
+        )
+        print(
+            f"{n_probe:>8} {top1:>8.3f} {recall:>10.3f} {latency * 1000:>10.2f} "
+            f"{exact_latency / latency:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Match accuracy, storage size and matching latency of projected embeddings.
+
+Generates a synthetic enrollment set with the shape of the raw-pixel
+embeddings (9216 dims): each student is an identity vector plus per-photo
+lighting/pose variation and sensor noise. Raw embeddings are compared with PCA
+and random projections fitted on the enrollment set.
+
+    python -m benchmarks.projection --students 2000 --dims 128 256
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.face_matcher import CandidateMatrix, normalize_rows
+from app.ml.projection import fit_pca, fit_random
+
+RAW_DIM = 96 * 96
+
+
+def bson_array_bytes(dim: int) -> int:
+    """Size of a BSON array of doubles: type byte + index key + 8-byte value."""
+    return 4 + 1 + sum(1 + len(str(i)) + 1 + 8 for i in range(dim))
+
+
+def synthetic_faces(students: int, per_student: int, queries: int, seed: int):
+    rng = np.random.default_rng(seed)
+    identity_basis = rng.standard_normal((64, RAW_DIM)).astype(np.float32)
+    variation_basis = rng.standard_normal((32, RAW_DIM)).astype(np.float32)
+    identities = rng.standard_normal((students, 64)).astype(np.float32)
+
+    def photos(owner: np.ndarray) -> np.ndarray:
+        n = len(owner)
+        faces = identities[owner] @ identity_basis
+        faces += 1.2 * rng.standard_normal((n, 32)).astype(np.float32) @ variation_basis
+        faces += 20.0 * rng.standard_normal((n, RAW_DIM)).astype(np.float32)
+        return normalize_rows(faces)
+
+    enrolled_owner = np.repeat(np.arange(students), per_student)
+    query_owner = rng.integers(0, students, queries)
+    return enrolled_owner, photos(enrolled_owner), query_owner, photos(query_owner)
+
+
+def evaluate(name, enrolled_owner, enrolled, query_owner, queries, repeats=5):
+    candidates = CandidateMatrix.from_candidates(
+        [
+            (str(sid), enrolled[enrolled_owner == sid])
+            for sid in np.unique(enrolled_owner)
+        ]
+    )
+    best_ids, _ = candidates.best_matches(queries)
+    accuracy = np.mean([int(b) == q for b, q in zip(best_ids, query_owner)])
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        candidates.best_matches(queries)
+    latency = (time.perf_counter() - start) / repeats
+
+    dim = enrolled.shape[1]
+    print(
+        f"{name:<12} {dim:>6} {accuracy:>9.3f} {dim * 4:>10} "
+        f"{bson_array_bytes(dim):>10} {latency * 1000:>10.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--per-student", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dims", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    enrolled_owner, enrolled, query_owner, queries = synthetic_faces(
+        args.students, args.per_student, args.queries, args.seed
+    )
+    print(
+        f"{args.students} students x {args.per_student} photos, "
+        f"{args.queries} query faces (latency: all queries vs all students)"
+    )
+    print(
+        f"{'embedding':<12} {'dim':>6} {'top-1 acc':>9} {'float32 B':>10} "
+        f"{'BSON B':>10} {'match ms':>10}"
+    )
+    evaluate("raw", enrolled_owner, enrolled, query_owner, queries)
+
+    for dim in args.dims:
+        start = time.perf_counter()
+        pca = fit_pca(enrolled, dim, f"pca-{dim}")
+        fit_seconds = time.perf_counter() - start
+        evaluate(
+            f"pca-{dim}",
+            enrolled_owner,
+            pca.project(enrolled),
+            query_owner,
+            pca.project(queries),
+        )
+        rp = fit_random(RAW_DIM, dim, f"random-{dim}")
+        evaluate(
+            f"random-{dim}",
+            enrolled_owner,
+            rp.project(enrolled),
+            query_owner,
+            rp.project(queries),
+        )
+        print(f"  (pca-{dim} fitted in {fit_seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Memory, accuracy delta and latency of quantized gallery storage.
+
+Scores the same synthetic enrollment set (see benchmarks.projection) with
+float32, float16 and int8 candidate matrices, optionally after a PCA
+projection, and reports each dtype's top-1 accuracy change and score error
+relative to float32.
+
+    python -m benchmarks.quantization --students 2000 --dim 128
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.ml.face_matcher import CandidateMatrix
+from app.ml.projection import fit_pca
+from benchmarks.projection import synthetic_faces
+
+DTYPES = ["float32", "float16", "int8"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--per-student", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument(
+        "--dim", type=int, default=0, help="PCA dimension (0 = raw embeddings)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    enrolled_owner, enrolled, query_owner, queries = synthetic_faces(
+        args.students, args.per_student, args.queries, args.seed
+    )
+    if args.dim:
+        projection = fit_pca(enrolled, args.dim, f"pca-{args.dim}")
+        enrolled, queries = projection.project(enrolled), projection.project(queries)
+
+    candidates = [
+        (str(sid), enrolled[enrolled_owner == sid]) for sid in range(args.students)
+    ]
+    print(
+        f"{args.students} students x {args.per_student} photos, "
+        f"{enrolled.shape[1]} dims, {args.queries} query faces"
+    )
+    print(
+        f"{'dtype':<8} {'bytes/emb':>10} {'students/GiB':>13} {'top-1 acc':>10} "
+        f"{'delta':>8} {'max |score err|':>16} {'match ms':>9}"
+    )
+
+    baseline = None
+    for dtype in DTYPES:
+        matrix = CandidateMatrix.from_candidates(candidates, dtype=dtype)
+        start = time.perf_counter()
+        scores = matrix.score(queries)
+        latency = time.perf_counter() - start
+
+        best = np.argmax(scores, axis=1)
+        accuracy = np.mean(best == query_owner)
+        if baseline is None:
+            baseline = (accuracy, scores)
+        bytes_per_embedding = matrix.nbytes / matrix.matrix.shape[0]
+        students_per_gib = 2**30 / (bytes_per_embedding * args.per_student)
+        print(
+            f"{dtype:<8} {bytes_per_embedding:>10.0f} {students_per_gib:>13,.0f} "
+            f"{accuracy:>10.3f} {accuracy - baseline[0]:>+8.3f} "
+            f"{np.abs(scores - baseline[1]).max():>16.4f} {latency * 1000:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Latency, throughput and memory of the ML service under classroom workloads.
+
+Drives /api/ml/encode-face, /api/ml/detect-faces and /api/ml/batch-match with
+synthetic photos and galleries (see benchmarks.workload) at a fixed
+concurrency, either in-process (the FastAPI app over an ASGI transport) or
+against a running service with --url. Reports p50/p95/p99 latency,
+throughput, peak RSS and the per-stage worker timings from /metrics, and
+writes them as JSON so runs on different commits can be compared.
+
+    python -m benchmarks.service --faces 30 --students 60 --requests 200
+    python -m benchmarks.service --url http://localhost:8001 --concurrency 16
+    python -m benchmarks.service --output new.json --baseline old.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import time
+from contextlib import AsyncExitStack, nullcontext
+from typing import Any, Callable, Dict, List, Optional
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+import psutil
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.core.config import settings
+from app.utils.embedding_codec import encode_embedding
+from benchmarks.workload import classroom_photos, gallery_candidates
+
+SCENARIOS = ["encode-face", "detect-faces", "batch-match"]
+GALLERY_ID = "benchmark"
+
+# (metric, label) pairs whose per-label sum/count /metrics exposes
+_STAGE_METRICS = [
+    ("ml_stage_duration_seconds", "stage"),
+    ("ml_worker_queue_wait_seconds", "pool"),
+    ("ml_batch_queue_wait_seconds", "batcher"),
+    ("ml_pipeline_step_seconds", "step"),
+]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def _scrape(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Stage sum/count totals and resident memory from /metrics."""
+    text = (await client.get("/metrics")).text
+    totals: Dict[str, Dict[str, float]] = {}
+    rss = None
+    for family in text_string_to_metric_families(text):
+        if family.name == "process_resident_memory_bytes":
+            rss = family.samples[0].value
+        for metric, label in _STAGE_METRICS:
+            if family.name != metric:
+                continue
+            for sample in family.samples:
+                kind = sample.name[len(metric) + 1 :]
+                if kind in ("sum", "count"):
+                    key = f"{metric.removeprefix('ml_')}:{sample.labels[label]}"
+                    totals.setdefault(key, {})[kind] = sample.value
+    return {"totals": totals, "rss": rss}
+
+
+def _stage_breakdown(before: dict, after: dict) -> Dict[str, Dict[str, float]]:
+    stages = {}
+    for key, values in after["totals"].items():
+        prev = before["totals"].get(key, {})
+        count = values.get("count", 0) - prev.get("count", 0)
+        if count > 0:
+            total = values.get("sum", 0) - prev.get("sum", 0)
+            stages[key] = {"count": int(count), "mean_ms": total / count * 1000}
+    return stages
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    send: Callable[[int], Any],
+    requests: int,
+    concurrency: int,
+    in_process: bool,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    peak_rss = 0.0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            start = time.perf_counter()
+            response = await send(i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200 or not response.json().get("success"):
+                errors += 1
+
+    async def sample_rss():
+        nonlocal peak_rss
+        process = psutil.Process()
+        while True:
+            if in_process:
+                rss = process.memory_info().rss
+            else:
+                rss = (await _scrape(client))["rss"] or 0
+            peak_rss = max(peak_rss, rss)
+            await asyncio.sleep(0.2)
+
+    before = await _scrape(client)
+    sampler = asyncio.create_task(sample_rss())
+    wall = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall
+    sampler.cancel()
+    after = await _scrape(client)
+    if in_process:
+        # ru_maxrss is KiB on Linux: the process peak, including setup
+        peak_rss = max(
+            peak_rss, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        )
+    elif after["rss"]:
+        peak_rss = max(peak_rss, after["rss"])
+
+    ms = np.asarray(latencies) * 1000
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "latency_ms": {
+            "mean": float(ms.mean()),
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+        },
+        "peak_rss_mb": peak_rss / 2**20 if peak_rss else None,
+        "stages": _stage_breakdown(before, after),
+    }
+
+
+def _planted_detector(boxes, full_width: int):
+    """detect_faces stand-in returning the drawn faces, scaled to the input."""
+
+    def detect(image: np.ndarray):
+        scale = image.shape[1] / full_width
+        return [tuple(round(v * scale) for v in box) for box in boxes]
+
+    return detect
+
+
+async def run(args) -> Dict[str, Any]:
+    # A distinct photo per request (the last one warms up), or one for all
+    count = 1 if args.repeat_image else args.requests + 1
+    photos, boxes = classroom_photos(
+        count, args.faces, args.width, args.height, args.seed
+    )
+    portraits, portrait_boxes = classroom_photos(count, 1, 640, 640, args.seed)
+    candidates, queries = gallery_candidates(
+        args.students, args.per_student, "float32", args.seed
+    )
+    fmt = {"embedding_format": "float32"}
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            transport = None
+            base_url = args.url
+        else:
+            from app.main import app
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            transport = httpx.ASGITransport(app=app)
+            base_url = "http://benchmark"
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(
+                transport=transport,
+                base_url=base_url,
+                headers={"X-API-KEY": args.api_key},
+                timeout=120,
+            )
+        )
+
+        await client.put(
+            f"/api/ml/galleries/{GALLERY_ID}",
+            json={"version": "v1", "candidates": candidates, **fmt},
+        )
+        detected = [
+            {"embedding": encode_embedding(q, "float32")}
+            for q in queries[: max(1, args.faces)]
+        ]
+        requests = {
+            "encode-face": (
+                lambda i: client.post(
+                    "/api/ml/encode-face/raw",
+                    content=portraits[i % count],
+                    params=fmt,
+                ),
+                _planted_detector(portrait_boxes, 640),
+            ),
+            "detect-faces": (
+                lambda i: client.post(
+                    "/api/ml/detect-faces/raw",
+                    content=photos[i % count],
+                    params={**fmt, "min_face_area_ratio": 0, "model": args.model},
+                ),
+                _planted_detector(boxes, args.width),
+            ),
+            "batch-match": (
+                lambda i: client.post(
+                    "/api/ml/batch-match",
+                    json={
+                        "detected_faces": detected,
+                        "gallery_id": GALLERY_ID,
+                        **fmt,
+                    },
+                ),
+                None,
+            ),
+        }
+
+        results = {}
+        for name in args.scenarios:
+            send, detector = requests[name]
+            planted = (
+                patch("app.api.routes.face_recognition.detect_faces", detector)
+                if detector and args.planted_faces and not args.url
+                else nullcontext()
+            )
+            with planted:
+                await send(args.requests)  # warm-up, not measured
+                results[name] = await _run_scenario(
+                    client, send, args.requests, args.concurrency, not args.url
+                )
+            _print_result(name, results[name])
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.time(),
+        "target": args.url or "in-process",
+        "config": {
+            "faces": args.faces,
+            "image": [args.width, args.height],
+            "model": args.model,
+            "students": args.students,
+            "per_student": args.per_student,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "planted_faces": args.planted_faces and not args.url,
+            "repeat_image": args.repeat_image,
+        },
+        "scenarios": results,
+    }
+
+
+def _print_result(name: str, result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    rss = result["peak_rss_mb"]
+    print(
+        f"{name:<13} {result['throughput_rps']:8.1f} req/s  "
+        f"p50 {latency['p50']:7.1f}  p95 {latency['p95']:7.1f}  "
+        f"p99 {latency['p99']:7.1f} ms  "
+        f"rss {f'{rss:.0f} MB' if rss else 'n/a'}  errors {result['errors']}"
+    )
+    for stage, timing in sorted(result["stages"].items()):
+        print(f"    {stage:<40} {timing['count']:6d} x {timing['mean_ms']:8.2f} ms")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Relative change of each scenario against a baseline result file."""
+    print(f"\nvs {baseline.get('commit') or 'baseline'} (negative latency is better)")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        deltas = [
+            f"{key} {_change(result['latency_ms'][key], base['latency_ms'][key])}"
+            for key in ("p50", "p95", "p99")
+        ]
+        deltas.append(
+            f"req/s {_change(result['throughput_rps'], base['throughput_rps'])}"
+        )
+        print(f"{name:<13} " + "  ".join(deltas))
+
+
+def _change(value: float, base: float) -> str:
+    return f"{(value - base) / base * 100:+.1f}%" if base else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--url", help="Benchmark a running service (default: in-process)"
+    )
+    parser.add_argument("--api-key", default=os.getenv("ML_API_KEY", settings.API_KEY))
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument(
+        "--faces", type=int, default=30, help="Faces per classroom photo"
+    )
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--model", default="hog", help="Detection model (hog, tiled)")
+    parser.add_argument("--students", type=int, default=60, help="Gallery size")
+    parser.add_argument("--per-student", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--planted-faces",
+        action="store_true",
+        help="In-process: detector returns the drawn faces, so every request "
+        "pays the per-face crop, quality and embedding cost",
+    )
+    parser.add_argument(
+        "--repeat-image",
+        action="store_true",
+        help="Send the same photo every time (measures result cache hits)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare with an earlier --output file")
+    args = parser.parse_args()
+
+    # One access log line per request would drown the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Synthetic classroom workloads for the service benchmarks.
+
+``classroom_photo`` draws N cartoon faces (skin-tone ellipse, eyes, nose,
+mouth) on a textured background in a seat grid, so requests carry realistic
+image sizes and decode cost. The face boxes are returned alongside, since the
+real detector is not guaranteed to find drawn faces; benchmarks can plant
+them to exercise the per-face embedding stages.
+"""
+
+import io
+import math
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.utils.embedding_codec import encode_embedding
+from benchmarks.projection import synthetic_faces
+
+Box = Tuple[int, int, int, int]  # (x, y, width, height)
+
+
+def _draw_face(canvas: np.ndarray, box: Box, rng: np.random.Generator) -> None:
+    x, y, w, h = box
+    center = (x + w // 2, y + h // 2)
+    skin = tuple(int(c) for c in rng.integers((150, 100, 80), (235, 190, 160)))
+    cv2.ellipse(canvas, center, (w // 2, h // 2), 0, 0, 360, skin, -1)
+    eye_y = y + int(h * 0.4)
+    for eye_x in (x + int(w * 0.32), x + int(w * 0.68)):
+        cv2.circle(canvas, (eye_x, eye_y), max(1, w // 12), (40, 30, 30), -1)
+    nose = np.array(
+        [
+            (center[0], y + int(h * 0.45)),
+            (center[0] - w // 12, y + int(h * 0.62)),
+            (center[0] + w // 12, y + int(h * 0.62)),
+        ]
+    )
+    cv2.polylines(canvas, [nose], True, (120, 70, 60), max(1, w // 40))
+    cv2.ellipse(
+        canvas,
+        (center[0], y + int(h * 0.75)),
+        (w // 5, h // 14),
+        0,
+        0,
+        180,
+        (110, 40, 50),
+        max(1, w // 30),
+    )
+
+
+def classroom_photos(
+    count: int, faces: int, width: int = 1920, height: int = 1080, seed: int = 0
+) -> Tuple[List[bytes], List[Box]]:
+    """
+    ``count`` JPEGs of ``faces`` faces seated in rows, and their boxes.
+
+    The photos differ only in a corner marker, so each request has the same
+    cost but its own digest (identical images would be served from the
+    result cache).
+    """
+    rng = np.random.default_rng(seed)
+    canvas = rng.integers(60, 120, (height, width, 3), dtype=np.uint8)
+    canvas = cv2.GaussianBlur(canvas, (5, 5), 0)
+
+    boxes: List[Box] = []
+    if faces:
+        cols = math.ceil(math.sqrt(faces * width / height))
+        rows = math.ceil(faces / cols)
+        cell_w, cell_h = width // cols, height // rows
+        size = int(min(cell_w, cell_h) * 0.7)
+        for i in range(faces):
+            row, col = divmod(i, cols)
+            box = (
+                col * cell_w + (cell_w - size) // 2,
+                row * cell_h + (cell_h - size) // 2,
+                size,
+                int(size * 1.2) if size * 1.2 < cell_h else size,
+            )
+            _draw_face(canvas, box, rng)
+            boxes.append(box)
+
+    photos = []
+    for i in range(count):
+        # Photo index as a 32-bit black/white strip in the top-left corner
+        bits = np.unpackbits(np.array([i], ">u4").view(np.uint8))
+        canvas[:8, :256] = np.repeat(bits * 255, 8)[None, :, None]
+        buffered = io.BytesIO()
+        Image.fromarray(canvas).save(buffered, format="JPEG", quality=90)
+        photos.append(buffered.getvalue())
+    return photos, boxes
+
+
+def gallery_candidates(
+    students: int, per_student: int, fmt: str = "float32", seed: int = 0
+) -> Tuple[list, np.ndarray]:
+    """
+    ``candidate_embeddings`` payload for a synthetic gallery, plus query
+    embeddings of enrolled students (new photos of them) to match against it.
+    """
+    enrolled_owner, enrolled, _, queries = synthetic_faces(
+        students, per_student, max(1, students), seed
+    )
+    candidates = [
+        {
+            "student_id": f"student-{sid}",
+            "embeddings": [
+                encode_embedding(e, fmt) for e in enrolled[enrolled_owner == sid]
+            ],
+        }
+        for sid in range(students)
+    ]
+    return candidates, queries
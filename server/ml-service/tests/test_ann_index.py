@@ -0,0 +1,141 @@
+import numpy as np
+
+from app.ml.ann_index import IVFIndex, spherical_kmeans
+
+
+def _clustered_students(n_students=300, per_student=3, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_students, dim)).astype(np.float32)
+    candidates = [
+        (
+            f"s{i}",
+            centers[i]
+            + 0.1 * rng.standard_normal((per_student, dim)).astype(np.float32),
+        )
+        for i in range(n_students)
+    ]
+    return centers, candidates
+
+
+def test_flat_index_returns_exact_best_students():
+    index = IVFIndex(train_threshold=10_000)
+    index.upsert([("a", [[1.0, 0.0], [0.6, 0.8]]), ("b", [[0.0, 1.0]])])
+
+    [matches] = index.search([[0.0, 1.0]], k=2)
+
+    assert not index.trained
+    assert [sid for sid, _ in matches] == ["b", "a"]
+    assert abs(matches[0][1] - 1.0) < 1e-6
+    assert abs(matches[1][1] - 0.8) < 1e-6
+
+
+def test_index_trains_past_threshold_and_keeps_recall():
+    centers, candidates = _clustered_students()
+    index = IVFIndex(n_probe=4, train_threshold=500)
+    index.upsert(candidates)
+
+    results = index.search(centers, k=1)
+
+    assert index.trained
+    assert index.list_count == int(np.sqrt(900))
+    hits = sum(r[0][0] == f"s{i}" for i, r in enumerate(results))
+    assert hits / len(centers) >= 0.95
+
+
+def test_upsert_replaces_and_remove_drops_students():
+    index = IVFIndex(train_threshold=10_000)
+    index.upsert([("a", [[1.0, 0.0]]), ("b", [[0.0, 1.0]])])
+
+    index.upsert([("a", [[0.0, 1.0]])], remove=["b"])
+
+    assert index.student_count == 1
+    assert index.embedding_count == 1
+    [matches] = index.search([[0.0, 1.0]], k=5)
+    assert [sid for sid, _ in matches] == ["a"]
+
+
+def test_incremental_add_after_training():
+    centers, candidates = _clustered_students()
+    index = IVFIndex(n_probe=4, train_threshold=500)
+    index.upsert(candidates)
+
+    new_face = np.ones((1, 64), dtype=np.float32)
+    index.upsert([("new", new_face)])
+
+    [matches] = index.search(new_face, k=1)
+    assert matches[0][0] == "new"
+
+
+def test_spherical_kmeans_matches_dense_centroid_update():
+    _, candidates = _clustered_students(n_students=20, per_student=5)
+    vectors = np.vstack([v for _, v in candidates])
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    # Reference: one-hot (k, n) assignment matrix times the vectors
+    rng = np.random.default_rng(0)
+    expected = vectors[rng.choice(len(vectors), 8, replace=False)]
+    for _ in range(3):
+        one_hot = np.zeros((8, len(vectors)), dtype=np.float32)
+        one_hot[np.argmax(vectors @ expected.T, axis=1), np.arange(len(vectors))] = 1
+        sums = one_hot @ vectors
+        expected = sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+    centroids = spherical_kmeans(vectors, 8, iterations=3)
+
+    assert np.allclose(centroids, expected, atol=1e-5)
+
+
+def test_snapshot_round_trip(tmp_path):
+    centers, candidates = _clustered_students()
+    index = IVFIndex(n_probe=4, train_threshold=500)
+    index.upsert(candidates, remove=[])
+    index.upsert([], remove=["s0"])
+    path = str(tmp_path / "index.npz")
+
+    index.save(path)
+    restored = IVFIndex()
+    restored.load(path)
+
+    assert restored.trained
+    assert restored.student_count == index.student_count
+    assert restored.embedding_count == index.embedding_count
+    assert restored.search(centers[1:20], k=3) == index.search(centers[1:20], k=3)
+
+
+def test_snapshot_of_empty_index(tmp_path):
+    path = str(tmp_path / "index.npz")
+    IVFIndex().save(path)
+
+    restored = IVFIndex()
+    restored.load(path)
+
+    assert restored.embedding_count == 0
+    assert restored.search([[1.0, 0.0]]) == [[]]
+
+
+def test_removed_slots_are_compacted_under_churn():
+    index = IVFIndex(train_threshold=10_000)
+    for round_ in range(50):
+        index.upsert([("a", [[1.0, 0.0]]), (f"b{round_}", [[0.0, 1.0]])])
+        index.upsert([], remove=[f"b{round_}"])
+
+    assert len(index._state.ids) <= 2 * index.student_count
+    [matches] = index.search([[1.0, 0.0]], k=5)
+    assert [sid for sid, _ in matches] == ["a"]
+
+    index.rebuild()
+    assert index._state.ids == ("a",)
+    assert index.search([[1.0, 0.0]], k=5) == [[("a", 1.0)]]
+
+
+def test_repeated_student_in_one_upsert_keeps_last_rows():
+    index = IVFIndex(train_threshold=10_000)
+    index.upsert([("a", [[1.0, 0.0]]), ("b", [[0.0, 1.0]]), ("a", [[0.6, 0.8]])])
+    index.upsert([], remove=["b"])
+    index.rebuild()  # compacts slots
+
+    assert index.student_count == 1
+    assert index.embedding_count == 1
+    [matches] = index.search([[1.0, 0.0]], k=5)
+    assert [sid for sid, _ in matches] == ["a"]
+    assert abs(matches[0][1] - 0.6) < 1e-6
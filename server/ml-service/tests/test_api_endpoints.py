@@ -5,6 +5,7 @@ import numpy as np
 import io
 from PIL import Image
 from app.core.config import settings
+from app.core.constants import FACE_CROP_VERSION
 from unittest.mock import patch
 import app.api.routes.face_recognition as fr_module
 
@@ -35,6 +36,23 @@ def test_health():
     assert "timestamp" in data
 
 
+def test_ready_is_503_until_models_warmed_up():
+    from app.ml.warmup import WarmupState, warm_up_models
+
+    with patch("app.api.routes.health.warmup_state", WarmupState()) as state:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up"
+
+        with patch("app.ml.warmup.warmup_state", state):
+            durations = warm_up_models()
+
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+        assert set(durations) == {"detector", "pipeline", "total"}
+
+
 def test_encode_face_no_face():
     b64_img = create_dummy_image_b64()
     response = client.post("/api/ml/encode-face", json={"image_base64": b64_img})
@@ -103,6 +121,7 @@ def test_encode_face_success():
         assert data["success"] is True
         assert "embedding" in data
         assert len(data["embedding"]) > 0
+        assert data["metadata"]["crop_version"] == FACE_CROP_VERSION
 
 
 def test_detect_faces_success():
@@ -120,3 +139,249 @@ def test_detect_faces_success():
         assert loc["left"] == 10
         assert loc["right"] == 60
         assert loc["bottom"] == 60
+
+
+def test_batch_match():
+    payload = {
+        "detected_faces": [
+            {"embedding": [1.0, 0.0, 0.0]},
+            {"embedding": [0.0, 0.0, 1.0]},
+        ],
+        "candidate_embeddings": [
+            {
+                "student_id": "student1",
+                "embeddings": [[0.0, 1.0, 0.0], [1.0, 0.1, 0.0]],
+            },
+            {"student_id": "student2", "embeddings": [[0.0, 1.0, 0.0]]},
+        ],
+        "confident_threshold": 0.5,
+    }
+
+    response = client.post("/api/ml/batch-match", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert [m["face_index"] for m in data["matches"]] == [0, 1]
+    assert data["matches"][0]["student_id"] == "student1"
+    assert data["matches"][0]["status"] == "present"
+    assert data["matches"][1]["student_id"] is None
+    assert data["matches"][1]["status"] == "unknown"
+
+
+def test_detect_faces_binary_embedding_format():
+    b64_img = create_dummy_image_b64()
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(10, 10, 50, 50)]
+
+        response = client.post(
+            "/api/ml/detect-faces",
+            json={"image_base64": b64_img, "embedding_format": "float16"},
+        )
+        data = response.json()
+        assert data["success"] is True
+        embedding = data["faces"][0]["embedding"]
+        assert isinstance(embedding, str)
+        assert len(base64.b64decode(embedding)) == 96 * 96 * 2
+
+
+def test_batch_match_binary_embedding_format():
+    def blob(values):
+        return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode()
+
+    payload = {
+        "detected_faces": [{"embedding": blob([0.0, 1.0, 0.0])}],
+        "candidate_embeddings": [
+            {"student_id": "student1", "embeddings": [blob([1.0, 0.0, 0.0])]},
+            {"student_id": "student2", "embeddings": [blob([0.0, 1.0, 0.0])]},
+        ],
+        "embedding_format": "float32",
+    }
+
+    response = client.post("/api/ml/batch-match", json=payload)
+    data = response.json()
+    assert data["success"] is True
+    assert data["matches"][0]["student_id"] == "student2"
+
+
+def test_encode_face_raw_bytes():
+    image_bytes = base64.b64decode(create_dummy_image_b64())
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(10, 10, 50, 50)]
+
+        response = client.post(
+            "/api/ml/encode-face/raw",
+            content=image_bytes,
+            params={"min_face_area_ratio": 0.01, "embedding_format": "float32"},
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert isinstance(data["embedding"], str)
+
+
+def test_detect_faces_raw_bytes():
+    image_bytes = base64.b64decode(create_dummy_image_b64())
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(10, 10, 50, 50)]
+
+        response = client.post(
+            "/api/ml/detect-faces/raw",
+            content=image_bytes,
+            headers={"Content-Type": "application/octet-stream"},
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert data["count"] == 1
+        assert data["faces"][0]["location"]["right"] == 60
+
+
+def test_detect_faces_raw_invalid_image():
+    response = client.post(
+        "/api/ml/detect-faces/raw",
+        content=b"not an image",
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    assert response.json()["success"] is False
+
+
+def test_detect_faces_downscales_and_maps_boxes_to_full_resolution():
+    b64_img = create_dummy_image_b64(width=2560, height=1920)
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(100, 100, 400, 400)]
+
+        response = client.post("/api/ml/detect-faces", json={"image_base64": b64_img})
+        data = response.json()
+
+        detected_on = mock_detect.call_args[0][0]
+        assert max(detected_on.shape[:2]) <= settings.DETECTION_MAX_SIDE
+        assert data["success"] is True
+        assert data["metadata"]["image_dimensions"] == [2560, 1920]
+        loc = data["faces"][0]["location"]
+        assert (loc["top"], loc["left"], loc["bottom"], loc["right"]) == (
+            200,
+            200,
+            1000,
+            1000,
+        )
+
+
+def test_identical_detect_request_is_served_from_cache():
+    b64_img = create_dummy_image_b64()
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(10, 10, 50, 50)]
+
+        first = client.post("/api/ml/detect-faces", json={"image_base64": b64_img})
+        second = client.post("/api/ml/detect-faces", json={"image_base64": b64_img})
+
+    assert mock_detect.call_count == 1
+    assert second.json()["faces"] == first.json()["faces"]
+
+
+def test_face_index_update_and_search():
+    response = client.patch(
+        "/api/ml/index",
+        json={
+            "upsert": [
+                {"student_id": "campus-a", "embeddings": [[1.0, 0.0, 0.0]]},
+                {"student_id": "campus-b", "embeddings": [[0.0, 1.0, 0.0]]},
+            ]
+        },
+    )
+    assert response.json()["success"] is True
+
+    response = client.post(
+        "/api/ml/index/search", json={"query_embeddings": [[0.1, 0.9, 0.0]], "k": 1}
+    )
+    data = response.json()
+    assert data["success"] is True
+    assert data["results"][0][0]["student_id"] == "campus-b"
+
+    client.patch("/api/ml/index", json={"remove": ["campus-a", "campus-b"]})
+
+
+def test_face_index_stays_in_service_process_with_process_pool():
+    import app.api.routes.face_index as index_module
+    from app.core.workers import WorkerPool
+
+    pool = WorkerPool("match", "process", workers=1, max_queue=1)
+    with patch.object(index_module, "match_pool", pool):
+        client.patch(
+            "/api/ml/index",
+            json={"upsert": [{"student_id": "campus-c", "embeddings": [[1.0, 0.0]]}]},
+        )
+        data = client.get("/api/ml/index").json()
+        client.patch("/api/ml/index", json={"remove": ["campus-c"]})
+    pool.shutdown()
+
+    assert data["index"]["student_count"] == 1
+
+
+def test_fit_and_apply_projection(tmp_path):
+    from app.ml.projection import projection_store
+
+    with patch.object(projection_store, "directory", str(tmp_path)):
+        response = client.post(
+            "/api/ml/projections",
+            json={"version": "r1", "method": "random", "dim": 8, "input_dim": 16},
+        )
+        assert response.json()["projection"]["output_dim"] == 8
+
+        response = client.post(
+            "/api/ml/projections/r1/project", json={"embeddings": [[1.0] * 16]}
+        )
+        data = response.json()
+        assert data["success"] is True
+        assert len(data["embeddings"][0]) == 8
+
+
+def test_encode_face_applies_active_projection(tmp_path):
+    from app.ml.projection import fit_random, projection_store
+
+    with (
+        patch.object(projection_store, "directory", str(tmp_path)),
+        patch.object(projection_store, "active_version", "enc1"),
+        patch.object(fr_module, "detect_faces") as mock_detect,
+    ):
+        projection_store.save(fit_random(96 * 96, 16, "enc1"))
+        mock_detect.return_value = [(10, 10, 50, 50)]
+
+        response = client.post(
+            "/api/ml/encode-face",
+            json={
+                "image_base64": create_dummy_image_b64(),
+                "min_face_area_ratio": 0.01,
+            },
+        )
+        data = response.json()
+
+    assert data["success"] is True
+    assert len(data["embedding"]) == 16
+    assert data["metadata"]["embedding_version"] == "enc1"
+
+
+def test_bad_crop_fails_only_its_own_request_in_a_batch():
+    from app.schemas.requests import DetectFacesOptions
+    from app.schemas.responses import FaceLocation
+
+    def job(crop):
+        return fr_module._PreparedImage(
+            options=DetectFacesOptions(),
+            image_dimensions=[100, 100],
+            locations=[FaceLocation(top=0, right=40, bottom=40, left=0)],
+            area_ratios=[0.16],
+            crops=[crop],
+            qualities=[1.0],
+        )
+
+    good = np.random.randint(0, 255, (40, 40, 3), dtype=np.uint8)
+    poisoned = np.zeros((0, 0, 3), dtype=np.uint8)  # degenerate crop
+
+    ok, failed = fr_module._embed_batch(
+        [job(good), job(poisoned)],
+        fr_module._finish_detect,
+        lambda e: fr_module.DetectFacesResponse(success=False, error=str(e)),
+    )
+
+    assert ok.success is True
+    assert ok.count == 1
+    assert failed.success is False
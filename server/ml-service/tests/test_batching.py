@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.core.batching import MicroBatcher
+from app.core.workers import WorkerPool
+
+calls = []
+
+
+def _double_all(items):
+    calls.append(list(items))
+    return [item * 2 for item in items]
+
+
+def _fail(items):
+    raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    calls.clear()
+    pool = WorkerPool("test", "thread", workers=1, max_queue=4)
+    batcher = MicroBatcher("test", _double_all, pool, max_batch_size=3, max_wait_ms=50)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+    assert results == [0, 2, 4]
+    assert calls == [[0, 1, 2]]
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_after_max_wait():
+    calls.clear()
+    pool = WorkerPool("test", "thread", workers=1, max_queue=4)
+    batcher = MicroBatcher("test", _double_all, pool, max_batch_size=8, max_wait_ms=1)
+
+    assert await batcher.submit(5) == 10
+    assert calls == [[5]]
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_error_reaches_every_caller():
+    pool = WorkerPool("test", "thread", workers=1, max_queue=4)
+    batcher = MicroBatcher("test", _fail, pool, max_batch_size=2, max_wait_ms=50)
+
+    results = await asyncio.gather(
+        batcher.submit(1), batcher.submit(2), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    pool.shutdown()
@@ -0,0 +1,43 @@
+import base64
+
+import numpy as np
+import pytest
+
+from app.utils.embedding_codec import decode_embedding, encode_embedding
+
+
+def test_list_format_roundtrip():
+    emb = [0.25, -0.5, 1.0]
+    encoded = encode_embedding(np.asarray(emb, dtype=np.float32))
+    assert encoded == emb
+    assert np.allclose(decode_embedding(encoded), emb)
+
+
+@pytest.mark.parametrize("fmt,itemsize", [("float32", 4), ("float16", 2)])
+def test_binary_format_roundtrip(fmt, itemsize):
+    emb = np.random.default_rng(0).normal(size=9216).astype(np.float32)
+    emb /= np.linalg.norm(emb)
+
+    encoded = encode_embedding(emb, fmt)
+    assert isinstance(encoded, str)
+    assert len(base64.b64decode(encoded)) == 9216 * itemsize
+
+    decoded = decode_embedding(encoded, fmt)
+    assert decoded.dtype == np.float32
+    assert np.allclose(decoded, emb, atol=1e-3)
+
+
+def test_decode_rejects_truncated_blob():
+    blob = base64.b64encode(b"\x00\x00\x80").decode()
+    with pytest.raises(ValueError):
+        decode_embedding(blob, "float32")
+
+
+def test_int8_format_stores_scale_and_one_byte_per_value():
+    emb = np.random.default_rng(0).normal(size=256).astype(np.float32)
+
+    encoded = encode_embedding(emb, "int8")
+    assert len(base64.b64decode(encoded)) == 4 + 256
+
+    decoded = decode_embedding(encoded, "int8")
+    assert np.abs(decoded - emb).max() <= np.abs(emb).max() / 127
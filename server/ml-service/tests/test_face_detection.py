@@ -20,3 +20,35 @@ def test_detect_faces_grayscale():
 
     faces = detect_faces(img)
     assert len(faces) == 0
+
+
+def test_detector_pool_reuses_checked_in_detector():
+    from app.ml.face_detector import DetectorPool
+
+    pool = DetectorPool(size=2)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        assert second is first
+    assert pool.created == 1
+
+
+def test_detector_pool_gives_concurrent_callers_distinct_detectors():
+    from unittest.mock import patch
+
+    from app.ml import face_detector
+    from app.ml.face_detector import DetectorPool
+
+    with patch.object(face_detector, "_create_detector", side_effect=object):
+        pool = DetectorPool(size=2)
+        with pool.checkout() as a, pool.checkout() as b:
+            assert a is not b
+        assert pool.created == 2
+
+
+def test_detector_pool_warm_up_creates_all_detectors():
+    from app.ml.face_detector import DetectorPool
+
+    pool = DetectorPool(size=3)
+    pool.warm_up()
+    assert pool.created == 3
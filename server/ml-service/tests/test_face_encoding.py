@@ -28,3 +28,19 @@ def test_get_face_embedding_zeros():
     arr = np.array(emb)
     norm = np.linalg.norm(arr)
     assert abs(norm - 1.0) < 1e-5
+
+
+def test_get_face_embeddings_matches_single():
+    from app.ml.face_encoder import get_face_embeddings
+
+    rng = np.random.default_rng(0)
+    crops = [
+        rng.integers(1, 255, (120, 80, 3), dtype=np.uint8),
+        rng.integers(1, 255, (60, 60), dtype=np.uint8),
+    ]
+
+    batch = get_face_embeddings(crops)
+
+    assert batch.shape == (2, 96 * 96)
+    for crop, emb in zip(crops, batch):
+        assert np.allclose(emb, get_face_embedding(crop), atol=1e-6)
@@ -1,3 +1,6 @@
+import numpy as np
+import pytest
+
 from app.ml.face_matcher import cosine_similarity
 
 
@@ -23,3 +26,77 @@ def test_cosine_similarity_zeros():
     a = [0, 0, 0]
     b = [1, 2, 3]
     assert cosine_similarity(a, b) == 0.0
+
+
+def test_candidate_matrix_matches_pairwise_loop():
+    import numpy as np
+    from app.ml.face_matcher import CandidateMatrix
+
+    rng = np.random.default_rng(0)
+    candidates = [
+        (f"s{i}", rng.normal(size=(i % 3 + 1, 16)).tolist()) for i in range(6)
+    ]
+    queries = rng.normal(size=(4, 16))
+
+    matrix = CandidateMatrix.from_candidates(candidates)
+    scores = matrix.score(queries)
+
+    assert scores.shape == (4, 6)
+    for q, query in enumerate(queries):
+        for s, (_, embeddings) in enumerate(candidates):
+            expected = max(cosine_similarity(query, emb) for emb in embeddings)
+            assert abs(scores[q, s] - expected) < 1e-5
+
+
+def test_candidate_matrix_best_matches():
+    from app.ml.face_matcher import CandidateMatrix
+
+    matrix = CandidateMatrix.from_candidates(
+        [("a", [[1, 0, 0], [0, 0, 1]]), ("b", [[0, 1, 0]])]
+    )
+    ids, scores = matrix.best_matches([[0, 0, 2], [0, 3, 0]])
+
+    assert ids == ["a", "b"]
+    assert abs(scores[0] - 1.0) < 1e-6
+    assert abs(scores[1] - 1.0) < 1e-6
+
+
+def test_candidate_matrix_empty():
+    from app.ml.face_matcher import CandidateMatrix
+
+    ids, scores = CandidateMatrix.from_candidates([]).best_matches([[1, 0]])
+    assert ids == [None]
+    assert scores[0] == -1.0
+
+
+@pytest.mark.parametrize("dtype", ["float16", "int8"])
+def test_quantized_candidate_matrix_scores_close_to_float32(dtype):
+    from app.ml.face_matcher import CandidateMatrix
+
+    rng = np.random.default_rng(1)
+    candidates = [(f"s{i}", rng.normal(size=(3, 128))) for i in range(50)]
+    queries = rng.normal(size=(10, 128))
+
+    exact = CandidateMatrix.from_candidates(candidates)
+    quantized = CandidateMatrix.from_candidates(candidates, dtype=dtype)
+
+    assert quantized.dtype == dtype
+    assert quantized.nbytes < exact.nbytes
+    np.testing.assert_allclose(
+        quantized.score(queries), exact.score(queries), atol=0.02
+    )
+
+
+def test_student_blocks_round_trip_keeps_quantization():
+    from app.ml.face_matcher import CandidateMatrix
+
+    rng = np.random.default_rng(2)
+    matrix = CandidateMatrix.from_candidates(
+        [("a", rng.normal(size=(2, 8))), ("b", rng.normal(size=(1, 8)))], dtype="int8"
+    )
+
+    rebuilt = CandidateMatrix.from_blocks(matrix.student_blocks())
+
+    assert rebuilt.student_ids == ["a", "b"]
+    np.testing.assert_array_equal(rebuilt.matrix, matrix.matrix)
+    np.testing.assert_array_equal(rebuilt.scales, matrix.scales)
@@ -0,0 +1,92 @@
+import base64
+import io
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.api.routes.face_recognition as fr_module
+from app.core.config import settings
+from app.main import app
+from app.ml.face_detector import FaceBox
+from app.ml.face_quality import assess_face
+
+client = TestClient(app)
+client.headers = {"X-API-KEY": settings.API_KEY}
+
+
+def _textured(size=96, level=128):
+    rng = np.random.default_rng(0)
+    noise = rng.integers(-40, 40, (size, size, 3))
+    return np.clip(level + noise, 0, 255).astype(np.uint8)
+
+
+def test_sharp_well_exposed_crop_scores_high():
+    quality = assess_face(_textured())
+    assert quality.sharpness == 1.0
+    assert quality.brightness > 0.9
+    assert quality.frontal == 1.0
+    assert quality.score > 0.9
+
+
+def test_blurry_and_dark_crops_score_low():
+    import cv2
+
+    blurry = cv2.GaussianBlur(_textured(), (15, 15), 8)
+    assert assess_face(blurry).sharpness < 0.2
+    assert assess_face(_textured(level=10)).brightness < 0.3
+    assert assess_face(np.zeros((0, 0, 3), dtype=np.uint8)).score == 0.0
+
+
+def test_pose_from_keypoints():
+    frontal = np.array([[30, 40], [70, 40], [50, 60]], dtype=np.float32)
+    profile = np.array([[30, 40], [70, 40], [72, 60]], dtype=np.float32)
+    tilted = np.array([[30, 30], [70, 70], [50, 60]], dtype=np.float32)
+
+    assert assess_face(_textured(), frontal).frontal == 1.0
+    assert assess_face(_textured(), profile).frontal == 0.0
+    assert assess_face(_textured(), tilted).frontal < 0.1
+
+
+def test_face_box_scales_box_and_keypoints():
+    box = FaceBox((10, 20, 30, 40), np.array([[1.0, 2.0]]))
+    scaled = box.scaled(2.0)
+    assert tuple(scaled) == (20, 40, 60, 80)
+    assert np.allclose(scaled.keypoints, [[2.0, 4.0]])
+    assert FaceBox((1, 2, 3, 4)).scaled(2.0).keypoints is None
+
+
+def _b64(arr):
+    buffered = io.BytesIO()
+    Image.fromarray(arr).save(buffered, format="PNG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+def test_detect_faces_skips_low_quality_crops():
+    # Left half textured, right half flat black
+    arr = np.zeros((200, 200, 3), dtype=np.uint8)
+    arr[:, :100] = _textured(size=200)[:, :100]
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(10, 50, 80, 80), (110, 50, 80, 80)]
+        data = client.post(
+            "/api/ml/detect-faces", json={"image_base64": _b64(arr)}
+        ).json()
+
+    assert data["success"] is True
+    assert data["count"] == 1
+    assert data["faces"][0]["location"]["left"] == 10
+    assert data["faces"][0]["quality"] > 0.9
+    assert data["metadata"]["low_quality_count"] == 1
+
+
+def test_encode_face_rejects_low_quality_crop():
+    arr = np.zeros((200, 200, 3), dtype=np.uint8)
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(20, 20, 160, 160)]
+        data = client.post(
+            "/api/ml/encode-face", json={"image_base64": _b64(arr)}
+        ).json()
+
+    assert data["success"] is False
+    assert data["error_code"] == "FACE_LOW_QUALITY"
@@ -0,0 +1,116 @@
+import base64
+import io
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.api.routes.face_recognition as fr_module
+from app.core.config import settings
+from app.main import app
+from app.ml.face_tracker import FaceTracker, TrackerStore, box_iou
+
+client = TestClient(app)
+client.headers = {"X-API-KEY": settings.API_KEY}
+
+
+def test_box_iou():
+    a = np.array([[0, 10, 10, 0]], dtype=np.float32)
+    b = np.array([[0, 10, 10, 0], [0, 15, 10, 5], [20, 30, 30, 20]], dtype=np.float32)
+
+    assert np.allclose(box_iou(a, b), [[1.0, 50 / 150, 0.0]])
+
+
+def test_tracker_reuses_embeddings_of_static_faces():
+    tracker = FaceTracker(max_missed=1)
+    boxes = [(0, 50, 50, 0), (0, 200, 50, 150)]
+
+    first, ended = tracker.associate(boxes, [0.1, 0.1])
+    assert [a.needs_embedding for a in first] == [True, True]
+    for a in first:
+        tracker.record(a.track, np.ones(2), 0.1)
+
+    # Both faces shift slightly: same tracks, nothing to embed
+    second, ended = tracker.associate([(2, 202, 52, 152), (2, 52, 52, 2)], [0.1, 0.1])
+    assert [a.track.track_id for a in second] == [2, 1]
+    assert not any(a.needs_embedding for a in second)
+    assert ended == []
+
+
+def test_tracker_reembeds_on_quality_gain_and_ends_lost_tracks():
+    tracker = FaceTracker(max_missed=1, quality_gain=1.5)
+    (a,), _ = tracker.associate([(0, 50, 50, 0)], [0.1])
+    tracker.record(a.track, np.ones(2), 0.1)
+
+    (same,), _ = tracker.associate([(0, 50, 50, 0)], [0.12])
+    assert not same.needs_embedding
+    (better,), _ = tracker.associate([(0, 50, 50, 0)], [0.2])
+    assert better.needs_embedding
+
+    # A face far away starts a new track; the old one ends after max_missed
+    (other,), ended = tracker.associate([(300, 350, 350, 300)], [0.1])
+    assert other.track.track_id == 2 and ended == []
+    _, ended = tracker.associate([(300, 350, 350, 300)], [0.1])
+    assert ended == [1]
+    assert tracker.active_tracks == 1
+
+
+def test_tracker_follows_fast_motion_by_center_distance():
+    tracker = FaceTracker(iou_threshold=0.3, center_ratio=0.5)
+    (a,), _ = tracker.associate([(0, 100, 100, 0)], [0.1])
+
+    # Moved 40% of its width: IoU is below the threshold, center is close
+    (b,), _ = tracker.associate([(0, 140, 100, 40)], [0.1])
+    assert b.track is a.track
+
+
+def test_tracker_store_expires_idle_sessions():
+    store = TrackerStore(max_sessions=2, ttl_seconds=60)
+    tracker = store.get("s1")
+    assert store.get("s1") is tracker
+
+    tracker.last_used -= 120
+    assert store.get("s1") is not tracker
+
+    store.get("s2")
+    store.get("s3")
+    assert len(store) == 2
+    assert store.end("s1") is False
+    assert store.end("s3") is True
+
+
+def _frame():
+    arr = np.random.randint(0, 255, (400, 400, 3), dtype=np.uint8)
+    buffered = io.BytesIO()
+    Image.fromarray(arr).save(buffered, format="JPEG")
+    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+
+
+def test_track_faces_embeds_only_new_tracks():
+    session = {"session_id": "capture-1", "embedding_format": "float32"}
+    with patch.object(fr_module, "detect_faces") as mock_detect:
+        mock_detect.return_value = [(100, 100, 100, 100)]
+        first = client.post(
+            "/api/ml/track-faces", json={"image_base64": _frame(), **session}
+        ).json()
+
+        mock_detect.return_value = [(104, 100, 100, 100), (250, 250, 100, 100)]
+        second = client.post(
+            "/api/ml/track-faces", json={"image_base64": _frame(), **session}
+        ).json()
+
+    assert first["success"] is True
+    assert first["faces"][0]["embedding"] is not None
+    assert first["metadata"]["embedded_count"] == 1
+
+    assert second["metadata"]["frame"] == 2
+    assert second["metadata"]["reused_count"] == 1
+    tracked, new = second["faces"]
+    assert tracked["track_id"] == first["faces"][0]["track_id"]
+    assert tracked["embedding_reused"] is True and tracked["embedding"] is None
+    assert tracked["frames_seen"] == 2
+    assert new["embedding_reused"] is False and new["embedding"] is not None
+
+    assert client.delete("/api/ml/track-faces/capture-1").json()["success"] is True
+    assert client.delete("/api/ml/track-faces/capture-1").json()["success"] is False
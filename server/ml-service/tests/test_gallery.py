@@ -0,0 +1,121 @@
+import threading
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.core.config import settings
+from app.ml.gallery import GalleryStore, gallery_store
+
+client = TestClient(app)
+client.headers = {"X-API-KEY": settings.API_KEY}
+
+
+def test_gallery_store_register_update_evict():
+    store = GalleryStore(max_galleries=2)
+    gallery = store.register("sub1", "v1", [("a", [[3, 0]]), ("b", [[0, 1], [1, 1]])])
+
+    assert gallery.student_count == 2
+    assert gallery.embedding_count == 3
+    assert abs(gallery.matrix.matrix[0, 0] - 1.0) < 1e-6
+
+    updated = store.update("sub1", "v2", upsert=[("c", [[1, 0]])], remove=["b"])
+    assert updated.version == "v2"
+    assert updated.matrix.student_ids == ["a", "c"]
+    assert store.get("sub1") is updated
+
+    assert store.update("missing", "v1") is None
+    assert store.evict("sub1") is True
+    assert store.get("sub1") is None
+
+
+def test_gallery_store_lru_eviction():
+    store = GalleryStore(max_galleries=2)
+    store.register("g1", "v1", [("a", [[1, 0]])])
+    store.register("g2", "v1", [("a", [[1, 0]])])
+    store.get("g1")
+    store.register("g3", "v1", [("a", [[1, 0]])])
+
+    assert store.get("g1") is not None
+    assert store.get("g2") is None
+    assert len(store) == 2
+
+
+def test_batch_match_against_gallery():
+    gallery_store.clear()
+    response = client.put(
+        "/api/ml/galleries/subject1",
+        json={
+            "version": "v1",
+            "candidates": [
+                {"student_id": "student1", "embeddings": [[1.0, 0.0, 0.0]]},
+                {"student_id": "student2", "embeddings": [[0.0, 1.0, 0.0]]},
+            ],
+        },
+    )
+    assert response.json()["gallery"]["student_count"] == 2
+
+    faces = [{"embedding": [0.0, 0.9, 0.1]}]
+    response = client.post(
+        "/api/ml/batch-match",
+        json={
+            "detected_faces": faces,
+            "gallery_id": "subject1",
+            "gallery_version": "v1",
+        },
+    )
+    data = response.json()
+    assert data["success"] is True
+    assert data["matches"][0]["student_id"] == "student2"
+
+    response = client.post(
+        "/api/ml/batch-match",
+        json={
+            "detected_faces": faces,
+            "gallery_id": "subject1",
+            "gallery_version": "v0",
+        },
+    )
+    assert response.json()["error_code"] == "GALLERY_VERSION_MISMATCH"
+
+    client.delete("/api/ml/galleries/subject1")
+    response = client.post(
+        "/api/ml/batch-match",
+        json={"detected_faces": faces, "gallery_id": "subject1"},
+    )
+    assert response.json()["error_code"] == "GALLERY_NOT_FOUND"
+
+
+def test_gallery_store_keeps_int8_galleries_on_update():
+    store = GalleryStore(dtype="int8")
+    store.register("sub1", "v1", [("a", [[3, 0]]), ("b", [[0, 1]])])
+
+    updated = store.update("sub1", "v2", upsert=[("c", [[1, 1]])], remove=["a"])
+
+    assert updated.matrix.dtype == "int8"
+    assert updated.matrix.student_ids == ["b", "c"]
+    ids, scores = updated.matrix.best_matches([[0.0, 1.0]])
+    assert ids == ["b"]
+    assert abs(scores[0] - 1.0) < 0.01
+
+
+def test_gallery_upload_runs_on_match_pool():
+    threads = []
+    register = gallery_store.register
+
+    def recording_register(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return register(*args, **kwargs)
+
+    with patch.object(gallery_store, "register", recording_register):
+        response = client.put(
+            "/api/ml/galleries/subject2",
+            json={
+                "version": "v1",
+                "candidates": [{"student_id": "s1", "embeddings": [[1.0, 0.0]]}],
+            },
+        )
+    client.delete("/api/ml/galleries/subject2")
+
+    assert response.json()["success"] is True
+    assert threads[0].startswith("ml-match")
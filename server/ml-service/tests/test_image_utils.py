@@ -0,0 +1,40 @@
+import io
+
+import numpy as np
+from PIL import Image
+
+from app.utils.image_utils import ImageSource
+
+
+def _jpeg_bytes(width, height):
+    arr = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    buffered = io.BytesIO()
+    Image.fromarray(arr).save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+
+def test_detection_image_is_bounded_with_scale_to_full_resolution():
+    source = ImageSource(_jpeg_bytes(4000, 3000), max_side=1000)
+
+    small, scale = source.detection_image()
+
+    assert small.shape == (750, 1000, 3)
+    assert scale == 4.0
+    assert (source.width, source.height) == (4000, 3000)
+
+
+def test_full_image_is_only_decoded_on_access():
+    source = ImageSource(_jpeg_bytes(2000, 1000), max_side=500)
+    source.detection_image()
+    assert source._full is None
+
+    assert source.full.shape == (1000, 2000, 3)
+
+
+def test_small_image_is_detected_at_full_resolution():
+    source = ImageSource(_jpeg_bytes(640, 480), max_side=1280)
+
+    image, scale = source.detection_image()
+
+    assert scale == 1.0
+    assert image is source.full
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.ml.projection import ProjectionStore, fit_pca, fit_random
+
+
+def _low_rank_corpus(n=600, dim=512, rank=16, seed=0):
+    rng = np.random.default_rng(seed)
+    basis = rng.standard_normal((rank, dim)).astype(np.float32)
+    latent = rng.standard_normal((n, rank)).astype(np.float32)
+    return latent @ basis + 0.01 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_pca_projection_preserves_cosine_similarity():
+    corpus = _low_rank_corpus()
+    projection = fit_pca(corpus, 32, "v1")
+
+    projected = projection.project(corpus[:50])
+    raw = corpus[:50] - projection.mean
+    raw /= np.linalg.norm(raw, axis=1, keepdims=True)
+
+    assert projected.shape == (50, 32)
+    np.testing.assert_allclose(np.linalg.norm(projected, axis=1), 1.0, atol=1e-5)
+    np.testing.assert_allclose(projected @ projected.T, raw @ raw.T, atol=0.02)
+
+
+def test_pca_needs_at_least_dim_samples():
+    with pytest.raises(ValueError):
+        fit_pca(np.ones((10, 64)), 32, "v1")
+
+
+def test_project_rejects_wrong_input_dimension():
+    projection = fit_random(64, 16, "r1")
+    with pytest.raises(ValueError):
+        projection.project(np.ones((1, 32)))
+
+
+def test_store_round_trip_and_versions_are_immutable(tmp_path):
+    store = ProjectionStore(str(tmp_path))
+    projection = fit_random(64, 16, "r1")
+    store.save(projection)
+
+    loaded = ProjectionStore(str(tmp_path)).get("r1")
+
+    assert (loaded.version, loaded.method, loaded.output_dim) == ("r1", "random", 16)
+    np.testing.assert_array_equal(loaded.components, projection.components)
+    with pytest.raises(ValueError):
+        store.save(fit_random(64, 16, "r1"))
+
+
+def test_store_rejects_path_like_versions(tmp_path):
+    with pytest.raises(ValueError):
+        ProjectionStore(str(tmp_path)).get("../secrets")
+
+
+def test_active_projection_is_none_without_version(tmp_path):
+    assert ProjectionStore(str(tmp_path)).active is None
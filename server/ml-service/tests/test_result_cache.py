@@ -0,0 +1,85 @@
+from app.core.result_cache import ResultCache
+from app.schemas.requests import DetectFacesOptions, EncodeFaceOptions
+
+
+def test_key_depends_on_payload_kind_and_options():
+    cache = ResultCache(max_bytes=1024)
+    options = EncodeFaceOptions()
+
+    key = cache.key("encode", b"image", options)
+
+    assert key == cache.key("encode", b"image", EncodeFaceOptions())
+    assert key != cache.key("encode", b"other", options)
+    assert key != cache.key("detect", b"image", options)
+    assert key != cache.key(
+        "encode", b"image", EncodeFaceOptions(embedding_format="float16")
+    )
+
+
+def test_key_ignores_inline_image_field():
+    from app.schemas.requests import DetectFacesRequest
+
+    cache = ResultCache(max_bytes=1024)
+    request = DetectFacesRequest(image_base64="aW1hZ2U=")
+
+    assert cache.key("detect", "aW1hZ2U=", request) == cache.key(
+        "detect", "aW1hZ2U=", DetectFacesOptions()
+    )
+
+
+def test_memory_tier_evicts_least_recently_used_by_bytes():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache(max_bytes=0)
+    cache.put("a", b"aaaa")
+    assert cache.get("a") is None
+
+
+def test_evicted_entries_spill_to_disk_and_are_promoted(tmp_path):
+    cache = ResultCache(max_bytes=6, disk_dir=str(tmp_path), disk_max_bytes=100)
+    cache.put("aa1", b"aaaa")
+    cache.put("bb2", b"bbbb")
+
+    assert (tmp_path / "aa" / "aa1").read_bytes() == b"aaaa"
+    assert cache.get("aa1") == b"aaaa"
+
+    # Reopening the directory keeps the disk tier
+    reopened = ResultCache(max_bytes=6, disk_dir=str(tmp_path), disk_max_bytes=100)
+    assert reopened.get("aa1") == b"aaaa"
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    cache = ResultCache(max_bytes=4, disk_dir=str(tmp_path), disk_max_bytes=8)
+    for key in ("aa1", "bb2", "cc3", "dd4"):
+        cache.put(key, b"xxxx")
+
+    assert not (tmp_path / "aa" / "aa1").exists()
+    assert (tmp_path / "bb" / "bb2").exists()
+    assert (tmp_path / "cc" / "cc3").exists()
+
+
+def test_counts_hits_and_misses():
+    from app.core.metrics import RESULT_CACHE_REQUESTS
+
+    cache = ResultCache(max_bytes=100)
+    hits = RESULT_CACHE_REQUESTS.labels("memory_hit")
+    misses = RESULT_CACHE_REQUESTS.labels("miss")
+    hits_before, misses_before = hits._value.get(), misses._value.get()
+
+    cache.get("a")
+    cache.put("a", b"1")
+    cache.get("a")
+
+    assert hits._value.get() == hits_before + 1
+    assert misses._value.get() == misses_before + 1
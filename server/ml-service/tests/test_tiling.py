@@ -0,0 +1,92 @@
+import base64
+import io
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import app.api.routes.face_recognition as fr_module
+from app.core.config import settings
+from app.main import app
+from app.ml.face_detector import FaceBox
+from app.ml.tiling import merge_detections, tile_grid
+
+client = TestClient(app)
+client.headers = {"X-API-KEY": settings.API_KEY}
+
+
+def test_tile_grid_covers_image_with_overlap():
+    tiles = tile_grid(2000, 1500, 512, 96, max_tiles=24)
+
+    covered = np.zeros((1500, 2000), dtype=bool)
+    for x, y, w, h in tiles:
+        assert w <= 512 and h <= 512
+        covered[y : y + h, x : x + w] = True
+    assert covered.all()
+
+    xs = sorted({x for x, _, _, _ in tiles})
+    assert all(b - a <= 512 - 96 for a, b in zip(xs, xs[1:]))
+
+
+def test_tile_grid_grows_tiles_to_respect_cap():
+    assert tile_grid(300, 200, 512, 96, max_tiles=24) == [(0, 0, 300, 200)]
+    assert len(tile_grid(4000, 3000, 512, 96, max_tiles=8)) <= 8
+
+
+def test_merge_detections_suppresses_duplicates_and_cut_faces():
+    whole = FaceBox((100, 100, 60, 60), score=0.9)
+    duplicate = FaceBox((104, 102, 60, 60), score=0.8)
+    cut = FaceBox((100, 100, 30, 60), score=0.95)  # clipped by a tile edge
+    other = FaceBox((400, 100, 60, 60), score=0.7)
+
+    merged = merge_detections([whole, duplicate, cut, other], 0.3, 0.7)
+
+    # The whole face wins over the higher-scoring cut one
+    assert [tuple(f) for f in merged] == [(100, 100, 60, 60), (400, 100, 60, 60)]
+
+
+def _fake_detect(image):
+    """Finds red squares, but only those at least 48 px in the given image."""
+    mask = ((image[..., 0] > 200) & (image[..., 1] < 60) & (image[..., 2] < 60)).astype(
+        np.uint8
+    )
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask)
+    return [
+        FaceBox(tuple(int(v) for v in stats[i, :4]))
+        for i in range(1, n)
+        if min(stats[i, 2], stats[i, 3]) >= 48
+    ]
+
+
+def test_tiled_detection_finds_small_faces_in_large_photo():
+    arr = np.full((1500, 2000, 3), 40, dtype=np.uint8)
+    arr[1200:1260, 1700:1760] = (255, 0, 0)  # small face, lost when downscaled
+    arr[100:500, 100:500] = (255, 0, 0)  # large face spanning several tiles
+    buffered = io.BytesIO()
+    Image.fromarray(arr).save(buffered, format="PNG")
+    payload = {
+        "image_base64": base64.b64encode(buffered.getvalue()).decode("utf-8"),
+        "min_face_area_ratio": 0.001,
+        "min_quality": 0,
+    }
+
+    with patch.object(fr_module, "detect_faces", side_effect=_fake_detect):
+        single = client.post("/api/ml/detect-faces", json=payload).json()
+        tiled = client.post(
+            "/api/ml/detect-faces", json={**payload, "model": "tiled"}
+        ).json()
+
+    assert single["count"] == 1
+    assert tiled["success"] is True
+    assert tiled["count"] == 2
+    small = min(tiled["faces"], key=lambda f: f["face_area_ratio"])["location"]
+    assert small == {"top": 1200, "right": 1760, "bottom": 1260, "left": 1700}
+
+
+def test_unknown_detection_model_is_rejected():
+    response = client.post(
+        "/api/ml/detect-faces", json={"image_base64": "", "model": "yolo"}
+    )
+    assert response.status_code == 422
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from structlog.testing import capture_logs
+
+from app.core import tracing
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+from app.core.workers import WorkerPool
+from app.main import app
+from tests.test_api_endpoints import create_dummy_image_b64
+
+
+def _step_count(step):
+    return (
+        REGISTRY.get_sample_value("ml_pipeline_step_seconds_count", {"step": step}) or 0
+    )
+
+
+def _correlation_ids(_):
+    return tracing.current_context().correlation_ids
+
+
+def _batch_correlation_ids(items):
+    return [tracing.current_context().correlation_ids for _ in items]
+
+
+@pytest.fixture
+def log_spans(monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SPANS", "log")
+    with capture_logs() as logs:
+        yield logs
+
+
+def test_span_observes_step_histogram():
+    before = _step_count("unit_step")
+
+    with tracing.span("unit_step"):
+        pass
+
+    assert _step_count("unit_step") == before + 1
+
+
+def test_log_spans_nest_under_their_parent(log_spans):
+    with tracing.attach(tracing.TraceContext(("req-1",))):
+        with tracing.span("outer"):
+            with tracing.span("inner", faces=3):
+                pass
+
+    inner, outer = [e for e in log_spans if e["event"] == "span"]
+    assert inner["span"] == "inner" and outer["span"] == "outer"
+    assert inner["parent_span_id"] == outer["span_id"]
+    assert outer["parent_span_id"] is None
+    assert inner["correlation_id"] == outer["correlation_id"] == "req-1"
+    assert inner["faces"] == 3
+
+
+def test_spans_are_not_logged_by_default():
+    with capture_logs() as logs:
+        with tracing.span("quiet"):
+            pass
+    assert logs == []
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_carries_the_request_trace():
+    pool = WorkerPool("test", "thread", workers=1, max_queue=4)
+    tracing.bind_request("req-pool")
+
+    assert await pool.run("test", _correlation_ids, None) == ("req-pool",)
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_micro_batch_is_traced_under_every_request():
+    pool = WorkerPool("test", "thread", workers=1, max_queue=4)
+    batcher = MicroBatcher(
+        "test", _batch_correlation_ids, pool, max_batch_size=2, max_wait_ms=50
+    )
+
+    async def submit(correlation_id):
+        tracing.bind_request(correlation_id)
+        return await batcher.submit(correlation_id)
+
+    results = await asyncio.gather(submit("a"), submit("b"))
+
+    assert results == [("a", "b"), ("a", "b")]
+    pool.shutdown()
+
+
+def test_request_spans_carry_the_correlation_id(log_spans):
+    client = TestClient(app)
+    response = client.post(
+        "/api/ml/detect-faces",
+        json={"image_base64": create_dummy_image_b64()},
+        headers={"X-API-KEY": settings.API_KEY, "X-Correlation-ID": "req-http"},
+    )
+
+    assert response.json()["success"] is True
+    spans = {e["span"]: e for e in log_spans if e["event"] == "span"}
+    assert {"base64_decode", "image_decode", "detect", "crop", "embed"} <= set(spans)
+    assert all(e["correlation_id"] == "req-http" for e in spans.values())
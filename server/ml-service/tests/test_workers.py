@@ -0,0 +1,66 @@
+import asyncio
+import os
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.core.exceptions import ServiceOverloadedError
+from app.core.workers import WorkerPool
+
+
+def _square(x):
+    return x * x
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_job_off_loop():
+    pool = WorkerPool("test", "thread", workers=2, max_queue=2)
+    caller = threading.get_ident()
+
+    result = await pool.run("square", _square, 7)
+    worker = await pool.run("ident", threading.get_ident)
+
+    assert result == 49
+    assert worker != caller
+    assert pool.inflight == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_rejects_when_saturated():
+    pool = WorkerPool("test", "thread", workers=1, max_queue=1)
+    release = threading.Event()
+
+    jobs = [asyncio.create_task(pool.run("block", release.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert pool.inflight == 2
+
+    with pytest.raises(ServiceOverloadedError) as exc:
+        await pool.run("square", _square, 3)
+    assert exc.value.status_code == 503
+
+    release.set()
+    await asyncio.gather(*jobs)
+    assert pool.inflight == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool_runs_stateful_jobs_in_service_process():
+    pool = WorkerPool("test", "process", workers=1, max_queue=1)
+    service = os.getpid()
+
+    worker = await pool.run("pid", os.getpid)
+    local = await pool.run_local("pid", os.getpid)
+
+    assert worker != service
+    assert local == service
+    assert pool.inflight == 0
+    pool.shutdown()
+
+
+def test_pool_kind_is_validated():
+    with pytest.raises(ValidationError):
+        Settings(MATCH_POOL_KIND="processes")